@@ -22,6 +22,10 @@ os.makedirs(MSE_CONF_DIR, exist_ok=True)
 # The URL to get the enclave signing certificate of cosmian
 MSE_CERTIFICATES_URL = "https://certificates.cosmian.com/"
 
+# The delay (in seconds) the cached enclave signing certificate is used
+# before being revalidated (overridden by the env var MSE_SIGNER_KEY_MAX_AGE)
+MSE_SIGNER_KEY_MAX_AGE = 3600
+
 # The PCCS to proceed the enclave remote attestation
 MSE_PCCS_URL = os.getenv("MSE_PCCS_URL", default="https://pccs.mse.cosmian.com")
 
@@ -2,6 +2,7 @@
 
 import json
 from pathlib import Path
+from typing import Optional
 from uuid import UUID
 
 import requests
@@ -40,6 +41,21 @@ def get(conn: Connection, app_id: UUID) -> requests.Response:
     return conn.get(url=f"/apps/{app_id}")
 
 
+def wait_status_change(
+    conn: Connection, app_id: UUID, status: Optional[str], timeout: int
+) -> requests.Response:
+    """GET `/apps/{app_id}?wait=status-change`.
+
+    Wait up to `timeout` seconds for the status of the app to differ from `status`.
+    """
+    params = {"wait": "status-change", "timeout": timeout}
+    if status:
+        params["status"] = status
+
+    # Let the backend answer before giving up on the request
+    return conn.get(url=f"/apps/{app_id}", params=params, timeout=timeout + 10)
+
+
 def default(conn: Connection) -> requests.Response:
     """GET `/apps/default`."""
     return conn.get(url="/apps/default")
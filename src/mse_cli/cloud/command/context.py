@@ -11,6 +11,7 @@ from toml import TomlDecodeError
 from mse_cli.cloud.model.context import Context
 from mse_cli.color import COLOR, ColorKind
 from mse_cli.core.fs import ls
+from mse_cli.core.ignore_file import IgnoreMatcher
 from mse_cli.log import LOGGER as LOG
 
 
@@ -52,7 +53,11 @@ def run(args) -> None:
         LOG.success("Context successfully removed")  # type: ignore
 
     if args.list:
-        for path in ls(Context.get_root_dirpath()):
+        # Do not walk through the encrypted code files caches
+        for path in ls(
+            Context.get_root_dirpath(),
+            ignore=IgnoreMatcher([f"{Context.get_code_cache_dirname()}/"]),
+        ):
             if path.is_file() and path.suffix == ".mse":
                 try:
                     context = Context.load(path)
@@ -1,7 +1,7 @@
 """mse_cli.cloud.command.deploy module."""
 
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 from uuid import UUID
 
 import requests
@@ -11,19 +11,21 @@ from mse_cli.cloud.api.app import new
 from mse_cli.cloud.api.auth import Connection
 from mse_cli.cloud.api.types import App, AppStatus, SSLCertificateOrigin
 from mse_cli.cloud.command.helpers import (
+    BackgroundFingerprint,
     exists_in_project,
-    get_app,
+    fingerprint_args,
     get_client_docker,
     get_enclave_resources,
     get_project_from_name,
     prepare_code,
     stop_app,
     verify_app,
+    watch_app_status,
 )
 from mse_cli.cloud.model.context import Context
 from mse_cli.cloud.model.user import UserConf
 from mse_cli.color import COLOR, ColorKind
-from mse_cli.core.bootstrap import ConfigurationPayload, configure_app
+from mse_cli.core.bootstrap import ConfigurationPayload, close_session, configure_app
 from mse_cli.core.clock_tick import ClockTick
 from mse_cli.core.conf import AppConf, AppConfParsingOption
 from mse_cli.core.spinner import Spinner
@@ -76,6 +78,23 @@ def add_subparser(subparsers):
         help="directory to write the temporary files",
     )
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=1,
+        metavar="N",
+        help="number of processes used to encrypt the code (Default: 1)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="compute the code fingerprint, retrieve the collaterals, "
+        "revalidate the signer key and verify the certificate again "
+        "instead of reading them from the cache",
+    )
+
     parser.add_argument(
         "--timeout",
         type=int,
@@ -129,7 +148,7 @@ def run(args) -> None:
     LOG.info("Temporary workspace is: %s", context.workspace)
 
     LOG.info("Encrypting your source code...")
-    (tar_path, nonces) = prepare_code(cloud_conf.code, context)
+    (tar_path, nonces) = prepare_code(cloud_conf.code, context, args.jobs)
 
     LOG.info(
         "Deploying your app '%s' with %dM memory and %.2f CPU cores...",
@@ -143,36 +162,64 @@ def run(args) -> None:
         "To follow the app creation, you can run: \n\n\tmse cloud logs %s\n", app.id
     )
 
-    app = wait_app_creation(conn, app.id, args.timeout)
-
-    context.run(
-        app.id,
-        enclave_size,
-        app.config_domain_name,
-        app.expires_at,
-        app.ssl_certificate_origin,
-        nonces,
-    )
-
-    LOG.success("App created!")  # type: ignore
-
-    if app.ssl_certificate_origin == SSLCertificateOrigin.Owner:
-        LOG.warning(
-            "This app runs with an app owner certificate. "
-            "The app provider may decrypt all communications with the app. "
-            "Read %s%s%s%s%s for more details.",
-            COLOR.render(ColorKind.LINK_START),
-            MSE_DOC_SECURITY_MODEL_URL,
-            COLOR.render(ColorKind.LINK_MID),
-            sec_doc_text,
-            COLOR.render(ColorKind.LINK_END),
+    fingerprint: Optional[Union[Context, BackgroundFingerprint]] = None
+    background: Optional[BackgroundFingerprint] = None
+    if not args.no_verify:
+        # The fingerprint only depends on the app returned by the backend:
+        # compute it while the enclave is being provisioned
+        context.run(
+            app.id,
+            enclave_size,
+            app.config_domain_name,
+            app.expires_at,
+            app.ssl_certificate_origin,
+            nonces,
+        )
+        background = fingerprint = BackgroundFingerprint(context, args.no_cache)
+
+    try:
+        app = wait_app_creation(conn, app.id, args.timeout)
+
+        context.run(
+            app.id,
+            enclave_size,
+            app.config_domain_name,
+            app.expires_at,
+            app.ssl_certificate_origin,
+            nonces,
         )
 
-    verify_app(
-        None if args.no_verify else context,
-        app.config_domain_name,
-        context.config_cert_path,
-    )
+        if background and fingerprint_args(context) != background.app_args:
+            LOG.debug(
+                "The app has changed while created: computing the fingerprint again"
+            )
+            background.cancel()
+            fingerprint = context
+
+        LOG.success("App created!")  # type: ignore
+
+        if app.ssl_certificate_origin == SSLCertificateOrigin.Owner:
+            LOG.warning(
+                "This app runs with an app owner certificate. "
+                "The app provider may decrypt all communications with the app. "
+                "Read %s%s%s%s%s for more details.",
+                COLOR.render(ColorKind.LINK_START),
+                MSE_DOC_SECURITY_MODEL_URL,
+                COLOR.render(ColorKind.LINK_MID),
+                sec_doc_text,
+                COLOR.render(ColorKind.LINK_END),
+            )
+
+        verify_app(
+            fingerprint,
+            app.config_domain_name,
+            context.config_cert_path,
+            args.no_cache,
+        )
+    finally:
+        # Never leave the fingerprint container running on failure
+        if background:
+            background.cancel()
 
     LOG.info("Sending secret key and decrypting the application code...")
     decrypt_private_data(
@@ -230,9 +277,7 @@ def wait_app_start(conn: Connection, app_id: UUID, timeout: int) -> App:
             timeout=timeout * 60,
             message="MSE is at high capacity right now! Try again later.",
         )
-        while clock.tick():
-            app = get_app(conn=conn, app_id=app_id)
-
+        for app in watch_app_status(conn, app_id, clock):
             if app.status == AppStatus.Spawning:
                 raise AppContainerBadState(
                     "The app shoudn't be in the state spawning at this stage..."
@@ -249,7 +294,10 @@ def wait_app_start(conn: Connection, app_id: UUID, timeout: int) -> App:
                     "stopped in the meantime..."
                 )
 
-    return app
+    LOG.debug("App started after %s", clock.summary())
+
+    # The statuses are watched until a break or an exception
+    return app  # pylint: disable=undefined-loop-variable
 
 
 def check_app_conf(conn: Connection, app_conf: AppConf, force: bool = False) -> bool:
@@ -316,9 +364,7 @@ def wait_app_creation(conn: Connection, app_id: UUID, timeout: int) -> App:
             timeout=timeout * 60,
             message="MSE is at high capacity right now! Try again later.",
         )
-        while clock.tick():
-            app = get_app(conn=conn, app_id=app_id)
-
+        for app in watch_app_status(conn, app_id, clock):
             if app.status == AppStatus.Initializing:
                 break
             if app.status == AppStatus.Running:
@@ -335,7 +381,10 @@ def wait_app_creation(conn: Connection, app_id: UUID, timeout: int) -> App:
                     "has been stopped in the meantime..."
                 )
 
-    return app
+    LOG.debug("App created after %s", clock.summary())
+
+    # The statuses are watched until a break or an exception
+    return app  # pylint: disable=undefined-loop-variable
 
 
 def decrypt_private_data(
@@ -354,8 +403,8 @@ def decrypt_private_data(
         ssl_private_key=ssl_private_key,
     )
 
-    configure_app(
-        f"https://{context.instance.config_domain_name}",
-        data.payload(),
-        str(context.config_cert_path),
-    )
+    url = f"https://{context.instance.config_domain_name}"
+    try:
+        configure_app(url, data.payload(), str(context.config_cert_path))
+    finally:
+        close_session(url, str(context.config_cert_path))
@@ -1,21 +1,20 @@
 """mse_cli.cloud.command.helpers module."""
 
-import socket
-import ssl
+import atexit
 import sys
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union, no_type_check
-from uuid import UUID
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, no_type_check
+from uuid import UUID, uuid4
 
 import docker
 import requests
 from intel_sgx_ra.error import SGXQuoteNotFound
-from intel_sgx_ra.ratls import get_server_certificate
-from mse_lib_crypto.xsalsa20_poly1305 import encrypt_directory
 
 from mse_cli import MSE_CERTIFICATES_URL, MSE_PCCS_URL
-from mse_cli.cloud.api.app import default, get, metrics, stop
+from mse_cli.cloud.api.app import default, get, metrics, stop, wait_status_change
 from mse_cli.cloud.api.auth import Connection
 from mse_cli.cloud.api.hardware import get as get_hardware
 from mse_cli.cloud.api.project import get_app_from_name, get_from_name
@@ -30,14 +29,21 @@ from mse_cli.cloud.api.types import (
 )
 from mse_cli.cloud.model.context import Context
 from mse_cli.core.clock_tick import ClockTick
+from mse_cli.core.collaterals import CollateralCache
 from mse_cli.core.enclave import compute_mr_enclave, verify_enclave
-from mse_cli.core.fs import tar
+from mse_cli.core.encrypted_tar import encrypt_tar
+from mse_cli.core.fs import whitelist
 from mse_cli.core.ignore_file import IgnoreFile
+from mse_cli.core.mr_enclave_cache import MREnclaveCache
 from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
+from mse_cli.core.signer_key import SignerKeyCache
 from mse_cli.core.spinner import Spinner
+from mse_cli.core.verification_cache import VerificationCache
+from mse_cli.core.watch import fetch_certificate
 from mse_cli.error import (
     RatlsVerificationFailure,
     RatlsVerificationNotSupported,
+    Timeout,
     UnexpectedResponse,
 )
 from mse_cli.log import LOGGER as LOG
@@ -72,6 +78,66 @@ def get_app(conn: Connection, app_id: UUID) -> App:
     return App.from_dict(r.json())
 
 
+def watch_app_status(
+    conn: Connection, app_id: UUID, clock: ClockTick, long_poll: int = 30
+) -> Iterator[App]:
+    """Yield the app each time its status may have changed.
+
+    The backend is asked to hold each request until the status of the app
+    changes (long polling), so that a change is seen as soon as it happens.
+    If the backend doesn't support it, the app is polled at each tick of
+    `clock` instead.
+
+    Parameters
+    ----------
+    conn : Connection
+        Connection to the backend.
+    app_id : UUID
+        Id of the app.
+    clock : ClockTick
+        Clock bounding the total waiting time (and pacing the polling).
+    long_poll : int
+        Maximum duration of a long-poll request (in seconds).
+
+    Returns
+    -------
+    Iterator[App]
+        Successive states of the app.
+
+    """
+    # The first tick starts the clock without waiting
+    clock.tick()
+
+    status: Optional[str] = None
+    streaming = True
+    while True:
+        if streaming:
+            remaining = clock.timeout - clock.elapsed
+            if remaining <= 0:
+                raise Timeout(clock.message)
+
+            r = wait_status_change(
+                conn, app_id, status, min(long_poll, max(int(remaining), 1))
+            )
+            # The backend ignoring the long polling answers at once
+            streaming = r.headers.get("Mse-Wait") == "status-change"
+            if not streaming:
+                LOG.debug("Status changes not streamed: polling the app instead")
+                if r.status_code in (400, 422):
+                    # The backend rejects the long-poll parameters
+                    continue
+        else:
+            clock.tick()
+            r = get(conn=conn, app_id=app_id)
+
+        if not r.ok:
+            raise UnexpectedResponse(r.text)
+
+        app = App.from_dict(r.json())
+        status = app.status.value
+        yield app
+
+
 def get_metrics(conn: Connection, app_id: UUID) -> Dict[str, Any]:
     """Get the app metrics from the backend."""
     r: requests.Response = metrics(conn=conn, app_id=app_id)
@@ -109,24 +175,25 @@ def get_project_from_name(conn: Connection, name: str) -> Optional[Project]:
 def prepare_code(
     src_path: Path,
     context: Context,
+    jobs: int = 1,
 ) -> Tuple[Path, Dict[str, bytes]]:
     """Tar and encrypt (if required) the app python code."""
-    LOG.debug("Encrypt code in %s to %s...", src_path, context.encrypted_code_path)
+    LOG.debug("Encrypt code in %s to %s...", src_path, context.tar_code_path)
 
-    nonces = encrypt_directory(
+    nonces = encrypt_tar(
         dir_path=src_path,
-        pattern="*",
+        tar_path=context.tar_code_path,
         key=context.config.code_secret_key,
         nonces=context.instance.nonces if context.instance else None,
-        exceptions=["requirements.txt"],
-        ignore_patterns=list(IgnoreFile.parse(src_path)),
-        out_dir_path=context.encrypted_code_path,
+        exceptions=whitelist(),
+        ignore=IgnoreFile.load(src_path),
+        jobs=jobs,
+        # A fresh nonce is drawn for each file without an app: nothing to reuse
+        cache_path=context.code_cache_path if context.instance else None,
     )
 
-    tar_path = tar(dir_path=context.encrypted_code_path, tar_path=context.tar_code_path)
-
-    LOG.debug("Tar encrypted code in '%s'", tar_path.name)
-    return tar_path, nonces
+    LOG.debug("Tar encrypted code in '%s'", context.tar_code_path.name)
+    return context.tar_code_path, nonces
 
 
 def exists_in_project(
@@ -171,74 +238,243 @@ def non_empty_string(s):
     return s
 
 
+def fingerprint_args(context: Context) -> NoSgxDockerConfig:
+    """Get the enclave arguments the code fingerprint of the app depends on."""
+    assert context.instance is not None
+
+    return NoSgxDockerConfig(
+        subject=(
+            f"CN={context.instance.config_domain_name},"
+            "O=Cosmian Tech,"
+            "C=FR,"
+            "L=Paris,"
+            "ST=Ile-de-France"
+        ),
+        subject_alternative_name=context.instance.config_domain_name,
+        expiration_date=int(datetime.timestamp(context.instance.expires_at))
+        if context.instance.ssl_certificate_origin != SSLCertificateOrigin.Owner
+        else None,
+        size=context.instance.enclave_size,
+        app_id=context.instance.id,
+        application=context.config.python_application,
+    )
+
+
+def compute_fingerprint(
+    context: Context, app_args: NoSgxDockerConfig, no_cache: bool = False
+) -> str:
+    """Compute the code fingerprint (MRENCLAVE) of the app."""
+    return compute_mr_enclave(
+        get_client_docker(),
+        context.config.docker,
+        app_args,
+        context.workspace,
+        context.docker_log_path,
+        None if no_cache else MREnclaveCache(),
+    )
+
+
+class BackgroundFingerprint:
+    """Code fingerprint (MRENCLAVE) of an app computed in a background thread.
+
+    The inputs are copied from the context when starting, so the context may
+    be updated in the meantime, and the docker output has its own log file.
+    The thread doesn't hold the CLI on exit. `cancel` removes the container
+    of a computation no longer needed, even if it is only created afterwards.
+
+    """
+
+    def __init__(self, context: Context, no_cache: bool = False):
+        """Start computing the fingerprint of the app of `context`."""
+        self.client = get_client_docker()
+        self.app_args = fingerprint_args(context)
+        self.container_name = str(uuid4())
+        self.log_path = context.workspace / "docker.fingerprint.log"
+        self.cancelled = False
+        # Serialize the start of the computation and its cancellation
+        self.lock = threading.Lock()
+        self.future: "Future[str]" = Future()
+
+        self.thread = threading.Thread(
+            target=self.run,
+            args=(
+                context.config.docker,
+                context.workspace,
+                None if no_cache else MREnclaveCache(),
+            ),
+            daemon=True,
+        )
+        self.thread.start()
+
+    def run(self, image: str, workspace: Path, cache: Optional[MREnclaveCache]):
+        """Compute the fingerprint unless cancelled."""
+        with self.lock:
+            if self.cancelled or not self.future.set_running_or_notify_cancel():
+                return
+
+        try:
+            self.future.set_result(
+                compute_mr_enclave(
+                    self.client,
+                    image,
+                    self.app_args,
+                    workspace,
+                    self.log_path,
+                    cache,
+                    container_name=self.container_name,
+                )
+            )
+        # Hand any failure over to the thread waiting for the result
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.future.set_exception(exc)
+        finally:
+            # The container may have been created after `cancel`
+            if self.cancelled:
+                self.remove_container()
+
+    def result(self) -> str:
+        """Wait for the fingerprint."""
+        return self.future.result()
+
+    def remove_container(self) -> bool:
+        """Remove the container of the computation (False if not found)."""
+        try:
+            self.client.containers.get(self.container_name).remove(force=True)
+        except docker.errors.NotFound:
+            return False
+
+        return True
+
+    def cancel(self):
+        """Stop the computation (if still running) and remove its container."""
+        with self.lock:
+            self.cancelled = True
+            if self.future.cancel() or self.future.done():
+                return
+
+        if not self.remove_container():
+            # Not created yet: the thread removes it once created, unless
+            # the CLI exits first
+            atexit.register(self.remove_container)
+
+
 @no_type_check
 def verify_app(
-    mrenclave: Optional[Union[str, Context]],
+    mrenclave: Optional[Union[str, Context, BackgroundFingerprint]],
     domain_name: str,
     output_cert_path: Optional[Path],
+    no_cache: bool = False,
 ):
     """Verify the app by proceeding the remote attestation."""
     if not mrenclave:
         LOG.warning("Code fingerprint check skipped!")
+    elif isinstance(mrenclave, BackgroundFingerprint):
+        # Join the fingerprint computed in the background
+        with Spinner("Waiting for the code fingerprint... "):
+            mrenclave = mrenclave.result()
+        LOG.info("The code fingerprint is %s", mrenclave)
     elif not isinstance(mrenclave, str):
         # Compute the MREnclave
         context = mrenclave
         with Spinner("Computing the code fingerprint... "):
-            mrenclave = compute_mr_enclave(
-                get_client_docker(),
-                context.config.docker,
-                NoSgxDockerConfig(
-                    subject=(
-                        f"CN={context.instance.config_domain_name},"
-                        "O=Cosmian Tech,"
-                        "C=FR,"
-                        "L=Paris,"
-                        "ST=Ile-de-France"
-                    ),
-                    subject_alternative_name=context.instance.config_domain_name,
-                    expiration_date=int(datetime.timestamp(context.instance.expires_at))
-                    if context.instance.ssl_certificate_origin
-                    != SSLCertificateOrigin.Owner
-                    else None,
-                    size=context.instance.enclave_size,
-                    app_id=context.instance.id,
-                    application=context.config.python_application,
-                ),
-                context.workspace,
-                context.docker_log_path,
+            mrenclave = compute_fingerprint(
+                context, fingerprint_args(context), no_cache
             )
         LOG.info("The code fingerprint is %s", mrenclave)
 
-    # Get the ratls certificate
+    # Get the signer key public key
+    signer_key = SignerKeyCache(max_age=0 if no_cache else None).get(
+        MSE_CERTIFICATES_URL
+    )
+
     try:
-        ratls_cert = get_server_certificate((domain_name, 443))
+        verify_ratls(
+            domain_name,
+            mrenclave,
+            signer_key,
+            None if no_cache else CollateralCache(),
+            None if no_cache else VerificationCache(),
+            output_cert_path,
+        )
+    except RatlsVerificationFailure as exc:
+        LOG.error("Verification failed!")
+        raise exc
+
+    LOG.success("Verification success")  # type: ignore
+    if output_cert_path:
+        LOG.info("The verified certificate has been saved at: %s", output_cert_path)
+
+
+def verify_ratls(
+    domain_name: str,
+    mrenclave: Optional[str],
+    signer_key: Tuple[bytes, bytes],
+    collateral_cache: Optional[CollateralCache],
+    result_cache: Optional[VerificationCache] = None,
+    output_cert_path: Optional[Path] = None,
+) -> str:
+    """Get the RA-TLS certificate of the app and verify it.
+
+    Parameters
+    ----------
+    domain_name : str
+        Domain name of the app.
+    mrenclave : Optional[str]
+        Expected code fingerprint (not checked if None).
+    signer_key : Tuple[bytes, bytes]
+        PEM-encoded enclave signer public key and its MRSIGNER.
+    collateral_cache : Optional[CollateralCache]
+        Cache of the PCCS collaterals.
+    result_cache : Optional[VerificationCache]
+        Cache of the successful verifications.
+    output_cert_path : Optional[Path]
+        Path to save the RA-TLS certificate.
+
+    Returns
+    -------
+    str
+        PEM-encoded RA-TLS certificate.
+
+    """
+    ratls_cert = get_ratls_certificate(domain_name)
+
+    if output_cert_path:
         output_cert_path.write_text(ratls_cert)
-    except (ssl.SSLZeroReturnError, socket.gaierror, ssl.SSLEOFError) as exc:
-        raise ConnectionError(
-            f"Can't reach {domain_name}. "
-            "Are you sure the application is still running?"
-        ) from exc
 
-    # Get the signer key public key
-    r = requests.get(url=MSE_CERTIFICATES_URL, timeout=60)
-    if not r.ok:
-        raise UnexpectedResponse(
-            f"Can't get the enclave signer public key: [{r.status_code}] {r.text}",
-        )
+    verify_ratls_certificate(
+        ratls_cert, mrenclave, signer_key, collateral_cache, result_cache
+    )
+
+    return ratls_cert
+
+
+def get_ratls_certificate(domain_name: str) -> str:
+    """Get the PEM-encoded RA-TLS certificate of the app."""
+    return fetch_certificate(domain_name, 443)
+
+
+def verify_ratls_certificate(
+    ratls_cert: str,
+    mrenclave: Optional[str],
+    signer_key: Tuple[bytes, bytes],
+    collateral_cache: Optional[CollateralCache],
+    result_cache: Optional[VerificationCache] = None,
+):
+    """Verify the PEM-encoded RA-TLS certificate of an app."""
+    (signer_pk, mr_signer) = signer_key
 
     try:
         verify_enclave(
-            r.content, ratls_cert.encode("utf8"), mrenclave, pccs_url=MSE_PCCS_URL
+            signer_pk,
+            ratls_cert.encode("utf8"),
+            mrenclave,
+            pccs_url=MSE_PCCS_URL,
+            collateral_cache=collateral_cache,
+            mr_signer=mr_signer,
+            result_cache=result_cache,
         )
     except SGXQuoteNotFound as exc:
         raise RatlsVerificationNotSupported(
             "The application is not using a certificate generated by MSE. "
             "Verifying the application is therefore not possible on use"
         ) from exc
-    except RatlsVerificationFailure as exc:
-        LOG.error("Verification failed!")
-        raise exc
-
-    LOG.success("Verification success")  # type: ignore
-    if output_cert_path:
-        LOG.info("The verified certificate has been saved at: %s", output_cert_path)
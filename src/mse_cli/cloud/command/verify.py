@@ -1,13 +1,42 @@
 """mse_cli.cloud.command.verify module."""
 
 import argparse
+import json
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 
-from mse_cli.cloud.api.types import SSLCertificateOrigin
-from mse_cli.cloud.command.helpers import prepare_code, verify_app
+import requests
+
+from mse_cli import MSE_CERTIFICATES_URL
+from mse_cli.cloud.api.project import list_apps
+from mse_cli.cloud.api.types import AppStatus, PartialApp, SSLCertificateOrigin
+from mse_cli.cloud.command.helpers import (
+    compute_fingerprint,
+    fingerprint_args,
+    get_project_from_name,
+    get_ratls_certificate,
+    prepare_code,
+    verify_app,
+    verify_ratls,
+    verify_ratls_certificate,
+)
 from mse_cli.cloud.model.context import Context
-from mse_cli.error import RatlsVerificationNotSupported
+from mse_cli.cloud.model.user import UserConf
+from mse_cli.core.collaterals import CollateralCache
+from mse_cli.core.signer_key import SignerKeyCache
+from mse_cli.core.spinner import Spinner
+from mse_cli.core.verification_cache import VerificationCache
+from mse_cli.core.watch import Watcher, event_emitter, watch_caches
+from mse_cli.error import (
+    BadApplicationInput,
+    RatlsVerificationFailure,
+    RatlsVerificationNotSupported,
+    UnexpectedResponse,
+)
 from mse_cli.log import LOGGER as LOG
 
 
@@ -24,9 +53,34 @@ def add_subparser(subparsers):
     parser.add_argument(
         "domain_name",
         type=str,
+        nargs="?",
         help="domain name of the MSE web application (e.g. {uuid}.cosmian.io)",
     )
 
+    parser.add_argument(
+        "--from-file",
+        type=Path,
+        metavar="FILE",
+        help="verify the applications whose domain names are listed in a file "
+        "(one per line)",
+    )
+
+    parser.add_argument(
+        "--project",
+        type=str,
+        metavar="NAME",
+        help="verify all the running applications of a project (sign-in required)",
+    )
+
+    parser.add_argument(
+        "--report",
+        type=Path,
+        metavar="FILE",
+        default=Path("verify_report.json"),
+        help="path of the JSON report when verifying several applications "
+        "(Default: verify_report.json)",
+    )
+
     parser.add_argument(
         "--fingerprint",
         type=str,
@@ -49,6 +103,56 @@ def add_subparser(subparsers):
         "(should be used with --context)",
     )
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=1,
+        metavar="N",
+        help="number of processes used to encrypt the code (Default: 1)",
+    )
+
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        required=False,
+        default=1,
+        metavar="N",
+        help="number of applications verified in parallel "
+        "with --from-file, --project or --watch (Default: 1)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="compute the code fingerprint, retrieve the collaterals, "
+        "revalidate the signer key and verify the certificate again "
+        "instead of reading them from the cache",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="verify the applications again and again "
+        "and print an event for each verification",
+    )
+
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60,
+        metavar="S",
+        help="delay between two verifications with --watch (Default: 60s)",
+    )
+
+    parser.add_argument(
+        "--events",
+        type=Path,
+        metavar="FILE",
+        help="append the events of --watch to a JSON lines file "
+        "instead of printing them",
+    )
+
     parser.add_argument(
         "--workspace",
         type=Path,
@@ -61,22 +165,17 @@ def run(args) -> None:
     """Run the subcommand."""
     LOG.info("Checking your app...")
 
-    # Check args
-    if args.fingerprint and (args.context or args.code):
-        raise argparse.ArgumentTypeError(
-            "[--fingerprint] and [--context & --code] are mutually exclusive"
-        )
+    check_args(args)
 
-    if (args.context and not args.code) or (not args.context and args.code):
-        raise argparse.ArgumentTypeError(
-            "[--context] and [--code] must be used together"
-        )
+    domain_names = [args.domain_name]
+    if args.from_file:
+        domain_names = read_domain_names(args.from_file)
+    elif args.project:
+        domain_names = project_domain_names(args.project)
 
     # Compute MRENCLAVE and decrypt the code if needed
-    mrenclave = None
-    if args.fingerprint:
-        mrenclave = args.fingerprint
-    elif args.context:
+    mrenclave: Optional[Union[str, Context]] = args.fingerprint
+    if args.context:
         # Read the context file
         context = Context.load(args.context, workspace=args.workspace)
 
@@ -87,7 +186,259 @@ def run(args) -> None:
             )
 
         # Encrypt the code and create the tarball
-        prepare_code(args.code, context)
+        prepare_code(args.code, context, args.jobs)
         mrenclave = context
 
-    verify_app(mrenclave, args.domain_name, Path(os.getcwd()) / "cert.pem")
+    if args.watch:
+        if isinstance(mrenclave, Context):
+            with Spinner("Computing the code fingerprint... "):
+                mrenclave = compute_fingerprint(
+                    mrenclave, fingerprint_args(mrenclave), args.no_cache
+                )
+            LOG.info("The code fingerprint is %s", mrenclave)
+
+        watch_all(
+            domain_names,
+            mrenclave,
+            args.parallel,
+            args.no_cache,
+            args.interval,
+            args.events,
+        )
+    elif args.from_file or args.project:
+        assert not isinstance(mrenclave, Context)
+        verify_all(
+            domain_names,
+            mrenclave,
+            args.parallel,
+            args.no_cache,
+            args.report,
+        )
+    else:
+        verify_app(
+            mrenclave, args.domain_name, Path(os.getcwd()) / "cert.pem", args.no_cache
+        )
+
+
+def check_args(args):
+    """Check the consistency of the arguments."""
+    targets = [args.domain_name, args.from_file, args.project]
+    if len([target for target in targets if target]) != 1:
+        raise argparse.ArgumentTypeError(
+            "Exactly one of [domain_name], [--from-file] and [--project] is required"
+        )
+
+    if (args.from_file or args.project) and (args.context or args.code):
+        raise argparse.ArgumentTypeError(
+            "[--context & --code] can only be used to verify a single application"
+        )
+
+    if args.fingerprint and (args.context or args.code):
+        raise argparse.ArgumentTypeError(
+            "[--fingerprint] and [--context & --code] are mutually exclusive"
+        )
+
+    if (args.context and not args.code) or (not args.context and args.code):
+        raise argparse.ArgumentTypeError(
+            "[--context] and [--code] must be used together"
+        )
+
+    if args.jobs < 1:
+        raise ValueError("The number of jobs should be greater than 0")
+
+    if args.parallel < 1:
+        raise ValueError(
+            "The number of applications verified in parallel should be greater than 0"
+        )
+
+    if args.interval <= 0:
+        raise ValueError("The interval should be greater than 0")
+
+
+def read_domain_names(path: Path) -> List[str]:
+    """Read the domain names of a file (blank lines and comments are skipped)."""
+    domain_names = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            domain_names.append(line)
+
+    return domain_names
+
+
+def project_domain_names(project_name: str) -> List[str]:
+    """Get the domain names of the running applications of a project."""
+    conn = UserConf.load().get_connection()
+
+    project = get_project_from_name(conn, project_name)
+    if not project:
+        raise BadApplicationInput(f"Project {project_name} does not exist")
+
+    r: requests.Response = list_apps(
+        conn=conn, project_id=project.id, status=[AppStatus.Running]
+    )
+    if not r.ok:
+        raise UnexpectedResponse(r.text)
+
+    return [PartialApp.from_dict(app).domain_name for app in r.json()]
+
+
+def verify_all(
+    domain_names: List[str],
+    mrenclave: Optional[str],
+    jobs: int,
+    no_cache: bool,
+    report_path: Path,
+):
+    """Verify many apps at once and write a JSON report.
+
+    Parameters
+    ----------
+    domain_names : List[str]
+        Domain names of the apps (duplicates are verified once).
+    mrenclave : Optional[str]
+        Expected code fingerprint of all the apps (not checked if None).
+    jobs : int
+        Number of apps verified in parallel.
+    no_cache : bool
+        Whether to retrieve the collaterals and revalidate the signer key.
+    report_path : Path
+        Path of the JSON report.
+
+    """
+    domain_names = list(dict.fromkeys(domain_names))
+    if not domain_names:
+        raise BadApplicationInput("No application to verify")
+
+    LOG.info("Verifying %d applications...", len(domain_names))
+
+    # The signer key and the collaterals are shared by all the apps
+    signer_key = SignerKeyCache(max_age=0 if no_cache else None).get(
+        MSE_CERTIFICATES_URL
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # A fresh cache still retrieves the collaterals once for all the apps
+        collateral_cache = (
+            CollateralCache(Path(tmp_dir)) if no_cache else CollateralCache()
+        )
+        result_cache = None if no_cache else VerificationCache()
+
+        def verify(domain_name: str) -> Dict[str, Any]:
+            """Verify an app and time it."""
+            start = time.monotonic()
+            try:
+                verify_ratls(
+                    domain_name,
+                    mrenclave,
+                    signer_key,
+                    collateral_cache,
+                    result_cache,
+                )
+                error = None
+            # Verify the other apps whatever the failure
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                error = str(exc) or type(exc).__name__
+
+            return {
+                "domain_name": domain_name,
+                "success": error is None,
+                "error": error,
+                "duration": round(time.monotonic() - start, 3),
+            }
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(verify, domain_names))
+
+    failed = sum(1 for result in results if not result["success"])
+    for result in results:
+        if result["success"]:
+            LOG.info("Verification successful: %s", result["domain_name"])
+        else:
+            LOG.error(
+                "Verification failed: %s (%s)", result["domain_name"], result["error"]
+            )
+
+    report_path.write_text(
+        json.dumps(
+            {
+                "fingerprint": mrenclave,
+                "passed": len(results) - failed,
+                "failed": failed,
+                "results": results,
+            },
+            indent=4,
+        ),
+        encoding="utf-8",
+    )
+    LOG.info("The verification report has been saved at: %s", report_path)
+
+    if failed:
+        raise RatlsVerificationFailure(
+            f"{failed} out of {len(results)} applications failed the verification"
+        )
+
+    LOG.success("Verification success")  # type: ignore
+
+
+def watch_all(
+    domain_names: List[str],
+    mrenclave: Optional[str],
+    jobs: int,
+    no_cache: bool,
+    interval: float,
+    events_path: Optional[Path],
+):
+    """Verify apps again and again and emit an event for each verification.
+
+    Parameters
+    ----------
+    domain_names : List[str]
+        Domain names of the apps (duplicates are verified once).
+    mrenclave : Optional[str]
+        Expected code fingerprint of all the apps (not checked if None).
+    jobs : int
+        Number of apps verified in parallel.
+    no_cache : bool
+        Whether to verify an unchanged certificate again.
+    interval : float
+        Delay between two verifications of an app (in seconds).
+    events_path : Optional[Path]
+        Path of the JSON lines file of the events (logged if None).
+
+    """
+    domain_names = list(dict.fromkeys(domain_names))
+    if not domain_names:
+        raise BadApplicationInput("No application to verify")
+
+    # The signer key is revalidated regularly during the watch
+    signer_key_cache = SignerKeyCache()
+    if no_cache:
+        SignerKeyCache(max_age=0).get(MSE_CERTIFICATES_URL)
+
+    with watch_caches(no_cache) as (collateral_cache, result_cache):
+
+        def verify(_domain_name: str, ratls_cert: str):
+            """Verify the certificate of an app."""
+            verify_ratls_certificate(
+                ratls_cert,
+                mrenclave,
+                signer_key_cache.get(MSE_CERTIFICATES_URL),
+                collateral_cache,
+                result_cache,
+            )
+
+        LOG.info(
+            "Watching %d applications every %ss (press Ctrl+C to stop)...",
+            len(domain_names),
+            interval,
+        )
+        if events_path:
+            LOG.info("The events are written to: %s", events_path)
+
+        try:
+            Watcher(get_ratls_certificate, verify, event_emitter(events_path)).run(
+                domain_names, interval, jobs
+            )
+        except KeyboardInterrupt:
+            LOG.info("Stopped watching")
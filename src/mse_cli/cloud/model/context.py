@@ -114,6 +114,11 @@ class Context(BaseModel):
         """Get the filename of the code tarball."""
         return "app.tar"
 
+    @staticmethod
+    def get_code_cache_dirname():
+        """Get the dirname of the encrypted code files cache."""
+        return "code_cache"
+
     @staticmethod
     def get_context_filepath(uuid: UUID, create=True) -> Path:
         """Get the path of the context file."""
@@ -148,9 +153,10 @@ class Context(BaseModel):
         return path
 
     @property
-    def encrypted_code_path(self):
-        """Get the path to store the encrypted code."""
-        path = self.workspace / "encrypted_code"
+    def code_cache_path(self):
+        """Get the path to cache the encrypted code files."""
+        assert self.instance
+        path = Context.get_dirpath(self.instance.id) / Context.get_code_cache_dirname()
         os.makedirs(path, exist_ok=True)
         return path
 
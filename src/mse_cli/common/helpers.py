@@ -13,9 +13,10 @@ from docker.models.containers import Container
 from jinja2 import Template
 
 from mse_cli.cloud.api.types import DefaultAppConfig
-from mse_cli.core.bootstrap import is_ready
+from mse_cli.core.bootstrap import close_session, is_ready
 from mse_cli.core.clock_tick import ClockTick
 from mse_cli.core.conf import AppConf, AppConfParsingOption
+from mse_cli.core.container_watcher import ContainerWatcher
 from mse_cli.core.test_docker import TestDockerConfig
 from mse_cli.error import AppContainerError
 from mse_cli.home.model.package import (
@@ -181,23 +182,28 @@ def run_app_test_docker(
         remove=False,
     )
 
-    clock = ClockTick(
-        period=5,
-        timeout=60,
-        message="Test application docker is unreachable!",
-    )
-
-    while clock.tick():
-        # Note: container.status is not actualized.
-        # Get it again to have the current status
-        container = client.containers.get(container_name)
+    url = f"http://localhost:{docker_config.port}"
+    try:
+        with ContainerWatcher(client, container_name) as watcher:
+            clock = ClockTick(
+                period=5,
+                timeout=60,
+                message="Test application docker is unreachable!",
+                sleep=watcher.sleep,
+            )
 
-        if container.status == "exited":
-            raise AppContainerError("Application docker fails to start")
+            while clock.tick():
+                # Note: container.status is not actualized.
+                # The watcher follows it from the Docker events
+                if watcher.status == "exited":
+                    raise AppContainerError("Application docker fails to start")
 
-        if is_ready(f"http://localhost:{docker_config.port}", healthcheck_endpoint):
-            break
+                if is_ready(url, healthcheck_endpoint):
+                    break
+    finally:
+        close_session(url)
 
+    container.reload()
     return container
 
 
@@ -0,0 +1,139 @@
+"""mse_cli.core.async_bootstrap module."""
+
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+from mse_cli.core.bootstrap import (
+    close_session,
+    configure_app,
+    is_ready,
+    is_waiting_for_secrets,
+)
+from mse_cli.error import AppContainerBadState, Timeout
+from mse_cli.log import LOGGER as LOG
+
+
+class BootstrapTarget(BaseModel):
+    """Definition of an enclave to provision with its secrets."""
+
+    name: str
+    url: str
+    healthcheck_endpoint: str
+    payload: Dict[str, Any]
+    verify: Union[bool, str] = True
+    # Raise an error if the enclave has stopped
+    check: Optional[Callable[[], None]] = None
+
+
+async def wait_until_ready(target: BootstrapTarget, period: float):
+    """Hold on until the app of `target` is up.
+
+    The app is probed at once then with a delay doubling up to `period`.
+    """
+    loop = asyncio.get_running_loop()
+    delay = min(0.5, period)
+
+    while True:
+        if target.check:
+            await loop.run_in_executor(None, target.check)
+
+        if await loop.run_in_executor(
+            None, is_ready, target.url, target.healthcheck_endpoint, target.verify
+        ):
+            return
+
+        await asyncio.sleep(delay * (1 + random.uniform(-0.1, 0.1)))
+        delay = min(delay * 2, period)
+
+
+async def provision(target: BootstrapTarget, period: float = 5):
+    """Send the secrets to `target` and wait for its app to be up.
+
+    The blocking HTTP probes of `mse_cli.core.bootstrap` are run in the
+    default executor of the loop, so that many enclaves are provisioned
+    at once while each of them keeps its connections alive until the end of
+    its provisioning.
+
+    """
+    loop = asyncio.get_running_loop()
+
+    try:
+        if not await loop.run_in_executor(
+            None, is_waiting_for_secrets, target.url, target.verify
+        ):
+            raise AppContainerBadState(
+                "The application is not waiting for secrets. Have you already set it?"
+            )
+
+        LOG.info("%s: sending data to the configuration server...", target.name)
+        await loop.run_in_executor(
+            None, configure_app, target.url, target.payload, target.verify
+        )
+
+        LOG.info("%s: configured, waiting for the application...", target.name)
+        await wait_until_ready(target, period)
+    finally:
+        close_session(target.url, target.verify)
+
+    LOG.info("%s: ready!", target.name)
+
+
+async def provision_all(
+    targets: List[BootstrapTarget], jobs: int, timeout: float, period: float = 5
+) -> List[Optional[Exception]]:
+    """Provision all the `targets` concurrently.
+
+    Parameters
+    ----------
+    targets : List[BootstrapTarget]
+        Enclaves to provision.
+    jobs : int
+        Number of enclaves provisioned at once.
+    timeout : float
+        Maximum duration of the provisioning of each enclave (in seconds).
+    period : float
+        Maximum delay between two probes of an app (in seconds).
+
+    Returns
+    -------
+    List[Optional[Exception]]
+        Error of the provisioning of each target (None on success).
+
+    """
+    semaphore = asyncio.Semaphore(jobs)
+
+    async def provision_one(target: BootstrapTarget) -> Optional[Exception]:
+        """Provision `target` once a job is available."""
+        async with semaphore:
+            try:
+                # The timeout starts with the provisioning, not in the queue
+                await asyncio.wait_for(provision(target, period), timeout)
+            except asyncio.TimeoutError:
+                return Timeout(f"The application is unreachable after {timeout}s")
+            # Provision the other enclaves whatever the failure
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                return exc
+
+        return None
+
+    return await asyncio.gather(*(provision_one(target) for target in targets))
+
+
+def bootstrap_all(
+    targets: List[BootstrapTarget], jobs: int, timeout: float, period: float = 5
+) -> List[Optional[Exception]]:
+    """Provision all the `targets` with `jobs` threads running the HTTP probes."""
+
+    async def main() -> List[Optional[Exception]]:
+        """Provision the targets in the event loop."""
+        # A target runs a single probe at a time
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=jobs)
+        )
+        return await provision_all(targets, jobs, timeout, period)
+
+    return asyncio.run(main())
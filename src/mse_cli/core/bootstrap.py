@@ -1,14 +1,22 @@
 """mse_cli.core.bootstrap module."""
 
-from typing import Any, Callable, Dict, Iterable, Optional, Union
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+from urllib.parse import urlsplit
 from uuid import UUID
 
 import requests
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 
 from mse_cli.core.base64 import base64url_encode
 from mse_cli.core.clock_tick import ClockTick
 from mse_cli.error import UnexpectedResponse
+from mse_cli.log import LOGGER as LOG
+
+# Sessions by target (origin of the URL and TLS verification)
+_SESSIONS: Dict[Tuple[str, Union[bool, str]], requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
 
 
 class ConfigurationPayload(BaseModel):
@@ -41,9 +49,70 @@ class ConfigurationPayload(BaseModel):
         return data
 
 
+def get_session(
+    url: str,
+    verify: Union[bool, str] = True,
+    pool_maxsize: int = 4,
+    max_retries: int = 0,
+) -> requests.Session:
+    """Get the HTTP session shared by the requests to the target of `url`.
+
+    The session keeps the connections to the target alive between two
+    requests: the successive probes of a bootstrap are sent on an already
+    open connection, without a new TCP and TLS handshake, as long as the
+    target doesn't close it. `pool_maxsize` and `max_retries` are only used
+    by the first call for a given target: the following ones get the same
+    session. Call `close_session` once done with the target.
+
+    Parameters
+    ----------
+    url : str
+        URL of the target (only its scheme, host and port are considered).
+    verify : Union[bool, str]
+        TLS verification of the target: a boolean or the path of a CA bundle.
+    pool_maxsize : int
+        Number of connections kept alive to the target.
+    max_retries : int
+        Number of retries of a failed connection to the target.
+
+    Returns
+    -------
+    requests.Session
+        Session of the target.
+
+    """
+    parts = urlsplit(url)
+    key = (f"{parts.scheme}://{parts.netloc}".lower(), verify)
+
+    with _SESSIONS_LOCK:
+        if key not in _SESSIONS:
+            session = requests.Session()
+            session.verify = verify
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_maxsize, max_retries=max_retries
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSIONS[key] = session
+
+        return _SESSIONS[key]
+
+
+def close_session(url: str, verify: Union[bool, str] = True):
+    """Close the connections kept alive to the target of `url`, if any."""
+    parts = urlsplit(url)
+    key = (f"{parts.scheme}://{parts.netloc}".lower(), verify)
+
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.pop(key, None)
+
+    if session:
+        session.close()
+
+
 def configure_app(url: str, data: Dict[str, Any], verify: Union[bool, str] = True):
     """Send the secrets to the configuration server."""
-    r = requests.post(
+    r = get_session(url, verify).post(
         url=url,
         json=data,
         headers={"Content-Type": "application/json"},
@@ -73,11 +142,13 @@ def wait_for_conf_server(
         if is_waiting_for_secrets(url, verify):
             break
 
+    LOG.debug("Configuration server ready after %s", clock.summary())
+
 
 def is_waiting_for_secrets(url: str, verify: Union[bool, str] = True) -> bool:
     """Check whether the configuration server is up."""
     try:
-        response = requests.get(url=url, verify=verify, timeout=5)
+        response = get_session(url, verify).get(url=url, verify=verify, timeout=5)
 
         if response.status_code == 200 and "Mse-Status" in response.headers:
             return True
@@ -107,13 +178,15 @@ def wait_for_app_server(
         if is_ready(url, healthcheck_endpoint, verify):
             break
 
+    LOG.debug("Application ready after %s", clock.summary())
+
 
 def is_ready(
     url: str, healthcheck_endpoint: str, verify: Union[bool, str] = True
 ) -> bool:
     """Check whether the app server is up."""
     try:
-        response = requests.get(
+        response = get_session(url, verify).get(
             url=f"{url}{healthcheck_endpoint}",
             verify=verify,
             timeout=5,
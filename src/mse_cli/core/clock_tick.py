@@ -1,26 +1,89 @@
 """mse_cli.core.clock_tick module."""
 
+import random
 import time
+from typing import Any, Callable, List, Optional
 
 from mse_cli.error import Timeout
 
 
 class ClockTick:
-    """Class to monitor the spent time."""
+    """Class to monitor the spent time.
 
-    def __init__(self, period: int, timeout: int, message: str):
+    The first tick returns at once so that a resource already ready is not
+    waited for. The delay between the next ticks starts at `initial_period`
+    and grows by `factor` up to `period`, with a random `jitter` (as a ratio
+    of the delay). The elapsed time is measured with a monotonic clock so
+    that slow probes count towards the `timeout`. A `sleep` function may be
+    given to wake up before the end of the delay (on an event for instance).
+
+    """
+
+    def __init__(
+        self,
+        period: float,
+        timeout: float,
+        message: str,
+        initial_period: Optional[float] = None,
+        factor: float = 2.0,
+        jitter: float = 0.1,
+        sleep: Optional[Callable[[float], Any]] = None,
+    ):
         """Initialize the clock."""
-        self.elapsed = 0
         self.timeout = timeout
         self.period = period
         self.message = message
+        self.initial_period = min(
+            period, 0.5 if initial_period is None else initial_period
+        )
+        self.factor = factor
+        self.jitter = jitter
+        self.sleep = sleep
+
+        self.start: Optional[float] = None
+        self.delay = self.initial_period
+        # Number of ticks and duration of each probe (time between two ticks)
+        self.ticks = 0
+        self.probes: List[float] = []
+        self.last_tick: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Get the time elapsed since the first tick (in seconds)."""
+        return 0.0 if self.start is None else time.monotonic() - self.start
 
     def tick(self) -> bool:
         """Start ticking."""
-        if self.elapsed > self.timeout:
+        now = time.monotonic()
+
+        if self.start is None:
+            # Check first: do not wait before the first probe
+            self.start = self.last_tick = now
+            self.ticks += 1
+            return True
+
+        assert self.last_tick is not None
+        self.probes.append(now - self.last_tick)
+
+        remaining = self.timeout - (now - self.start)
+        if remaining <= 0:
             raise Timeout(self.message)
 
-        time.sleep(self.period)
-        self.elapsed += self.period
+        delay = self.delay * (1 + random.uniform(-self.jitter, self.jitter))
+        (self.sleep or time.sleep)(min(max(delay, 0), remaining))
+        self.delay = min(self.delay * self.factor, self.period)
 
+        self.last_tick = time.monotonic()
+        self.ticks += 1
         return True
+
+    def summary(self) -> str:
+        """Describe the probes run so far."""
+        summary = f"{self.ticks} probe(s) in {self.elapsed:.2f}s"
+        if self.probes:
+            summary += (
+                f" (probe duration: mean {sum(self.probes) / len(self.probes):.2f}s"
+                f", max {max(self.probes):.2f}s)"
+            )
+
+        return summary
@@ -0,0 +1,227 @@
+"""mse_cli.core.collaterals module."""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cryptography import x509
+from cryptography.hazmat.primitives.hashes import SHA256
+from cryptography.hazmat.primitives.serialization import Encoding
+from intel_sgx_ra.attest import retrieve_collaterals
+from intel_sgx_ra.error import CertificateError
+from intel_sgx_ra.pck import sgx_pck_extension_from_cert
+from intel_sgx_ra.quote import Quote
+
+from mse_cli import MSE_CONF_DIR
+from mse_cli.log import LOGGER as LOG
+
+Collaterals = Tuple[
+    bytes,
+    bytes,
+    x509.Certificate,
+    x509.CertificateRevocationList,
+    x509.CertificateRevocationList,
+]
+
+
+def parse_date(date: str) -> datetime:
+    """Parse an ISO 8601 date of a PCCS collateral."""
+    # Python 3.8 does not parse the zero designator Z
+    return datetime.fromisoformat(date.replace("Z", "+00:00"))
+
+
+def validity(collaterals: Collaterals) -> Tuple[datetime, datetime]:
+    """Get the period all the collaterals are valid in.
+
+    Parameters
+    ----------
+    collaterals : Collaterals
+        TCB info, Quoting Enclave identity, Intel SGX TCB signing certificate,
+        Intel SGX Root CA CRL, Intel SGX PCK Platform/Processor CA CRL.
+
+    Returns
+    -------
+    Tuple[datetime, datetime]
+        Latest issue date and earliest next update of the collaterals.
+
+    """
+    (tcb_info, qe_identity, _, root_ca_crl, pck_ca_crl) = collaterals
+
+    tcb = json.loads(tcb_info)["tcbInfo"]
+    identity = json.loads(qe_identity)["enclaveIdentity"]
+
+    issued: List[datetime] = [
+        parse_date(tcb["issueDate"]),
+        parse_date(identity["issueDate"]),
+        root_ca_crl.last_update_utc,
+        pck_ca_crl.last_update_utc,
+    ]
+    next_updates: List[datetime] = [
+        parse_date(tcb["nextUpdate"]),
+        parse_date(identity["nextUpdate"]),
+    ]
+    for crl in (root_ca_crl, pck_ca_crl):
+        if crl.next_update_utc is not None:
+            next_updates.append(crl.next_update_utc)
+
+    return max(issued), min(next_updates)
+
+
+class CollateralCache:
+    """On-disk cache of the collaterals retrieved from a PCCS.
+
+    The collaterals only depend on the platform of the enclave: an entry is
+    keyed on the PCCS, the FMSPC and the PCK CA certificate of the quote, and
+    the Intel SGX Root CA certificate. An entry is used as long as all its
+    collaterals are valid, that is until the earliest `nextUpdate` of the TCB
+    info, the Quoting Enclave identity and the CRLs.
+
+    The cache can be shared by threads: the collaterals of a platform are
+    then retrieved once from the PCCS, while the ones of other platforms are
+    retrieved at the same time.
+
+    """
+
+    def __init__(self, path: Path = MSE_CONF_DIR / "collaterals_cache"):
+        """Open the cache stored in the directory `path`."""
+        self.path = path
+        # Guard `key_locks` only, never held during a read or a request
+        self.lock = threading.Lock()
+        self.key_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(quote: Quote, pccs_url: str) -> str:
+        """Get the key of the collaterals of `quote` retrieved from `pccs_url`.
+
+        Parameters
+        ----------
+        quote : Quote
+            Intel SGX quote to verify.
+        pccs_url : str
+            URL of the PCCS.
+
+        Returns
+        -------
+        str
+            Key of the entry.
+
+        """
+        pck_cert, pck_ca_cert, root_ca_cert = [
+            x509.load_pem_x509_certificate(raw_cert) for raw_cert in quote.certs()
+        ]
+
+        # The CA type (platform or processor) is given by the PCK CA certificate
+        # whose fingerprint also binds the entry to the certification chain
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    pccs_url.rstrip("/"),
+                    sgx_pck_extension_from_cert(pck_cert).fmspc.hex(),
+                    pck_ca_cert.fingerprint(SHA256()).hex(),
+                    root_ca_cert.fingerprint(SHA256()).hex(),
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str, now: Optional[datetime] = None) -> Optional[Collaterals]:
+        """Get the collaterals of the entry `key` (None if missing or outdated)."""
+        try:
+            data = json.loads((self.path / key).read_text(encoding="utf-8"))
+            collaterals = (
+                base64.b64decode(data["tcb_info"].encode("utf-8")),
+                base64.b64decode(data["qe_identity"].encode("utf-8")),
+                x509.load_pem_x509_certificate(data["tcb_cert"].encode("utf-8")),
+                x509.load_pem_x509_crl(data["root_ca_crl"].encode("utf-8")),
+                x509.load_pem_x509_crl(data["pck_ca_crl"].encode("utf-8")),
+            )
+            (issued, next_update) = validity(collaterals)
+        except FileNotFoundError:
+            return None
+        except (KeyError, ValueError) as exc:
+            LOG.debug("Ignoring the malformed collaterals entry %s: %s", key, exc)
+            return None
+
+        now = now or datetime.now(timezone.utc)
+        if not issued <= now < next_update:
+            LOG.debug("The collaterals entry %s is outdated", key)
+            return None
+
+        return collaterals
+
+    def put(self, key: str, collaterals: Collaterals, now: Optional[datetime] = None):
+        """Set the collaterals of the entry `key` and remove the outdated entries."""
+        (tcb_info, qe_identity, tcb_cert, root_ca_crl, pck_ca_crl) = collaterals
+
+        # Write then rename to never leave a partial entry
+        tmp_entry = self.path / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_entry.write_text(
+            json.dumps(
+                {
+                    "tcb_info": base64.b64encode(tcb_info).decode("utf-8"),
+                    "qe_identity": base64.b64encode(qe_identity).decode("utf-8"),
+                    "tcb_cert": tcb_cert.public_bytes(Encoding.PEM).decode("utf-8"),
+                    "root_ca_crl": root_ca_crl.public_bytes(Encoding.PEM).decode(
+                        "utf-8"
+                    ),
+                    "pck_ca_crl": pck_ca_crl.public_bytes(Encoding.PEM).decode("utf-8"),
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_entry, self.path / key)
+
+        for entry in self.path.iterdir():
+            # Skip the entries being written by another process or thread
+            if entry.suffix == ".tmp" or entry.name == key:
+                continue
+
+            if self.get(entry.name, now) is None:
+                entry.unlink(missing_ok=True)
+
+    def retrieve(self, quote: Quote, pccs_url: str) -> Collaterals:
+        """Get the collaterals of `quote` from the cache or else from `pccs_url`.
+
+        Parameters
+        ----------
+        quote : Quote
+            Intel SGX quote to verify.
+        pccs_url : str
+            URL of the PCCS.
+
+        Returns
+        -------
+        Collaterals
+            TCB info, Quoting Enclave identity, Intel SGX TCB signing certificate,
+            Intel SGX Root CA CRL, Intel SGX PCK Platform/Processor CA CRL.
+
+        """
+        try:
+            key = CollateralCache.key(quote, pccs_url)
+        except (CertificateError, ValueError) as exc:
+            # Let the PCCS client report the malformed certificates
+            LOG.debug("Can't cache the collaterals of the quote: %s", exc)
+            return retrieve_collaterals(quote, pccs_url)
+
+        if collaterals := self.get(key):
+            LOG.debug("Collaterals read from the cache")
+            return collaterals
+
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have retrieved them in the meantime
+            if collaterals := self.get(key):
+                LOG.debug("Collaterals read from the cache")
+                return collaterals
+
+            collaterals = retrieve_collaterals(quote, pccs_url)
+            self.put(key, collaterals)
+
+        return collaterals
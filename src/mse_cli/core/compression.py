@@ -0,0 +1,65 @@
+"""mse_cli.core.compression module."""
+
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+# Good trade-off between ratio and speed for docker layers
+ZSTD_LEVEL = 3
+
+
+def check_zstd():
+    """Check the optional zstd support is installed."""
+    if zstandard is None:
+        raise ModuleNotFoundError(
+            "zstd compression requires the `zstd` extra: pip install mse-cli[zstd]"
+        )
+
+
+@contextmanager
+def zstd_writer(f: BinaryIO, threads: int = -1) -> Iterator[BinaryIO]:
+    """Compress with zstd all the bytes written into the yielded stream.
+
+    Parameters
+    ----------
+    f : BinaryIO
+        Writable stream to write the compressed bytes into.
+    threads : int
+        Number of compression threads (-1 to use all the CPUs).
+
+    Yields
+    -------
+    BinaryIO
+        Writable stream of the bytes to compress. `f` is left open.
+
+    """
+    check_zstd()
+
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=threads)
+    with compressor.stream_writer(f, closefd=False) as writer:
+        yield writer
+
+
+@contextmanager
+def zstd_reader(f: BinaryIO) -> Iterator[BinaryIO]:
+    """Decompress with zstd the bytes read from `f` while reading them.
+
+    Parameters
+    ----------
+    f : BinaryIO
+        Readable stream of compressed bytes.
+
+    Yields
+    -------
+    BinaryIO
+        Readable stream of the decompressed bytes. `f` is left open.
+
+    """
+    check_zstd()
+
+    with zstandard.ZstdDecompressor().stream_reader(f, closefd=False) as reader:
+        yield reader
@@ -0,0 +1,137 @@
+"""mse_cli.core.container_watcher module."""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from docker.client import DockerClient
+from docker.errors import NotFound
+
+from mse_cli.error import AppContainerNotRunning
+from mse_cli.log import LOGGER as LOG
+
+
+class ContainerWatcher:
+    """Follow the state of a container through the Docker events.
+
+    A thread listens to the events of the container and keeps its `status`
+    (and `health` if it has a healthcheck) up to date, so that the waiters
+    don't have to inspect the container again and again. The threads
+    sleeping in `sleep` are woken up as soon as an event is received.
+
+    If the events can't be listened to anymore, the container is inspected
+    each time its state is read instead.
+
+    """
+
+    def __init__(self, client: DockerClient, name: str):
+        """Start watching the container `name`."""
+        self.client = client
+        self.name = name
+
+        self._status: str = "created"
+        self.health: Optional[str] = None
+        self.exit_code: Optional[int] = None
+        self.changed = threading.Condition()
+
+        # Subscribe before inspecting to not miss an event in between
+        self.events = client.events(
+            decode=True, filters={"type": "container", "container": name}
+        )
+        self.listening = True
+        self.refresh()
+
+        self.thread = threading.Thread(target=self.listen, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        """Enter the context of the watcher."""
+        return self
+
+    def __exit__(self, *exc):
+        """Stop watching the container."""
+        self.close()
+
+    def refresh(self):
+        """Read the state of the container by inspecting it."""
+        try:
+            container = self.client.containers.get(self.name)
+        except NotFound:
+            status, health = "removed", None
+        else:
+            status = container.status
+            health = container.attrs.get("State", {}).get("Health", {}).get("Status")
+
+        with self.changed:
+            self._status = status
+            self.health = health
+            self.changed.notify_all()
+
+    def update(self, event: Dict[str, Any]):
+        """Update the state of the container from a Docker `event`."""
+        action: str = event.get("Action", event.get("status", ""))
+        attributes = event.get("Actor", {}).get("Attributes", {})
+
+        with self.changed:
+            if action == "start":
+                self._status = "running"
+            elif action == "die":
+                self._status = "exited"
+                if "exitCode" in attributes:
+                    self.exit_code = int(attributes["exitCode"])
+            elif action == "destroy":
+                self._status = "removed"
+            elif action.startswith("health_status:"):
+                self.health = action.split(":", 1)[1].strip()
+            else:
+                return
+
+            self.changed.notify_all()
+
+    def listen(self):
+        """Update the state of the container on each event until closed."""
+        try:
+            for event in self.events:
+                self.update(event)
+        # Fall back on the inspection whatever the failure
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            LOG.debug("Docker events of %s not listened anymore: %s", self.name, exc)
+
+        with self.changed:
+            self.listening = False
+            self.changed.notify_all()
+
+    def sleep(self, delay: float):
+        """Sleep `delay` seconds or until the state of the container changes."""
+        with self.changed:
+            if self.listening:
+                self.changed.wait(delay)
+                return
+
+        # Wait for the whole delay without events
+        time.sleep(delay)
+
+    @property
+    def status(self) -> str:
+        """Get the status of the container."""
+        if not self.listening:
+            self.refresh()
+
+        return self._status
+
+    def is_running(self) -> bool:
+        """Test whether the container is running."""
+        return self.status == "running"
+
+    def check(self):
+        """Raise an error if the container is not running."""
+        if not self.is_running():
+            raise AppContainerNotRunning(
+                f"Your application '{self.name}' is not running. "
+                "Run `mse home logs` for more details"
+            )
+
+    def close(self):
+        """Stop listening to the events."""
+        self.events.close()
+        self.thread.join(timeout=5)
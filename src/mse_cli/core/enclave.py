@@ -1,27 +1,29 @@
 """mse_cli.core.enclave module."""
 
 import logging
-import re
 import uuid
 from pathlib import Path
 from typing import Optional, Tuple, Union
 
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
-from cryptography.x509 import Certificate, CertificateRevocationList
+from cryptography.x509 import (
+    Certificate,
+    CertificateRevocationList,
+    load_der_x509_certificate,
+)
 from docker.client import DockerClient
 from docker.errors import NotFound
-from intel_sgx_ra.attest import verify_quote
+from intel_sgx_ra.attest import retrieve_collaterals, verify_quote
 from intel_sgx_ra.maa.attest import verify_quote as azure_verify_quote
 from intel_sgx_ra.ratls import ratls_verify
 from intel_sgx_ra.signer import mr_signer_from_pk
 
-from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
-from mse_cli.error import (
-    AppContainerError,
-    RatlsVerificationFailure,
-    WrongMREnclave,
-    WrongMRSigner,
-)
+from mse_cli.core.collaterals import CollateralCache
+from mse_cli.core.measurement_worker import MeasurementWorker
+from mse_cli.core.mr_enclave_cache import MREnclaveCache
+from mse_cli.core.no_sgx_docker import NoSgxDockerConfig, parse_mr_enclave
+from mse_cli.core.verification_cache import VerificationCache, certificate_der
+from mse_cli.error import AppContainerError, WrongMREnclave, WrongMRSigner
 
 
 def compute_mr_enclave(
@@ -30,9 +32,51 @@ def compute_mr_enclave(
     app_args: NoSgxDockerConfig,
     app_path: Path,
     docker_path_log: Path,
+    cache: Optional[MREnclaveCache] = None,
+    worker: Optional[MeasurementWorker] = None,
+    container_name: Optional[str] = None,
 ) -> str:
-    """Compute the MR enclave."""
-    container_name = str(uuid.uuid4())
+    """Compute the MR enclave.
+
+    If `cache` is given, the MR enclave already computed for the same image,
+    arguments and code is read from it instead of running the docker.
+    If `worker` is given, the MR enclave is computed in its running container
+    instead of a new one. Otherwise, the new container is named `container_name`
+    (random if None).
+
+    """
+    key = MREnclaveCache.key(client, image, app_args, app_path) if cache else None
+    if cache and key and (mrenclave := cache.get(key)):
+        logging.info("MRENCLAVE read from the cache")
+        return mrenclave
+
+    mrenclave = (
+        worker.measure(app_args, app_path, docker_path_log)
+        if worker
+        else run_mr_enclave(
+            client, image, app_args, app_path, docker_path_log, container_name
+        )
+    )
+
+    if cache:
+        # The image is now pulled if it was not before
+        key = key or MREnclaveCache.key(client, image, app_args, app_path)
+        if key:
+            cache.put(key, mrenclave)
+
+    return mrenclave
+
+
+def run_mr_enclave(
+    client: DockerClient,
+    image: str,
+    app_args: NoSgxDockerConfig,
+    app_path: Path,
+    docker_path_log: Path,
+    container_name: Optional[str] = None,
+) -> str:
+    """Compute the MR enclave by running the docker without SGX."""
+    container_name = container_name or str(uuid.uuid4())
     output = b""
 
     try:
@@ -65,16 +109,7 @@ def compute_mr_enclave(
         except NotFound:
             pass
 
-    # Get the mr_enclave from the docker output
-    pattern = "Measurement:\n[ ]*([a-z0-9]{64})"
-    m = re.search(pattern.encode("utf-8"), output)
-
-    if not m:
-        raise RatlsVerificationFailure(
-            f"Fail to compute mr_enclave! See {docker_path_log} for more details."
-        )
-
-    return str(m.group(1).decode("utf-8"))
+    return parse_mr_enclave(output, docker_path_log)
 
 
 def verify_enclave(
@@ -91,13 +126,41 @@ def verify_enclave(
         ]
     ] = None,
     pccs_url: Optional[str] = None,
+    collateral_cache: Optional[CollateralCache] = None,
+    mr_signer: Optional[bytes] = None,
+    result_cache: Optional[VerificationCache] = None,
 ):
-    """Verify an enclave trustworthiness."""
+    """Verify an enclave trustworthiness.
+
+    If `collateral_cache` is given, the collaterals retrieved from `pccs_url`
+    are read from it while they are valid. If `mr_signer` is given, it is used
+    instead of computing the MRSIGNER of `signer_pk`. If `result_cache` is
+    given, a certificate already verified with the same collaterals and
+    expected values is not verified again.
+
+    """
     # Compute MRSIGNER value from public key
-    mrsigner = mr_signer_from_pk(signer_pk)
+    mrsigner = mr_signer or mr_signer_from_pk(signer_pk)
 
     # Check certificate's public key in quote's user report data
-    quote = ratls_verify(ratls_certificate)
+    certificate = load_der_x509_certificate(certificate_der(ratls_certificate))
+    quote = ratls_verify(certificate)
+
+    if collaterals is None and pccs_url is not None:
+        # The collaterals only depend on the certificates of the quote
+        collaterals = (
+            collateral_cache.retrieve(quote, pccs_url)
+            if collateral_cache
+            else retrieve_collaterals(quote, pccs_url)
+        )
+
+    # The result is cached with the collaterals the quote is verified with
+    key = None
+    if result_cache is not None and collaterals is not None:
+        key = VerificationCache.key(certificate, mrsigner, fingerprint, collaterals)
+        if result_cache.get(key):
+            logging.info("Verification result read from the cache")
+            return
 
     # Check MRSIGNER
     if quote.report_body.mr_signer != mrsigner:
@@ -110,12 +173,13 @@ def verify_enclave(
     logging.info("MRSIGNER: %s", quote.report_body.mr_signer.hex())
     logging.info("MRENCLAVE: %s", quote.report_body.mr_enclave.hex())
 
-    if collaterals is None and pccs_url is None:
+    if collaterals is None:
         # Azure DCAP attestation through MAA service
         azure_verify_quote(quote=quote)
     else:
-        # Intel DCAP attestation using PCCS url or directly collaterals if provided
-        verify_quote(quote=quote, collaterals=collaterals, pccs_url=pccs_url)
+        # Intel DCAP attestation with the collaterals provided or retrieved
+        # from the PCCS (never requested again by `verify_quote`)
+        verify_quote(quote=quote, collaterals=collaterals, pccs_url=None)
 
     # Check MRENCLAVE
     if fingerprint:
@@ -125,3 +189,7 @@ def verify_enclave(
                 f"(read {bytes(quote.report_body.mr_enclave).hex()} "
                 f"but should be {fingerprint})"
             )
+
+    if result_cache is not None and key is not None:
+        assert collaterals is not None
+        result_cache.put(key, certificate, collaterals)
@@ -0,0 +1,302 @@
+"""mse_cli.core.encrypted_tar module."""
+
+import hashlib
+import io
+import os
+import struct
+import tarfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from mse_lib_crypto.error import NonceNotFound
+from mse_lib_crypto.xsalsa20_poly1305 import NONCE_LENGTH, encrypt
+
+from mse_cli.core.fs import ls, open_tar
+from mse_cli.core.ignore_file import IgnoreMatcher
+
+ENCRYPTED_FILE_EXT = ".enc"
+
+
+def add_file(
+    tar_file: tarfile.TarFile,
+    f: BinaryIO,
+    arcname: str,
+    data: Optional[bytes] = None,
+):
+    """Append the opened file `f` to `tar_file` as `arcname`.
+
+    Parameters
+    ----------
+    tar_file : tarfile.TarFile
+        Tarball opened in write mode.
+    f : BinaryIO
+        File opened in binary mode to take the metadata (and the content) from.
+    arcname : str
+        Name of the member in the tarball.
+    data : Optional[bytes]
+        Content of the member if different from the content of `f`.
+
+    """
+    # Use `fileobj` to follow symlinks like a copy of the directory would do
+    info = tar_file.gettarinfo(arcname=arcname, fileobj=f)
+
+    if data is None:
+        tar_file.addfile(info, f)
+    else:
+        info.size = len(data)
+        tar_file.addfile(info, io.BytesIO(data))
+
+
+def key_digest(key: bytes) -> bytes:
+    """Get the SHA-256 identifying the encryption `key` in the cache."""
+    return hashlib.sha256(key).digest()
+
+
+def cache_entry_name(rel_path: Path, key: bytes) -> str:
+    """Get the name of the cache entry of the file `rel_path` encrypted with `key`."""
+    return hashlib.sha256(key_digest(key) + f"{rel_path}".encode("utf-8")).hexdigest()
+
+
+def cache_header(path: Path, key: bytes, nonce: bytes) -> bytes:
+    """Get the header of the cache entry of the file `path` in its current state.
+
+    The file is identified by its size, modification and change times and inode
+    rather than its content, so that an unchanged file is never read.
+
+    """
+    stat = os.stat(path)
+
+    return (
+        struct.pack(
+            ">QQQQ", stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino
+        )
+        + key_digest(key)
+        + nonce
+    )
+
+
+def read_and_encrypt(
+    path: Path, key: bytes, nonce: bytes, cache_entry: Optional[Path] = None
+) -> bytes:
+    """Read the file `path` and encrypt its content using XSalsa20-Poly1305.
+
+    If `cache_entry` holds the ciphertext of the file in the same state with the
+    same key and nonce, the ciphertext is read from it without reading the file.
+    Otherwise `cache_entry` is updated with the new ciphertext.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the file to encrypt.
+    key : bytes
+        Symmetric key used for encryption.
+    nonce : bytes
+        Nonce used for encryption.
+    cache_entry : Optional[Path]
+        Path to the cache entry of `path`.
+
+    Returns
+    -------
+    bytes
+        Ciphertext of the file content.
+
+    """
+    if cache_entry is None:
+        return encrypt(path.read_bytes(), key, nonce)
+
+    # Taken before reading the file: a later change is seen by the next call
+    header = cache_header(path, key, nonce)
+
+    try:
+        with open(cache_entry, "rb") as f:
+            if f.read(len(header)) == header:
+                return f.read()
+    except FileNotFoundError:
+        pass
+
+    ciphertext = encrypt(path.read_bytes(), key, nonce)
+
+    # Write then rename to never leave a partial entry
+    tmp_entry = cache_entry.with_suffix(".tmp")
+    tmp_entry.write_bytes(header + ciphertext)
+    os.replace(tmp_entry, cache_entry)
+
+    return ciphertext
+
+
+def prune_cache(cache_path: Path, rel_paths: Iterable[str], key: bytes):
+    """Remove the cache entries except the ones of `rel_paths` encrypted with `key`."""
+    entries = {cache_entry_name(Path(rel_path), key) for rel_path in rel_paths}
+
+    for entry in cache_path.iterdir():
+        if entry.name not in entries:
+            entry.unlink()
+
+
+def files_to_archive(
+    dir_path: Path,
+    nonces: Optional[Dict[str, bytes]],
+    exceptions: List[str],
+    ignore: Optional[IgnoreMatcher],
+    nonce_map: Dict[str, bytes],
+) -> Iterator[Tuple[Path, Path, Optional[bytes]]]:
+    """Yield the files of `dir_path` to archive with their nonce (None if clear).
+
+    The nonce used for each encrypted file is also recorded in `nonce_map`.
+
+    """
+    for path in ls(dir_path, ignore=ignore):
+        rel_path: Path = path.relative_to(dir_path)
+
+        if path.name in exceptions:
+            yield (path, rel_path, None)
+            continue
+
+        if nonces is not None and f"{rel_path}" not in nonces:
+            raise NonceNotFound(f"Path '{rel_path}' not found in nonces")
+
+        nonce: bytes = (
+            nonces[f"{rel_path}"] if nonces is not None else os.urandom(NONCE_LENGTH)
+        )
+        nonce_map[f"{rel_path}"] = nonce
+
+        yield (path, rel_path, nonce)
+
+
+def encrypt_files(
+    files: Iterator[Tuple[Path, Path, Optional[bytes]]],
+    key: bytes,
+    jobs: int,
+    cache_path: Optional[Path] = None,
+) -> Iterator[Tuple[Path, Path, Optional[bytes]]]:
+    """Yield `files` in the same order with their ciphertext (None if clear).
+
+    With `jobs` greater than 1, the files are encrypted by a pool of processes.
+    Only a bounded number of ciphertexts is kept in memory ahead of the consumer.
+
+    """
+
+    def cache_entry(rel_path: Path) -> Optional[Path]:
+        """Get the cache entry of the file `rel_path` (if the cache is enabled)."""
+        return cache_path / cache_entry_name(rel_path, key) if cache_path else None
+
+    if jobs == 1:
+        for path, rel_path, nonce in files:
+            yield (
+                path,
+                rel_path,
+                read_and_encrypt(path, key, nonce, cache_entry(rel_path))
+                if nonce is not None
+                else None,
+            )
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: Deque[Tuple[Path, Path, Optional[Future]]] = deque()
+
+        for path, rel_path, nonce in files:
+            pending.append(
+                (
+                    path,
+                    rel_path,
+                    executor.submit(
+                        read_and_encrypt, path, key, nonce, cache_entry(rel_path)
+                    )
+                    if nonce is not None
+                    else None,
+                )
+            )
+
+            if len(pending) >= 2 * jobs:
+                path, rel_path, future = pending.popleft()
+                yield (path, rel_path, future.result() if future else None)
+
+        while pending:
+            path, rel_path, future = pending.popleft()
+            yield (path, rel_path, future.result() if future else None)
+
+
+def encrypt_tar(
+    dir_path: Path,
+    tar_path: Union[Path, BinaryIO],
+    key: bytes,
+    nonces: Optional[Dict[str, bytes]],
+    exceptions: List[str],
+    ignore: Optional[IgnoreMatcher],
+    jobs: int = 1,
+    cache_path: Optional[Path] = None,
+) -> Dict[str, bytes]:
+    """Encrypt the content of `dir_path` straight into the tarball `tar_path`.
+
+    Each file is read once, encrypted in memory using XSalsa20-Poly1305 and
+    appended to the tarball with the `.enc` suffix. No intermediate directory
+    is written on disk. The tarball is the same whatever the number of `jobs`.
+
+    If `cache_path` is given, the ciphertext of each file is kept there keyed on
+    its relative path, its size and times, the `key` and its nonce. Only the
+    files which changed since the previous call are read and encrypted again.
+    The cache only pays off when the `nonces` of the previous call are reused.
+
+    Parameters
+    ----------
+    dir_path : Path
+        Path to the directory to be encrypted.
+    tar_path : Union[Path, BinaryIO]
+        Path to output the tar file created or writable stream.
+    key : bytes
+        Symmetric key used for encryption.
+    nonces : Optional[Dict[str, bytes]]
+        Map of string path to nonce. Randomly generated if None.
+    exceptions : List[str]
+        List of filenames which won't be encrypted.
+    ignore : Optional[IgnoreMatcher]
+        Gitignore-like rules of the paths which won't be archived.
+    jobs : int
+        Number of processes used to encrypt the files.
+    cache_path : Optional[Path]
+        Directory of the encrypted files cache.
+
+    Returns
+    -------
+    Dict[str, bytes]
+        Map of path string to nonce used to encrypt.
+
+    """
+    if not dir_path.is_dir():
+        raise NotADirectoryError(f"`{dir_path}` does not exist")
+
+    if jobs < 1:
+        raise ValueError("The number of jobs should be greater than 0")
+
+    dir_path = dir_path.absolute()
+    nonce_map: Dict[str, bytes] = {}
+
+    with open_tar(tar_path) as tar_file:
+        for path, rel_path, data in encrypt_files(
+            files_to_archive(dir_path, nonces, exceptions, ignore, nonce_map),
+            key,
+            jobs,
+            cache_path,
+        ):
+            with open(path, "rb") as f:
+                if data is None:
+                    add_file(tar_file, f, f"{rel_path}")
+                else:
+                    add_file(tar_file, f, f"{rel_path}{ENCRYPTED_FILE_EXT}", data)
+
+    if cache_path:
+        prune_cache(cache_path, nonce_map, key)
+
+    return nonce_map
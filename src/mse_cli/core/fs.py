@@ -1,8 +1,11 @@
 """mse_cli.core.fs module."""
 
+import os
 import tarfile
 from pathlib import Path
-from typing import Iterator, List
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+from mse_cli.core.ignore_file import IgnoreMatcher
 
 
 def whitelist() -> List[str]:
@@ -27,15 +30,25 @@ def is_hidden(path: Path) -> bool:
     return any((part.startswith(".") for part in path.parts))
 
 
-def ls(dir_path: Path, dot_files: bool = False) -> Iterator[Path]:
+def ls(
+    dir_path: Path,
+    dot_files: bool = False,
+    ignore: Optional[IgnoreMatcher] = None,
+) -> Iterator[Path]:
     """Recursive listing of files `dir_path`.
 
+    Hidden and ignored directories are pruned before being walked through.
+    Files are yielded in the same order as `sorted(dir_path.rglob("*"))` but
+    only the entries of the directories being walked through are kept in memory.
+
     Parameters
     ----------
     dir_path : Path
         Path to the directory.
     dot_files : bool
         Whether you want to list dot files.
+    ignore : Optional[IgnoreMatcher]
+        Gitignore-like rules of the paths (relative to `dir_path`) to skip.
 
     Yields
     -------
@@ -43,31 +56,92 @@ def ls(dir_path: Path, dot_files: bool = False) -> Iterator[Path]:
         Path to a file within `dir_path`.
 
     """
-    for path in sorted(dir_path.absolute().rglob("*")):  # type: Path
-        if path.is_file():
-            if not dot_files and not is_hidden(path.relative_to(dir_path)):
-                yield path
+    yield from walk(dir_path.absolute(), "", dot_files, ignore)
+
+
+def walk(
+    dir_path: Path,
+    rel_prefix: str,
+    dot_files: bool,
+    ignore: Optional[IgnoreMatcher],
+) -> Iterator[Path]:
+    """Yield the files of `dir_path` whose path relative to the root is prefixed."""
+    with os.scandir(dir_path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        if not dot_files and entry.name.startswith("."):
+            continue
+
+        rel_path: str = f"{rel_prefix}{entry.name}"
+        # Do not follow symlinks to directories to avoid loops
+        is_dir: bool = entry.is_dir(follow_symlinks=False)
 
+        # Parent directories have already been checked while walking
+        if ignore and ignore.is_ignored(rel_path, is_dir):
+            continue
 
-def tar(dir_path: Path, tar_path: Path, dot_files: bool = False) -> Path:
+        if is_dir:
+            yield from walk(Path(entry.path), f"{rel_path}/", dot_files, ignore)
+        elif entry.is_file():
+            yield Path(entry.path)
+
+
+def open_tar(
+    tar_path: Union[Path, BinaryIO], dereference: bool = False
+) -> tarfile.TarFile:
+    """Open the tarball `tar_path` in write mode.
+
+    Parameters
+    ----------
+    tar_path : Union[Path, BinaryIO]
+        Path to the tar file or writable stream to write the tarball into.
+    dereference : bool
+        Whether to add the content of the symlinks instead of the symlinks.
+
+    Returns
+    -------
+    tarfile.TarFile
+        Tarball opened in write mode.
+
+    """
+    if isinstance(tar_path, Path):
+        return tarfile.open(tar_path, "w:", dereference=dereference)
+
+    # A stream is written sequentially without seeking
+    return tarfile.open(fileobj=tar_path, mode="w|", dereference=dereference)
+
+
+def tar(
+    dir_path: Path,
+    tar_path: Union[Path, BinaryIO],
+    dot_files: bool = False,
+    ignore: Optional[IgnoreMatcher] = None,
+) -> Union[Path, BinaryIO]:
     """Tar directory `dir_path` to `tar_path`.
 
     Parameters
     ----------
     dir_path : Path
         Directory path to tar.
-    tar_path : Path
-        Path to output the tar file created.
+    tar_path : Union[Path, BinaryIO]
+        Path to output the tar file created or writable stream.
     dot_files : bool
+        Whether you want to tar dot files.
+    ignore : Optional[IgnoreMatcher]
+        Gitignore-like rules of the paths (relative to `dir_path`) to skip.
 
     Returns
     -------
-    Path
-        Path to the tar file created.
+    Union[Path, BinaryIO]
+        Path to the tar file created or the stream.
 
     """
-    with tarfile.open(tar_path, "w:") as tar_file:
-        for path in ls(dir_path, dot_files):
+    dir_path = dir_path.absolute()
+
+    # Follow symlinks to files like a copy of the directory would do
+    with open_tar(tar_path, dereference=True) as tar_file:
+        for path in ls(dir_path, dot_files, ignore):
             rel_path: Path = path.relative_to(dir_path)
             tar_file.add(path, rel_path)
 
@@ -1,23 +1,188 @@
 """mse_cli.core.ignore_file module."""
 
-from pathlib import Path
+import re
+from pathlib import Path, PurePosixPath
+from typing import Iterable, List, Optional, Pattern, Tuple, Union
+
+
+def translate_class(pattern: str, i: int) -> Tuple[str, int]:
+    """Translate the character class starting at `pattern[i]`.
+
+    Returns the regular expression and the index of the closing bracket.
+
+    """
+    n = len(pattern)
+    j = i + 1
+    if j < n and pattern[j] in "!^":
+        j += 1
+    if j < n and pattern[j] == "]":
+        j += 1
+    while j < n and pattern[j] != "]":
+        j += 1
+
+    # No closing bracket: `[` is a regular character
+    if j >= n:
+        return (re.escape("["), i)
+
+    stuff = pattern[i + 1 : j].replace("\\", "\\\\")
+    if stuff[0] in "!^":
+        # A negated class does not match the separator either
+        stuff = "^/" + stuff[1:]
+
+    return (f"[{stuff}]", j)
+
+
+def translate(pattern: str) -> str:
+    """Translate a gitignore-like glob `pattern` into a regular expression.
+
+    `*` and `?` do not match `/`, a leading `**/` matches any number of
+    directories, `/**/` zero or more directories and a trailing `/**`
+    everything inside a directory.
+
+    """
+    i, n = 0, len(pattern)
+    res: List[str] = []
+
+    while i < n:
+        c = pattern[i]
+
+        if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+            if pattern.startswith("**/", i):
+                res.append("(?:.*/)?")
+                i += 3
+                continue
+
+            if i + 2 == n:
+                res.append(".*")
+                i += 2
+                continue
+
+        if c == "*":
+            res.append("[^/]*")
+            # Other consecutive asterisks are considered as regular asterisks
+            while i + 1 < n and pattern[i + 1] == "*":
+                i += 1
+        elif c == "?":
+            res.append("[^/]")
+        elif c == "[":
+            regex, i = translate_class(pattern, i)
+            res.append(regex)
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            res.append(re.escape(pattern[i]))
+        else:
+            res.append(re.escape(c))
+
+        i += 1
+
+    return "".join(res)
+
+
+class IgnoreMatcher:
+    """Gitignore-like matcher of relative paths.
+
+    Rules support negation (`!`), directory-only rules (trailing `/`),
+    anchored rules (containing a `/`) and `**`. The last matching rule wins.
+
+    All the rules are compiled into one regular expression for the files and
+    one for the directories. A path is thus matched in a single call to the
+    regex engine instead of a Python loop over the rules, though the engine
+    still tries the alternatives one by one.
+
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """Compile the rules from `patterns`."""
+        rules: List[Tuple[str, bool, bool]] = [
+            rule for rule in map(IgnoreMatcher.parse_rule, patterns) if rule
+        ]
+
+        self.negated: List[bool] = [negated for (_, negated, _) in rules]
+        self.dir_regex = IgnoreMatcher.compile(
+            [(i, regex) for i, (regex, _, _) in enumerate(rules)]
+        )
+        self.file_regex = IgnoreMatcher.compile(
+            [(i, regex) for i, (regex, _, dir_only) in enumerate(rules) if not dir_only]
+        )
+
+    @staticmethod
+    def parse_rule(line: str) -> Optional[Tuple[str, bool, bool]]:
+        """Parse `line` into a (regex, negated, dir_only) rule."""
+        line = line.strip()
+
+        # Ignore empty lines and comments
+        if not line or line.startswith("#"):
+            return None
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        if dir_only:
+            line = line[:-1]
+
+        # A rule with a separator is relative to the root of the directory
+        anchored = "/" in line
+        if line.startswith("/"):
+            line = line[1:]
+
+        if not line:
+            return None
+
+        regex = translate(line)
+
+        return (regex if anchored else f"(?:.*/)?{regex}", negated, dir_only)
+
+    @staticmethod
+    def compile(rules: List[Tuple[int, str]]) -> Optional[Pattern[str]]:
+        """Compile the indexed `rules` into one regular expression.
+
+        Alternatives are tried in order, so the last rule comes first and the
+        name of the matched group gives the index of the last matching rule.
+
+        """
+        if not rules:
+            return None
+
+        return re.compile(
+            "|".join(f"(?P<r{i}>{regex})" for (i, regex) in reversed(rules))
+        )
+
+    def is_ignored(self, rel_path: Union[str, Path], is_dir: bool = False) -> bool:
+        """Check whether the rules ignore `rel_path` (its parents are not checked).
+
+        Parameters
+        ----------
+        rel_path : Union[str, Path]
+            Path relative to the root of the rules.
+        is_dir : bool
+            Whether `rel_path` is a directory.
+
+        Returns
+        -------
+        bool
+            True if the last rule matching `rel_path` is not a negation.
+
+        """
+        regex = self.dir_regex if is_dir else self.file_regex
+        if regex is None:
+            return False
+
+        m = regex.fullmatch(PurePosixPath(rel_path).as_posix())
+        if not m or not m.lastgroup:
+            return False
+
+        return not self.negated[int(m.lastgroup[1:])]
 
 
 class IgnoreFile:
     """Class to deal with the .mseignore file."""
 
     @staticmethod
-    def parse(path: Path):
-        """Parse the mseignore from `path`."""
+    def load(path: Path) -> IgnoreMatcher:
+        """Load the mseignore from `path` as a matcher."""
         ignore_file = path / ".mseignore"
-        return (
-            {
-                line
-                for line in ignore_file.read_text().splitlines()
-                # Ignore empty lines
-                # Ignore lines being comments
-                if line.strip() and not line.strip().startswith("#")
-            }
-            if ignore_file.exists()
-            else {}
+        return IgnoreMatcher(
+            ignore_file.read_text().splitlines() if ignore_file.exists() else []
         )
@@ -0,0 +1,162 @@
+"""mse_cli.core.measurement_worker module."""
+
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from docker.client import DockerClient
+from docker.errors import NotFound
+
+from mse_cli.core.no_sgx_docker import NoSgxDockerConfig, parse_mr_enclave
+from mse_cli.error import AppContainerError
+from mse_cli.log import LOGGER as LOG
+
+
+class MeasurementWorker:
+    """Long-lived docker computing the MR enclave of an image on demand.
+
+    The container is started once and idles. Each measurement executes the
+    entrypoint of the image inside it, which avoids creating and removing a
+    container for every MR enclave. Measurements are serialized since they
+    share the app directory mounted in the container.
+
+    Each measurement must run as in a fresh container: the app directory is
+    emptied before it and, if the entrypoint left files anywhere else in the
+    container, the container is replaced by a new one after it.
+
+    """
+
+    # Keep the container alive without running the entrypoint
+    idle_entrypoint = ["sleep", "infinity"]
+
+    def __init__(self, client: DockerClient, image: str, app_path: Path):
+        """Prepare a worker of `image` mounting the directory `app_path`."""
+        self.client = client
+        self.image = image
+        self.app_path = app_path
+        self.container: Optional[Any] = None
+        # Changes of the filesystem of the container once started
+        self.baseline: List[Tuple[str, int]] = []
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> "MeasurementWorker":
+        """Start the worker when entering the runtime context."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        """Stop the worker when exiting the runtime context."""
+        self.stop()
+
+    def start(self):
+        """Start the container of the worker."""
+        os.makedirs(self.app_path, exist_ok=True)
+
+        try:
+            self.container = self.client.containers.run(
+                self.image,
+                name=f"mse-measurement-{uuid.uuid4()}",
+                entrypoint=MeasurementWorker.idle_entrypoint,
+                volumes=NoSgxDockerConfig.volumes(self.app_path),
+                remove=True,
+                detach=True,
+            )
+        except Exception as exc:
+            raise AppContainerError(
+                f"Error starting the measurement docker of {self.image}"
+            ) from exc
+
+        self.baseline = self.changes()
+
+    def changes(self) -> List[Tuple[str, int]]:
+        """Get the changes of the filesystem of the container since its image.
+
+        The app directory is excluded: it is a mount, not in the container.
+
+        """
+        assert self.container is not None
+
+        return sorted(
+            (change["Path"], change["Kind"])
+            for change in self.container.diff() or []
+            if not change["Path"].startswith(NoSgxDockerConfig.app_mountpoint)
+        )
+
+    def clean(self):
+        """Remove the files of the previous measurement from the app directory."""
+        for path in self.app_path.iterdir():
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+
+    def stop(self):
+        """Stop and remove the container of the worker."""
+        if self.container is None:
+            return
+
+        try:
+            # The container is removed once stopped
+            self.container.stop(timeout=1)
+        except NotFound:
+            pass
+
+        self.container = None
+
+    def measure(
+        self, app_args: NoSgxDockerConfig, app_path: Path, docker_path_log: Path
+    ) -> str:
+        """Compute the MR enclave of the code in `app_path` run with `app_args`.
+
+        Parameters
+        ----------
+        app_args : NoSgxDockerConfig
+            Arguments of the enclave.
+        app_path : Path
+            Directory containing the code tarball.
+        docker_path_log : Path
+            Path to save the output of the measurement.
+
+        Returns
+        -------
+        str
+            MR enclave as an hexadecimal string.
+
+        """
+        if self.container is None:
+            raise AppContainerError("The measurement docker is not started")
+
+        with self.lock:
+            # Replace the code and whatever was left by the previous measurement
+            self.clean()
+            code_tarball = self.app_path / NoSgxDockerConfig.code_tarball
+            try:
+                os.link(app_path / NoSgxDockerConfig.code_tarball, code_tarball)
+            except OSError:
+                shutil.copyfile(app_path / NoSgxDockerConfig.code_tarball, code_tarball)
+
+            (exit_code, output) = self.container.exec_run(
+                [NoSgxDockerConfig.entrypoint, *app_args.cmd()],
+                stdout=True,
+                stderr=True,
+            )
+
+            # Only a measurement which altered the container restarts it
+            if self.changes() != self.baseline:
+                LOG.debug("Measurement docker of %s altered, restarting", self.image)
+                self.stop()
+                self.start()
+
+        docker_path_log.write_bytes(output)
+
+        if exit_code != 0:
+            raise AppContainerError(
+                f"The measurement failed with exit code {exit_code} "
+                f"(see logs at {docker_path_log}):\n"
+                f"{output.decode('utf-8', errors='replace').strip()}"
+            )
+
+        return parse_mr_enclave(output, docker_path_log)
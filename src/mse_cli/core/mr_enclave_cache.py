@@ -0,0 +1,110 @@
+"""mse_cli.core.mr_enclave_cache module."""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from docker.client import DockerClient
+from docker.errors import ImageNotFound
+
+from mse_cli import MSE_CONF_DIR
+from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
+
+
+class MREnclaveCache:
+    """On-disk LRU cache of the MRENCLAVE computed for an application.
+
+    The MRENCLAVE only depends on the docker image, the arguments of the
+    enclave and the code tarball: an entry is keyed on the image id, the
+    command of the container and the SHA-256 of the code tarball. The least
+    recently used entries are removed beyond `max_entries`.
+
+    """
+
+    def __init__(
+        self, path: Path = MSE_CONF_DIR / "mrenclave_cache", max_entries: int = 256
+    ):
+        """Open the cache stored in the directory `path`."""
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(
+        client: DockerClient,
+        image: str,
+        app_args: NoSgxDockerConfig,
+        app_path: Path,
+    ) -> Optional[str]:
+        """Get the key of the MRENCLAVE of the app mounted from `app_path`.
+
+        Parameters
+        ----------
+        client : DockerClient
+            Docker client.
+        image : str
+            Name of the docker image.
+        app_args : NoSgxDockerConfig
+            Arguments of the enclave.
+        app_path : Path
+            Directory containing the code tarball.
+
+        Returns
+        -------
+        Optional[str]
+            Key of the entry or None if the image is not pulled yet.
+
+        """
+        try:
+            image_id = client.images.get(image).id
+        except ImageNotFound:
+            return None
+
+        code_hash = hashlib.sha256()
+        with open(app_path / NoSgxDockerConfig.code_tarball, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                code_hash.update(chunk)
+
+        return hashlib.sha256(
+            json.dumps([image_id, app_args.cmd(), code_hash.hexdigest()]).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the MRENCLAVE of the entry `key` (None if missing)."""
+        entry = self.path / key
+
+        try:
+            mrenclave = entry.read_text()
+            # Mark the entry as the most recently used
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+
+        return mrenclave
+
+    def put(self, key: str, mrenclave: str):
+        """Set the MRENCLAVE of the entry `key` and evict the oldest entries."""
+        # Write then rename to never leave a partial entry
+        tmp_entry = self.path / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_entry.write_text(mrenclave)
+        os.replace(tmp_entry, self.path / key)
+
+        entries = []
+        for entry in self.path.iterdir():
+            # Skip the entries being written by another process or thread
+            if entry.suffix == ".tmp":
+                continue
+
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except FileNotFoundError:
+                continue
+
+        entries.sort()
+        for _, entry in entries[: max(len(entries) - self.max_entries, 0)]:
+            entry.unlink(missing_ok=True)
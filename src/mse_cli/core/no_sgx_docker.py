@@ -1,5 +1,6 @@
 """mse_cli.core.no_sgx_docker module."""
 
+import re
 from pathlib import Path
 from typing import ClassVar, Dict, List, Optional
 from uuid import UUID
@@ -7,6 +8,7 @@ from uuid import UUID
 from pydantic import BaseModel
 
 from mse_cli.core.sgx_docker import SgxDockerConfig
+from mse_cli.error import RatlsVerificationFailure
 
 
 class NoSgxDockerConfig(BaseModel):
@@ -20,6 +22,8 @@ class NoSgxDockerConfig(BaseModel):
     application: str
 
     app_mountpoint: ClassVar[str] = "/opt/input"
+    # Name of the code tarball in the app mountpoint
+    code_tarball: ClassVar[str] = "app.tar"
     entrypoint: ClassVar[str] = "mse-run"
 
     def cmd(self) -> List[str]:
@@ -44,7 +48,8 @@ class NoSgxDockerConfig(BaseModel):
 
         return command
 
-    def volumes(self, app_path: Path) -> Dict[str, Dict[str, str]]:
+    @staticmethod
+    def volumes(app_path: Path) -> Dict[str, Dict[str, str]]:
         """Define the docker volumes."""
         return {
             f"{app_path.resolve()}": {
@@ -64,3 +69,16 @@ class NoSgxDockerConfig(BaseModel):
             app_id=docker_config.app_id,
             application=docker_config.application,
         )
+
+
+def parse_mr_enclave(output: bytes, docker_path_log: Path) -> str:
+    """Get the MR enclave from the `output` of the docker saved at `docker_path_log`."""
+    pattern = "Measurement:\n[ ]*([a-z0-9]{64})"
+    m = re.search(pattern.encode("utf-8"), output)
+
+    if not m:
+        raise RatlsVerificationFailure(
+            f"Fail to compute mr_enclave! See {docker_path_log} for more details."
+        )
+
+    return str(m.group(1).decode("utf-8"))
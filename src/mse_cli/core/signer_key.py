@@ -0,0 +1,148 @@
+"""mse_cli.core.signer_key module."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import requests
+from intel_sgx_ra.signer import mr_signer_from_pk
+
+from mse_cli import MSE_CONF_DIR, MSE_SIGNER_KEY_MAX_AGE
+from mse_cli.error import UnexpectedResponse
+from mse_cli.log import LOGGER as LOG
+
+
+def signer_key_max_age() -> int:
+    """Get the max age of the cached signer key from `MSE_SIGNER_KEY_MAX_AGE`.
+
+    The default is used if the env var is malformed.
+
+    """
+    value = os.getenv("MSE_SIGNER_KEY_MAX_AGE")
+    if value is None:
+        return MSE_SIGNER_KEY_MAX_AGE
+
+    try:
+        max_age = int(value)
+    except ValueError:
+        max_age = -1
+
+    if max_age < 0:
+        LOG.warning(
+            "Ignoring MSE_SIGNER_KEY_MAX_AGE=%s (not a number of seconds), "
+            "using %ss",
+            value,
+            MSE_SIGNER_KEY_MAX_AGE,
+        )
+        return MSE_SIGNER_KEY_MAX_AGE
+
+    return max_age
+
+
+class SignerKeyCache:
+    """On-disk cache of the enclave signer public key.
+
+    The key is used without any request for `max_age` seconds after it has
+    been fetched or revalidated. It is then revalidated with a conditional
+    request (ETag and Last-Modified) which only downloads it again if it has
+    changed. The MRSIGNER of the key is stored alongside.
+
+    """
+
+    def __init__(
+        self,
+        path: Path = MSE_CONF_DIR / "signer_key_cache",
+        max_age: Optional[int] = None,
+    ):
+        """Open the cache stored in the directory `path`.
+
+        The max age defaults to `signer_key_max_age()`.
+
+        """
+        self.path = path
+        self.max_age = signer_key_max_age() if max_age is None else max_age
+        os.makedirs(self.path, exist_ok=True)
+
+    def entry(self, url: str) -> Path:
+        """Get the path of the entry of the key downloaded from `url`."""
+        return self.path / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def load(self, url: str) -> Optional[Dict[str, str]]:
+        """Load the entry of `url` (None if missing or malformed)."""
+        try:
+            data = json.loads(self.entry(url).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            LOG.debug("Ignoring the malformed signer key entry of %s", url)
+            return None
+
+        if not {"public_key", "mr_signer", "fetched_at"} <= data.keys():
+            return None
+
+        return data
+
+    def save(self, url: str, data: Dict[str, str]):
+        """Save the entry of `url`."""
+        entry = self.entry(url)
+
+        # Write then rename to never leave a partial entry
+        tmp_entry = entry.with_name(
+            f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_entry.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_entry, entry)
+
+    def get(self, url: str) -> Tuple[bytes, bytes]:
+        """Get the signer public key published at `url` and its MRSIGNER.
+
+        Parameters
+        ----------
+        url : str
+            URL of the PEM-encoded signer public key.
+
+        Returns
+        -------
+        Tuple[bytes, bytes]
+            PEM-encoded public key and MRSIGNER.
+
+        """
+        data = self.load(url)
+
+        if data and time.time() - float(data["fetched_at"]) < self.max_age:
+            LOG.debug("Signer public key read from the cache")
+            return (
+                data["public_key"].encode("utf-8"),
+                bytes.fromhex(data["mr_signer"]),
+            )
+
+        headers = {}
+        if data and data.get("etag"):
+            headers["If-None-Match"] = data["etag"]
+        if data and data.get("last_modified"):
+            headers["If-Modified-Since"] = data["last_modified"]
+
+        r = requests.get(url=url, headers=headers, timeout=60)
+
+        if data and r.status_code == 304:
+            LOG.debug("Signer public key revalidated")
+        elif r.ok:
+            data = {
+                "public_key": r.content.decode("utf-8"),
+                "mr_signer": mr_signer_from_pk(r.content).hex(),
+                "etag": r.headers.get("ETag", ""),
+                "last_modified": r.headers.get("Last-Modified", ""),
+            }
+        else:
+            raise UnexpectedResponse(
+                f"Can't get the enclave signer public key: [{r.status_code}] {r.text}",
+            )
+
+        data["fetched_at"] = str(time.time())
+        self.save(url, data)
+
+        return data["public_key"].encode("utf-8"), bytes.fromhex(data["mr_signer"])
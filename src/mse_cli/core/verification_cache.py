@@ -0,0 +1,139 @@
+"""mse_cli.core.verification_cache module."""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Union
+
+from cryptography import x509
+from cryptography.hazmat.primitives.serialization import Encoding
+
+from mse_cli import MSE_CONF_DIR
+from mse_cli.core.collaterals import Collaterals, validity
+
+
+def certificate_der(certificate: Union[str, bytes, Path, x509.Certificate]) -> bytes:
+    """Get the DER encoding of a PEM or DER certificate."""
+    if isinstance(certificate, x509.Certificate):
+        return certificate.public_bytes(Encoding.DER)
+
+    if isinstance(certificate, Path):
+        certificate = certificate.read_bytes()
+    elif isinstance(certificate, str):
+        certificate = certificate.encode("utf-8")
+
+    if certificate.lstrip().startswith(b"-----BEGIN"):
+        return x509.load_pem_x509_certificate(certificate).public_bytes(Encoding.DER)
+
+    return certificate
+
+
+def collaterals_digest(collaterals: Collaterals) -> str:
+    """Get the SHA-256 digest identifying the version of the collaterals."""
+    (tcb_info, qe_identity, tcb_cert, root_ca_crl, pck_ca_crl) = collaterals
+
+    digest = hashlib.sha256()
+    for data in (
+        tcb_info,
+        qe_identity,
+        tcb_cert.public_bytes(Encoding.DER),
+        root_ca_crl.public_bytes(Encoding.DER),
+        pck_ca_crl.public_bytes(Encoding.DER),
+    ):
+        digest.update(hashlib.sha256(data).digest())
+
+    return digest.hexdigest()
+
+
+class VerificationCache:
+    """On-disk cache of the successful verifications of RA-TLS certificates.
+
+    An entry is keyed on the SHA-256 of the certificate, the expected MRSIGNER
+    and MRENCLAVE, and the version of the collaterals used to verify the quote.
+    It expires with the first collateral to expire or with the certificate.
+
+    """
+
+    def __init__(self, path: Path = MSE_CONF_DIR / "verification_cache"):
+        """Open the cache stored in the directory `path`."""
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(
+        ratls_certificate: Union[str, bytes, Path, x509.Certificate],
+        mr_signer: bytes,
+        mr_enclave: Optional[str],
+        collaterals: Collaterals,
+    ) -> str:
+        """Get the key of the verification of `ratls_certificate`.
+
+        Parameters
+        ----------
+        ratls_certificate : Union[str, bytes, Path, x509.Certificate]
+            RA-TLS certificate of the enclave.
+        mr_signer : bytes
+            Expected MRSIGNER.
+        mr_enclave : Optional[str]
+            Expected MRENCLAVE (not checked if None).
+        collaterals : Collaterals
+            Collaterals used to verify the quote.
+
+        Returns
+        -------
+        str
+            Key of the entry.
+
+        """
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    hashlib.sha256(certificate_der(ratls_certificate)).hexdigest(),
+                    mr_signer.hex(),
+                    mr_enclave.lower() if mr_enclave else None,
+                    collaterals_digest(collaterals),
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str, now: Optional[datetime] = None) -> bool:
+        """Say whether the verification `key` has succeeded and not expired."""
+        try:
+            expires_at = datetime.fromisoformat((self.path / key).read_text())
+        except (FileNotFoundError, ValueError):
+            return False
+
+        return (now or datetime.now(timezone.utc)) < expires_at
+
+    def put(
+        self,
+        key: str,
+        ratls_certificate: Union[str, bytes, Path, x509.Certificate],
+        collaterals: Collaterals,
+        now: Optional[datetime] = None,
+    ):
+        """Record the successful verification `key` and remove the expired ones."""
+        certificate = x509.load_der_x509_certificate(certificate_der(ratls_certificate))
+        try:
+            (_, next_update) = validity(collaterals)
+        except (KeyError, ValueError):
+            # The expiration of the collaterals is unknown
+            return
+
+        expires_at = min(next_update, certificate.not_valid_after_utc)
+
+        # Write then rename to never leave a partial entry
+        tmp_entry = self.path / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_entry.write_text(expires_at.isoformat())
+        os.replace(tmp_entry, self.path / key)
+
+        for entry in self.path.iterdir():
+            # Skip the entries being written by another process or thread
+            if entry.suffix == ".tmp" or entry.name == key:
+                continue
+
+            if not self.get(entry.name, now):
+                entry.unlink(missing_ok=True)
@@ -0,0 +1,189 @@
+"""mse_cli.core.watch module."""
+
+import hashlib
+import json
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from intel_sgx_ra.ratls import get_server_certificate
+
+from mse_cli.core.collaterals import CollateralCache
+from mse_cli.core.verification_cache import VerificationCache
+from mse_cli.log import LOGGER as LOG
+
+Event = Dict[str, Any]
+
+
+class Watcher:
+    """Attest apps again and again and report the changes of their state.
+
+    Each check fetches the RA-TLS certificate of an app (`fetch`) then
+    verifies it (`verify`). The verification is expected to rely on caches
+    so that an unchanged certificate with unchanged collaterals is cheap to
+    check: only the TLS handshake is paid for.
+
+    An event is emitted for each check. Its kind is:
+
+    - `verified`: first successful check of the app;
+    - `unchanged`: successful check of the same certificate as before;
+    - `certificate_changed`: successful check of a new certificate;
+    - `recovered`: successful check following a failed one;
+    - `failed`: failed check (`error` gives the reason).
+
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], str],
+        verify: Callable[[str, str], None],
+        emit: Callable[[Event], None],
+    ):
+        """Watch the apps with the `fetch`, `verify` and `emit` callbacks."""
+        self.fetch = fetch
+        self.verify = verify
+        self.emit = emit
+        # Digest of the last certificate and success of the last check by app
+        self.states: Dict[str, Dict[str, Any]] = {}
+
+    def check(self, target: str) -> Event:
+        """Check the app `target` once and emit the event."""
+        state = self.states.get(target, {})
+        event: Event = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "target": target,
+            "certificate": None,
+            "handshake_latency": None,
+            "verification_latency": None,
+            "error": None,
+        }
+
+        start = time.monotonic()
+        try:
+            certificate = self.fetch(target)
+            event["handshake_latency"] = round(time.monotonic() - start, 3)
+            event["certificate"] = hashlib.sha256(
+                certificate.encode("utf-8")
+            ).hexdigest()
+
+            start = time.monotonic()
+            self.verify(target, certificate)
+            event["verification_latency"] = round(time.monotonic() - start, 3)
+        # Keep watching whatever the failure
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            event["event"] = "failed"
+            event["error"] = str(exc) or type(exc).__name__
+        else:
+            if not state:
+                event["event"] = "verified"
+            elif not state["success"]:
+                event["event"] = "recovered"
+            elif state["certificate"] != event["certificate"]:
+                event["event"] = "certificate_changed"
+            else:
+                event["event"] = "unchanged"
+
+        self.states[target] = {
+            # Keep the last verified certificate when the app can't be reached
+            "certificate": event["certificate"] or state.get("certificate"),
+            "success": event["error"] is None,
+        }
+
+        self.emit(event)
+        return event
+
+    def run(
+        self,
+        targets: List[str],
+        interval: float,
+        jobs: int = 1,
+        rounds: Optional[int] = None,
+    ):
+        """Check all the apps every `interval` seconds.
+
+        Parameters
+        ----------
+        targets : List[str]
+            Apps to check.
+        interval : float
+            Delay between the start of two rounds of checks (in seconds).
+        jobs : int
+            Number of apps checked in parallel.
+        rounds : Optional[int]
+            Number of rounds of checks (forever if None).
+
+        """
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            done = 0
+            while rounds is None or done < rounds:
+                start = time.monotonic()
+                list(executor.map(self.check, targets))
+                done += 1
+
+                if rounds is None or done < rounds:
+                    # Do not drift when the checks are slow
+                    time.sleep(max(interval - (time.monotonic() - start), 0))
+
+
+def fetch_certificate(host: str, port: int) -> str:
+    """Get the PEM-encoded RA-TLS certificate of the app at `host`:`port`.
+
+    A new TLS connection is opened for each call: the certificate is only
+    sent during the handshake and a new one is served to new connections.
+
+    """
+    try:
+        return get_server_certificate((host, port))
+    except (ssl.SSLZeroReturnError, socket.gaierror, ssl.SSLEOFError) as exc:
+        raise ConnectionError(
+            f"Can't reach {host}:{port}. "
+            "Are you sure the application is still running?"
+        ) from exc
+
+
+@contextmanager
+def watch_caches(no_cache: bool) -> Iterator[Tuple[CollateralCache, VerificationCache]]:
+    """Get the collateral and verification caches used during a watch.
+
+    Even with `no_cache`, the full verification is only run again during
+    the watch if the certificate or the collaterals have changed: the
+    caches are then kept in a temporary directory removed afterwards.
+
+    """
+    if not no_cache:
+        yield (CollateralCache(), VerificationCache())
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield (
+            CollateralCache(Path(tmp_dir) / "collaterals"),
+            VerificationCache(Path(tmp_dir) / "results"),
+        )
+
+
+def event_emitter(path: Optional[Path]) -> Callable[[Event], None]:
+    """Get a function writing the events as JSON lines to `path` or the logs."""
+    lock = threading.Lock()
+
+    def emit(event: Event):
+        """Emit the event."""
+        line = json.dumps(event)
+        if path is None:
+            if event["error"]:
+                LOG.error("%s", line)
+            else:
+                LOG.info("%s", line)
+            return
+
+        # The apps are checked by several threads
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    return emit
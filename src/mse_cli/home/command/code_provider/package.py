@@ -2,18 +2,18 @@
 
 import argparse
 import os
-import shutil
-import tempfile
 import time
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, Optional, Tuple
 
 from docker.errors import BuildError
-from mse_lib_crypto.xsalsa20_poly1305 import encrypt_directory, random_key
+from mse_lib_crypto.xsalsa20_poly1305 import random_key
 
+from mse_cli.core.compression import check_zstd, zstd_writer
 from mse_cli.core.conf import AppConf, AppConfParsingOption
+from mse_cli.core.encrypted_tar import encrypt_tar
 from mse_cli.core.fs import tar, whitelist
-from mse_cli.core.ignore_file import IgnoreFile
+from mse_cli.core.ignore_file import IgnoreFile, IgnoreMatcher
 from mse_cli.home.command.helpers import get_client_docker
 from mse_cli.home.model.package import (
     CODE_TAR_NAME,
@@ -22,8 +22,10 @@ from mse_cli.home.model.package import (
     DEFAULT_DOCKERFILE_FILENAME,
     DEFAULT_TEST_DIR,
     DOCKER_IMAGE_TAR_NAME,
+    DOCKER_IMAGE_ZST_NAME,
+    MSE_CONFIG_NAME,
     TEST_TAR_NAME,
-    CodePackage,
+    PackageWriter,
 )
 from mse_cli.log import LOGGER as LOG
 
@@ -55,6 +57,21 @@ def add_subparser(subparsers):
         help="encrypt the code before packaging it",
     )
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=1,
+        metavar="N",
+        help="number of processes used to encrypt the code (Default: 1)",
+    )
+
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="compress the docker image with zstd (requires the `zstd` extra)",
+    )
+
     parser.set_defaults(func=run)
 
 
@@ -112,49 +129,74 @@ def run(args) -> None:
 
     code_config = AppConf.load(config_path, option=AppConfParsingOption.SkipCloud)
 
-    workspace = Path(tempfile.mkdtemp(dir=package_path))
-
-    LOG.info("A workspace has been created at: %s", str(workspace))
-
-    package = CodePackage(
-        code_tar=workspace / CODE_TAR_NAME,
-        image_tar=workspace / DOCKER_IMAGE_TAR_NAME,
-        test_tar=workspace / TEST_TAR_NAME,
-        config_path=config_path.resolve(),
-    )
-
     now = time.time_ns()
     code_secret_path = package_path / f"package_{code_config.name}_{now}.key"
     package_path = package_path / f"package_{code_config.name}_{now}.tar"
 
-    (secret_key, _) = create_code_tar(
-        code_path.resolve(), package.code_tar, args.encrypt
-    )
-
-    if secret_key:
-        code_secret_path.write_bytes(secret_key)
-        LOG.info("Your code secret key has been saved at: %s", code_secret_path)
-
-    create_test_tar(
-        test_path.resolve(),
-        package.test_tar,
-    )
-
-    create_image_tar(dockerfile_path.resolve(), code_config.name, package.image_tar)
-
-    LOG.info("Creating the final package...")
+    LOG.info("Creating the package...")
 
-    package.create(package_path)
+    try:
+        create_package(
+            package_path,
+            code_secret_path,
+            code_path.resolve(),
+            test_path.resolve(),
+            config_path.resolve(),
+            dockerfile_path.resolve(),
+            code_config.name,
+            args.encrypt,
+            args.jobs,
+            args.compress,
+        )
+    except Exception:
+        # Do not leave a truncated package behind
+        package_path.unlink(missing_ok=True)
+        raise
 
     LOG.info("Your package is now ready to be shared: %s", package_path)
 
-    # Clean up the workspace
-    LOG.info("Cleaning up the temporary workspace...")
-    shutil.rmtree(workspace)
+
+def create_package(
+    package_path: Path,
+    code_secret_path: Path,
+    code_path: Path,
+    test_path: Path,
+    config_path: Path,
+    dockerfile_path: Path,
+    image_name: str,
+    encrypt_code: bool,
+    jobs: int,
+    compress_image: bool,
+):
+    """Stream the code, image and tests tarballs into the package."""
+    if compress_image:
+        # Fail before building anything if zstd is missing
+        check_zstd()
+
+    with PackageWriter(package_path) as package:
+        with package.open(CODE_TAR_NAME) as f:
+            (secret_key, _) = create_code_tar(code_path, f, encrypt_code, jobs)
+
+        if secret_key:
+            code_secret_path.write_bytes(secret_key)
+            LOG.info("Your code secret key has been saved at: %s", code_secret_path)
+
+        if compress_image:
+            # Compressed by several threads while `docker save` streams the image
+            with package.open(DOCKER_IMAGE_ZST_NAME) as f, zstd_writer(f) as zf:
+                create_image_tar(dockerfile_path, image_name, zf)
+        else:
+            with package.open(DOCKER_IMAGE_TAR_NAME) as f:
+                create_image_tar(dockerfile_path, image_name, f)
+
+        with package.open(TEST_TAR_NAME) as f:
+            create_test_tar(test_path, f)
+
+        package.add(config_path, MSE_CONFIG_NAME)
 
 
 def create_code_tar(
-    code_path: Path, output_tar_path: Path, encrypt_code: bool
+    code_path: Path, output_tar: BinaryIO, encrypt_code: bool, jobs: int = 1
 ) -> Tuple[Optional[bytes], Optional[Dict[str, bytes]]]:
     """Create the tarball for the code directory."""
     if encrypt_code:
@@ -163,62 +205,46 @@ def create_code_tar(
         # Generate the key to encrypt the code
         secret_key = random_key()
 
-        encrypted_path = output_tar_path.parent / "encrypted_code"
+        LOG.info("Your encryption key is: %s", bytes(secret_key).hex())
+        LOG.info("Building the code archive...")
 
-        # Encrypt the code directory
-        nounces = encrypt_directory(
+        # Encrypt the code directory straight into the tarball
+        nounces = encrypt_tar(
             dir_path=code_path,
-            pattern="*",
+            tar_path=output_tar,
             key=secret_key,
             nonces=None,
             exceptions=whitelist(),
-            ignore_patterns=list(IgnoreFile.parse(code_path)),
-            out_dir_path=encrypted_path,
+            ignore=IgnoreFile.load(code_path),
+            jobs=jobs,
         )
 
-        LOG.info("Your encryption key is: %s", bytes(secret_key).hex())
-        LOG.info("Building the code archive...")
-
-        # Generate the tarball
-        tar(dir_path=encrypted_path, tar_path=output_tar_path)
-
         return (secret_key, nounces)
 
     LOG.info("Building the code archive...")
 
-    mirror_path = output_tar_path.parent / "mirrored_code"
-
-    # We copy the code directory to remove the files to ignore when taring
-    shutil.copytree(
-        code_path,
-        mirror_path,
-        ignore=shutil.ignore_patterns(*list(IgnoreFile.parse(code_path))),
+    # Ignored files are pruned while walking through the code directory
+    tar(
+        dir_path=code_path,
+        tar_path=output_tar,
+        ignore=IgnoreFile.load(code_path),
     )
 
-    # Generate the tarball
-    tar(dir_path=mirror_path, tar_path=output_tar_path)
-
     return (None, None)
 
 
-def create_test_tar(test_path: Path, output_tar_path: Path):
+def create_test_tar(test_path: Path, output_tar: BinaryIO):
     """Create the tarball for the tests directory."""
     LOG.info("Building the tests archive...")
 
-    mirror_path = output_tar_path.parent / "mirrored_tests"
-
-    # We copy the code directory to remove the files to ignore when taring
-    shutil.copytree(
-        test_path,
-        mirror_path,
-        ignore=shutil.ignore_patterns(*["__pycache__", ".pytest_cache"]),
+    tar(
+        dir_path=test_path,
+        tar_path=output_tar,
+        ignore=IgnoreMatcher(["__pycache__/", ".pytest_cache/"]),
     )
 
-    # Generate the tarball
-    tar(dir_path=mirror_path, tar_path=output_tar_path)
-
 
-def create_image_tar(dockerfile: Path, image_name: str, output_tar_path: Path):
+def create_image_tar(dockerfile: Path, image_name: str, output_tar: BinaryIO):
     """Build the docker image and export it into a tarball."""
     client = get_client_docker()
 
@@ -239,9 +265,8 @@ def create_image_tar(dockerfile: Path, image_name: str, output_tar_path: Path):
         LOG.info("Building the image archive...")
 
         # Save it as a tarball
-        with open(output_tar_path, "wb") as f:
-            for chunk in image.save(named=True):
-                f.write(chunk)
+        for chunk in image.save(named=True):
+            output_tar.write(chunk)
 
     except BuildError as exc:
         LOG.error("Failed to build your docker!")
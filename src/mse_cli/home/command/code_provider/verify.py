@@ -1,15 +1,27 @@
 """mse_cli.home.command.code_provider.verify module."""
 
+import json
+import os
 import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
+from queue import Queue
+from typing import Dict, List, Optional
 
 from cryptography.hazmat.primitives.serialization import Encoding
 
 from mse_cli.core.enclave import compute_mr_enclave, verify_enclave
+from mse_cli.core.measurement_worker import MeasurementWorker
+from mse_cli.core.mr_enclave_cache import MREnclaveCache
+from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
+from mse_cli.core.spinner import Spinner
+from mse_cli.core.verification_cache import VerificationCache
+from mse_cli.error import RatlsVerificationFailure
 from mse_cli.home.command.helpers import get_client_docker, load_docker_image
 from mse_cli.home.model.evidence import ApplicationEvidence
-from mse_cli.home.model.package import CodePackage
+from mse_cli.home.model.package import CODE_TAR_NAME, PackageReader
 from mse_cli.log import LOGGER as LOG
 
 
@@ -25,8 +37,9 @@ def add_subparser(subparsers):
         "--evidence",
         required=True,
         type=Path,
+        nargs="+",
         metavar="FILE",
-        help="path to the evidence file",
+        help="path to the evidence files or directories of evidence files",
     )
 
     parser.add_argument(
@@ -43,56 +56,237 @@ def add_subparser(subparsers):
         help="output path of the verified RA-TLS certificate",
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="compute the code fingerprint and verify the evidences again "
+        "instead of reading them from the cache",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=1,
+        metavar="N",
+        help="number of code fingerprints computed in parallel (Default: 1)",
+    )
+
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="compute the code fingerprints in long-lived dockers "
+        "instead of one docker per fingerprint",
+    )
+
     parser.set_defaults(func=run)
 
 
+# pylint: disable=too-many-locals
 def run(args) -> None:
     """Run the subcommand."""
     if not args.output.is_dir():
         raise NotADirectoryError(f"{args.output} does not exist")
 
+    if args.jobs < 1:
+        raise ValueError("The number of jobs should be greater than 0")
+
     workspace = Path(tempfile.mkdtemp(dir=args.output))
-    log_path = workspace / "docker.log"
 
-    evidence = ApplicationEvidence.load(args.evidence)
+    evidences = {
+        path: ApplicationEvidence.load(path) for path in evidence_paths(args.evidence)
+    }
+
+    package = PackageReader(args.package)
+    # The image is checked before being loaded into the Docker daemon
+    package.validate(digests=True)
 
-    LOG.info("Extracting the package at %s...", workspace)
-    package = CodePackage.extract(workspace, args.package)
+    # Only the code is extracted: the image is read straight from the package
+    LOG.info("Extracting the code at %s...", workspace)
+    package.extract(CODE_TAR_NAME, workspace)
 
-    LOG.info("A log file is generating at: %s", log_path)
+    LOG.info("Docker log files are generating at: %s", workspace)
 
     client = get_client_docker()
-    image = load_docker_image(client, package.image_tar)
-    mrenclave = compute_mr_enclave(
-        client,
+    with package.open_image() as (f, size):
+        image = load_docker_image(client, f, size)
+
+    mrenclaves = compute_mr_enclaves(
         image,
-        evidence.input_args,
+        [evidence.input_args for evidence in evidences.values()],
         workspace,
-        log_path,
+        args.jobs,
+        None if args.no_cache else MREnclaveCache(),
+        args.worker,
     )
 
-    LOG.info("Fingerprint is: %s", mrenclave)
+    cert_names = certificate_names(list(evidences))
 
-    try:
-        verify_enclave(
-            evidence.signer_pk,
-            evidence.ratls_certificate,
-            fingerprint=mrenclave,
-            collaterals=evidence.collaterals,
-        )
-    except Exception as exc:
-        LOG.error("Verification failed!")
-        raise exc
+    failures = 0
+    for path, evidence in evidences.items():
+        mrenclave = mrenclaves[fingerprint_key(evidence.input_args)]
+        LOG.info("Fingerprint of %s is: %s", path.name, mrenclave)
 
-    LOG.info("Verification successful")
+        try:
+            verify_enclave(
+                evidence.signer_pk,
+                evidence.ratls_certificate,
+                fingerprint=mrenclave,
+                collaterals=evidence.collaterals,
+                result_cache=None if args.no_cache else VerificationCache(),
+            )
+        # Verify the other evidences whatever the failure
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            LOG.error("Verification failed: %s", path.name)
+            if len(evidences) == 1:
+                raise exc
 
-    ratls_cert_path = args.output.resolve() / "ratls.pem"
-    ratls_cert_path.write_bytes(
-        evidence.ratls_certificate.public_bytes(encoding=Encoding.PEM)
-    )
+            LOG.error("%s", exc)
+            failures += 1
+            continue
+
+        LOG.info("Verification successful: %s", path.name)
+
+        ratls_cert_path = args.output.resolve() / (
+            "ratls.pem" if len(evidences) == 1 else cert_names[path]
+        )
+        ratls_cert_path.write_bytes(
+            evidence.ratls_certificate.public_bytes(encoding=Encoding.PEM)
+        )
 
-    LOG.info("The RA-TLS certificate has been saved at: %s", ratls_cert_path)
+        LOG.info("The RA-TLS certificate has been saved at: %s", ratls_cert_path)
 
     # Clean up the workspace
     LOG.info("Cleaning up the temporary workspace...")
     shutil.rmtree(workspace)
+
+    if failures:
+        raise RatlsVerificationFailure(
+            f"{failures} out of {len(evidences)} evidences failed the verification"
+        )
+
+
+def evidence_paths(paths: List[Path]) -> List[Path]:
+    """Get the evidence files from `paths` (files or directories)."""
+    files: List[Path] = []
+
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.json")))
+        else:
+            files.append(path)
+
+    if not files:
+        raise FileNotFoundError("No evidence file found")
+
+    return files
+
+
+def certificate_names(paths: List[Path]) -> Dict[Path, str]:
+    """Get a distinct RA-TLS certificate filename for each evidence file.
+
+    The name is taken from the evidence filename, prefixed with the name
+    of its directory (then with its index) if another evidence has the same.
+
+    """
+    names: Dict[Path, str] = {}
+    for i, path in enumerate(paths):
+        for name in (
+            f"{path.stem}.ratls.pem",
+            f"{path.parent.name}_{path.stem}.ratls.pem",
+            f"{i}_{path.stem}.ratls.pem",
+        ):
+            if name not in names.values():
+                break
+        else:
+            raise FileExistsError(f"No distinct certificate filename for {path}")
+
+        names[path] = name
+
+    return names
+
+
+def fingerprint_key(app_args: NoSgxDockerConfig) -> str:
+    """Get a key identifying the inputs of a code fingerprint."""
+    return json.dumps(app_args.cmd())
+
+
+def compute_mr_enclaves(
+    image: str,
+    inputs: List[NoSgxDockerConfig],
+    workspace: Path,
+    jobs: int,
+    cache: Optional[MREnclaveCache],
+    use_workers: bool = False,
+) -> Dict[str, str]:
+    """Compute the MR enclave of each distinct input with `jobs` dockers at most.
+
+    Parameters
+    ----------
+    image : str
+        Name of the docker image.
+    inputs : List[NoSgxDockerConfig]
+        Arguments of the enclaves (duplicates are computed once).
+    workspace : Path
+        Directory containing the code tarball.
+    jobs : int
+        Maximum number of dockers running at once.
+    cache : Optional[MREnclaveCache]
+        Cache of the MR enclaves.
+    use_workers : bool
+        Whether to compute the MR enclaves in `jobs` long-lived dockers.
+
+    Returns
+    -------
+    Dict[str, str]
+        MR enclave by fingerprint key of the inputs.
+
+    """
+    distinct = {fingerprint_key(app_args): app_args for app_args in inputs}
+
+    workers: "Queue[MeasurementWorker]" = Queue()
+
+    def compute(index: int, app_args: NoSgxDockerConfig) -> str:
+        """Compute the MR enclave in its own directory."""
+        app_path = workspace / f"app_{index}"
+        app_path.mkdir()
+
+        # Each docker has its own mount but shares the code tarball
+        try:
+            os.link(workspace / CODE_TAR_NAME, app_path / CODE_TAR_NAME)
+        except OSError:
+            shutil.copyfile(workspace / CODE_TAR_NAME, app_path / CODE_TAR_NAME)
+
+        worker = workers.get() if use_workers else None
+        try:
+            return compute_mr_enclave(
+                get_client_docker(),
+                image,
+                app_args,
+                app_path,
+                workspace / f"docker_{index}.log",
+                cache,
+                worker,
+            )
+        finally:
+            if worker:
+                workers.put(worker)
+
+    with Spinner(f"Computing {len(distinct)} code fingerprint(s)... "):
+        with ExitStack() as stack:
+            for index in range(min(jobs, len(distinct)) if use_workers else 0):
+                workers.put(
+                    stack.enter_context(
+                        MeasurementWorker(
+                            get_client_docker(), image, workspace / f"worker_{index}"
+                        )
+                    )
+                )
+
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = {
+                    key: executor.submit(compute, index, app_args)
+                    for index, (key, app_args) in enumerate(distinct.items())
+                }
+
+                return {key: future.result() for (key, future) in futures.items()}
@@ -1,8 +1,7 @@
 """mse_cli.home.command.helpers module."""
 
 import socket
-from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional
 
 from docker import from_env
 from docker.client import DockerClient
@@ -12,6 +11,9 @@ from docker.models.containers import Container
 from mse_cli.error import AppContainerNotFound, AppContainerNotRunning
 from mse_cli.log import LOGGER as LOG
 
+# Size of the chunks of the image tarball sent to the Docker daemon
+IMAGE_CHUNK_SIZE = 1024 * 1024
+
 
 def get_client_docker() -> DockerClient:
     """Create a Docker client or exit if daemon is down."""
@@ -60,12 +62,34 @@ def get_running_app_container(client: DockerClient, name: str) -> Container:
     return container
 
 
-def load_docker_image(client: DockerClient, image_tar_path: Path) -> str:
-    """Load the docker image from the image tarball."""
+def read_chunks(
+    f: BinaryIO, size: Optional[int] = None, chunk_size: int = IMAGE_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield the content of `f` by chunks and log the progress every 10%."""
+    read = 0
+    progress = 0
+
+    while chunk := f.read(chunk_size):
+        yield chunk
+
+        read += len(chunk)
+        if size and read * 10 // size > progress:
+            progress = read * 10 // size
+            LOG.info("Loading the docker image... %d%%", min(progress * 10, 100))
+
+
+def load_docker_image(
+    client: DockerClient, image_tar: BinaryIO, size: Optional[int] = None
+) -> str:
+    """Load the docker image from the image tarball stream of `size` bytes.
+
+    The tarball is sent to the Docker daemon by chunks: it is never fully
+    loaded in memory.
+
+    """
     LOG.info("Loading the docker image...")
-    with open(image_tar_path, "rb") as f:
-        image = client.images.load(f.read())
-        return image[0].tags[0]
+    image = client.images.load(read_chunks(image_tar, size))
+    return image[0].tags[0]
 
 
 def is_port_free(port: int):
@@ -1,10 +1,13 @@
 """mse_cli.home.command.sgx_operator.evidence module."""
 
+import argparse
 import json
 import socket
 import ssl
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from urllib.parse import urlparse
 
 from cryptography.hazmat.primitives.serialization import Encoding, load_pem_private_key
@@ -13,8 +16,10 @@ from docker.models.containers import Container
 from intel_sgx_ra.attest import retrieve_collaterals
 from intel_sgx_ra.ratls import get_server_certificate, ratls_verify
 
+from mse_cli.core.collaterals import CollateralCache
 from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
 from mse_cli.core.sgx_docker import SgxDockerConfig
+from mse_cli.error import AppContainerError, AppContainerNotFound
 from mse_cli.home.command.helpers import get_client_docker, get_running_app_container
 from mse_cli.home.model.evidence import ApplicationEvidence
 from mse_cli.log import LOGGER as LOG
@@ -43,12 +48,44 @@ def add_subparser(subparsers):
         help="the directory to write the evidence file",
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="retrieve the collaterals from the PCCS "
+        "instead of reading them from the cache",
+    )
+
     parser.add_argument(
         "name",
         type=str,
+        nargs="?",
         help="the name of the application",
     )
 
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="collect the evidences of all the running applications",
+    )
+
+    parser.add_argument(
+        "--label",
+        type=str,
+        action="append",
+        metavar="KEY[=VALUE]",
+        help="collect the evidences of the running applications with this "
+        "docker label (can be repeated)",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=8,
+        metavar="N",
+        help="number of evidences collected in parallel (Default: 8)",
+    )
+
     parser.set_defaults(func=run)
 
 
@@ -57,12 +94,93 @@ def run(args) -> None:
     if not args.output.is_dir():
         raise NotADirectoryError(f"`{args.output}` does not exist")
 
+    if bool(args.name) == bool(args.all or args.label):
+        raise argparse.ArgumentTypeError(
+            "Either [name] or [--all | --label] is required"
+        )
+
     client = get_client_docker()
-    container = get_running_app_container(client, args.name)
 
-    collect_evidence_and_certificate(
-        container=container, pccs_url=args.pccs, output=args.output
+    if args.name:
+        collect_evidence_and_certificate(
+            container=get_running_app_container(client, args.name),
+            pccs_url=args.pccs,
+            output=args.output,
+            collateral_cache=None if args.no_cache else CollateralCache(),
+        )
+        return
+
+    if args.jobs < 1:
+        raise ValueError("The number of jobs should be greater than 0")
+
+    containers = client.containers.list(
+        filters={"label": [SgxDockerConfig.docker_label, *(args.label or [])]}
     )
+    if not containers:
+        raise AppContainerNotFound("No running application found")
+
+    collect_all_evidences(containers, args.pccs, args.output, args.jobs, args.no_cache)
+
+
+def collect_all_evidences(
+    containers: List[Container],
+    pccs_url: str,
+    output: Path,
+    jobs: int,
+    no_cache: bool = False,
+):
+    """Collect the evidence of each running enclave in `output`.
+
+    Parameters
+    ----------
+    containers : List[Container]
+        Containers of the enclaves.
+    pccs_url : str
+        URL of the PCCS.
+    output : Path
+        Directory to write the evidence files and RA-TLS certificates.
+    jobs : int
+        Number of evidences collected in parallel.
+    no_cache : bool
+        Whether to retrieve the collaterals from the PCCS.
+
+    """
+    LOG.info("Collecting the evidences of %d applications...", len(containers))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The enclaves on the same platform share their collaterals
+        # which are then retrieved once
+        collateral_cache = (
+            CollateralCache(Path(tmp_dir)) if no_cache else CollateralCache()
+        )
+
+        def collect(container: Container) -> Optional[Exception]:
+            """Collect the evidence of an enclave."""
+            try:
+                collect_evidence_and_certificate(
+                    container, pccs_url, output, collateral_cache, container.name
+                )
+            # Collect the other evidences whatever the failure
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                return exc
+
+            return None
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            errors = list(executor.map(collect, containers))
+
+    failures = 0
+    for container, error in zip(containers, errors):
+        if error:
+            LOG.error("Evidence collection failed: %s (%s)", container.name, error)
+            failures += 1
+
+    if failures:
+        raise AppContainerError(
+            f"{failures} out of {len(containers)} evidence collections failed"
+        )
+
+    LOG.info("The evidence files can now be shared!")
 
 
 # pylint: disable=too-many-locals
@@ -70,8 +188,14 @@ def collect_evidence_and_certificate(
     container: Container,
     pccs_url: str,
     output: Path,
+    collateral_cache: Optional[CollateralCache] = None,
+    basename: Optional[str] = None,
 ):
-    """Collect evidence JSON file and RA-TLS certificate from running enclave."""
+    """Collect evidence JSON file and RA-TLS certificate from running enclave.
+
+    The files are prefixed with `basename` if given.
+
+    """
     LOG.info("Collecting the enclave and application evidences...")
 
     docker = SgxDockerConfig.load(container.attrs, container.labels)
@@ -96,7 +220,11 @@ def collect_evidence_and_certificate(
         tcb_cert,
         root_ca_crl,
         pck_platform_crl,
-    ) = retrieve_collaterals(quote, pccs_url)
+    ) = (
+        collateral_cache.retrieve(quote, pccs_url)
+        if collateral_cache
+        else retrieve_collaterals(quote, pccs_url)
+    )
 
     signer_key = load_pem_private_key(
         docker.signer_key.read_bytes(),
@@ -114,12 +242,15 @@ def collect_evidence_and_certificate(
         signer_pk=signer_key.public_key(),
     )
 
-    evidence_path = output / "evidence.json"
+    prefix = f"{basename}." if basename else ""
+
+    evidence_path = output / f"{prefix}evidence.json"
     evidence.save(evidence_path)
     LOG.info("The evidence file has been generated at: %s", evidence_path)
-    LOG.info("The evidence file can now be shared!")
+    if not basename:
+        LOG.info("The evidence file can now be shared!")
 
-    ratls_cert_path = output / "ratls.pem"
+    ratls_cert_path = output / f"{prefix}ratls.pem"
     ratls_cert_path.write_bytes(
         evidence.ratls_certificate.public_bytes(encoding=Encoding.PEM)
     )
@@ -1,18 +1,25 @@
 """mse_cli.home.command.sgx_operator.run module."""
 
+import argparse
 import json
 from pathlib import Path
+from typing import List, Optional, Tuple
 
+from docker.client import DockerClient
+
+from mse_cli.core.async_bootstrap import BootstrapTarget, bootstrap_all
 from mse_cli.core.bootstrap import (
     ConfigurationPayload,
+    close_session,
     configure_app,
     is_waiting_for_secrets,
     wait_for_app_server,
 )
 from mse_cli.core.clock_tick import ClockTick
+from mse_cli.core.container_watcher import ContainerWatcher
 from mse_cli.core.sgx_docker import SgxDockerConfig
 from mse_cli.core.spinner import Spinner
-from mse_cli.error import AppContainerBadState
+from mse_cli.error import AppContainerBadState, AppContainerError, AppContainerNotFound
 from mse_cli.home.command.helpers import get_client_docker, get_running_app_container
 from mse_cli.log import LOGGER as LOG
 
@@ -28,9 +35,32 @@ def add_subparser(subparsers):
     parser.add_argument(
         "name",
         type=str,
+        nargs="?",
         help="name of the application",
     )
 
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="send the secrets to all the running applications",
+    )
+
+    parser.add_argument(
+        "--names",
+        type=lambda names: [name for name in names.split(",") if name],
+        metavar="NAME[,NAME...]",
+        help="send the secrets to the applications with these names",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=8,
+        metavar="N",
+        help="number of applications run in parallel (Default: 8)",
+    )
+
     parser.add_argument(
         "--secrets",
         type=Path,
@@ -49,6 +79,14 @@ def add_subparser(subparsers):
         help="code decryption sealed key file path",
     )
 
+    parser.add_argument(
+        "--sealed-dir",
+        type=Path,
+        metavar="DIR",
+        help="directory of the files sealed for each application with --all "
+        "or --names: NAME.key.sealed and NAME.sealed_secrets.json",
+    )
+
     parser.add_argument(
         "--timeout",
         type=int,
@@ -63,50 +101,170 @@ def add_subparser(subparsers):
 
 def run(args) -> None:
     """Run the subcommand."""
+    if bool(args.name) == bool(args.all or args.names):
+        raise argparse.ArgumentTypeError(
+            "Either [name] or [--all | --names] is required"
+        )
+
+    if args.name and args.sealed_dir:
+        raise argparse.ArgumentTypeError(
+            "--sealed-dir is only used with --all or --names"
+        )
+
+    if not args.name and (args.key or args.sealed_secrets):
+        raise argparse.ArgumentTypeError(
+            "A file sealed for a single application can't be sent to several: "
+            "use --sealed-dir instead of --key and --sealed-secrets"
+        )
+
     client = get_client_docker()
+
+    if not args.name:
+        run_all(client, args)
+        return
+
     container = get_running_app_container(client, args.name)
 
     docker = SgxDockerConfig.load(container.attrs, container.labels)
 
-    if not is_waiting_for_secrets(f"https://{docker.host}:{docker.port}", False):
-        raise AppContainerBadState(
-            "Your application is not waiting for secrets. Have you already set it?"
+    url = f"https://{docker.host}:{docker.port}"
+    try:
+        if not is_waiting_for_secrets(url, False):
+            raise AppContainerBadState(
+                "Your application is not waiting for secrets. Have you already set it?"
+            )
+
+        data = configuration_payload(
+            docker, args.secrets, args.sealed_secrets, args.key
         )
 
-    data = ConfigurationPayload(
+        LOG.info("Sending data to the configuration server...")
+        configure_app(
+            url,
+            data.payload(),
+            False,
+        )
+        LOG.info("Your application is now configured!")
+
+        with Spinner("Waiting for your application to be ready... "), ContainerWatcher(
+            client, args.name
+        ) as watcher:
+            wait_for_app_server(
+                ClockTick(
+                    period=5,
+                    timeout=60 * args.timeout,
+                    message="Your application is unreachable!",
+                    sleep=watcher.sleep,
+                ),
+                url,
+                docker.healthcheck,
+                False,
+                watcher.check,
+            )
+    finally:
+        close_session(url, False)
+
+    LOG.info("Application ready!")
+    LOG.info("Feel free to test it using the `mse home test` command")
+
+
+def configuration_payload(
+    docker: SgxDockerConfig,
+    secrets: Optional[Path],
+    sealed_secrets: Optional[Path],
+    key: Optional[Path],
+) -> ConfigurationPayload:
+    """Build the payload of the configuration server of an app."""
+    return ConfigurationPayload(
         app_id=docker.app_id,
-        secrets=json.loads(args.secrets.read_text()) if args.secrets else None,
-        sealed_secrets=args.sealed_secrets.read_bytes()
-        if args.sealed_secrets
-        else None,
-        code_secret_key=args.key.read_bytes() if args.key else None,
+        secrets=json.loads(secrets.read_text()) if secrets else None,
+        sealed_secrets=sealed_secrets.read_bytes() if sealed_secrets else None,
+        code_secret_key=key.read_bytes() if key else None,
         ssl_private_key=None,
     )
 
-    LOG.info("Sending data to the configuration server...")
-    configure_app(
-        f"https://{docker.host}:{docker.port}",
-        data.payload(),
-        False,
-    )
-    LOG.info("Your application is now configured!")
-
-    with Spinner("Waiting for your application to be ready... "):
-        wait_for_app_server(
-            ClockTick(
-                period=5,
-                timeout=60 * args.timeout,
-                message="Your application is unreachable!",
-            ),
-            f"https://{docker.host}:{docker.port}",
-            docker.healthcheck,
-            False,
-            get_running_app_container,
-            (
-                client,
-                args.name,
-            ),
+
+def sealed_files(
+    sealed_dir: Optional[Path], name: str
+) -> Tuple[Optional[Path], Optional[Path]]:
+    """Get the sealed secrets and key of the app `name` in `sealed_dir`.
+
+    The files are sealed for the enclave of the app only. A kind of file
+    found for any app of `sealed_dir` is required for each of them: the app
+    would otherwise wait for it until the timeout.
+
+    """
+    if not sealed_dir:
+        return (None, None)
+
+    def sealed_file(suffix: str) -> Optional[Path]:
+        path = sealed_dir / f"{name}.{suffix}"
+        if path.exists():
+            return path
+
+        if any(sealed_dir.glob(f"*.{suffix}")):
+            raise FileNotFoundError(
+                f"`{path}` does not exist: no file sealed for the application "
+                f"'{name}' in `{sealed_dir}`"
+            )
+
+        return None
+
+    return (sealed_file("sealed_secrets.json"), sealed_file("key.sealed"))
+
+
+def run_all(client: DockerClient, args) -> None:
+    """Send the secrets to several apps at once and wait for them."""
+    if args.jobs < 1:
+        raise ValueError("The number of jobs should be greater than 0")
+
+    if args.all:
+        containers = client.containers.list(
+            filters={"label": SgxDockerConfig.docker_label}
         )
+        if not containers:
+            raise AppContainerNotFound("No running application found")
+    else:
+        containers = [
+            get_running_app_container(client, name)
+            for name in dict.fromkeys(args.names)
+        ]
 
-    LOG.info("Application ready!")
-    LOG.info("Feel free to test it using the `mse home test` command")
+    watchers: List[ContainerWatcher] = []
+    targets: List[BootstrapTarget] = []
+    try:
+        for container in containers:
+            docker = SgxDockerConfig.load(container.attrs, container.labels)
+            watchers.append(ContainerWatcher(client, container.name))
+            targets.append(
+                BootstrapTarget(
+                    name=container.name,
+                    url=f"https://{docker.host}:{docker.port}",
+                    healthcheck_endpoint=docker.healthcheck,
+                    payload=configuration_payload(
+                        docker,
+                        args.secrets,
+                        *sealed_files(args.sealed_dir, container.name),
+                    ).payload(),
+                    verify=False,
+                    check=watchers[-1].check,
+                )
+            )
+
+        LOG.info("Running %d applications...", len(targets))
+        errors = bootstrap_all(targets, args.jobs, 60 * args.timeout)
+    finally:
+        for watcher in watchers:
+            watcher.close()
+
+    failures = 0
+    for target, error in zip(targets, errors):
+        if error:
+            LOG.error("Run failed: %s (%s)", target.name, error)
+            failures += 1
+
+    if failures:
+        raise AppContainerError(f"{failures} out of {len(targets)} runs failed")
+
+    LOG.info("Applications ready!")
+    LOG.info("Feel free to test them using the `mse home test` command")
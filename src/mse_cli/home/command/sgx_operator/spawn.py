@@ -10,7 +10,9 @@ from docker.models.containers import Container
 
 from mse_cli.core.bootstrap import wait_for_conf_server
 from mse_cli.core.clock_tick import ClockTick
+from mse_cli.core.collaterals import CollateralCache
 from mse_cli.core.conf import AppConf, AppConfParsingOption
+from mse_cli.core.container_watcher import ContainerWatcher
 from mse_cli.core.sgx_docker import SgxDockerConfig
 from mse_cli.core.spinner import Spinner
 from mse_cli.error import AppContainerAlreadyRunning, AppContainerError, PortBusy
@@ -19,7 +21,6 @@ from mse_cli.home.command.helpers import (
     enclave_size_integer,
     get_app_container,
     get_client_docker,
-    get_running_app_container,
     is_port_free,
     load_docker_image,
 )
@@ -27,7 +28,7 @@ from mse_cli.home.command.sgx_operator.evidence import (
     collect_evidence_and_certificate,
     guess_pccs_url,
 )
-from mse_cli.home.model.package import CodePackage
+from mse_cli.home.model.package import CODE_TAR_NAME, MSE_CONFIG_NAME, PackageReader
 from mse_cli.log import LOGGER as LOG
 
 
@@ -139,13 +140,20 @@ def run(args) -> None:
 
     workspace = args.output.resolve()
 
-    LOG.info("Extracting the package at %s...", workspace)
-    package = CodePackage.extract(workspace, args.package)
+    package = PackageReader(args.package)
+    # The image is checked before being loaded into the Docker daemon
+    package.validate(digests=True)
+
+    # The tests are not needed and the image is read straight from the package
+    LOG.info("Extracting the code at %s...", workspace)
+    package.extract(CODE_TAR_NAME, workspace)
     code_config = AppConf.load(
-        package.config_path, option=AppConfParsingOption.SkipCloud
+        package.extract(MSE_CONFIG_NAME, workspace),
+        option=AppConfParsingOption.SkipCloud,
     )
 
-    image = load_docker_image(client, package.image_tar)
+    with package.open_image() as (f, size):
+        image = load_docker_image(client, f, size)
 
     docker_config = SgxDockerConfig(
         size=args.size,
@@ -168,27 +176,28 @@ def run(args) -> None:
         docker_config,
     )
 
-    with Spinner("Waiting for the configuration server to be ready... "):
+    with Spinner(
+        "Waiting for the configuration server to be ready... "
+    ), ContainerWatcher(client, args.name) as watcher:
         wait_for_conf_server(
             ClockTick(
                 period=5,
                 timeout=60 * args.timeout,
                 message="The configuration server is unreachable!",
+                sleep=watcher.sleep,
             ),
             f"https://localhost:{args.port}",
             False,
-            get_running_app_container,
-            (
-                client,
-                args.name,
-            ),
+            watcher.check,
         )
     LOG.info("The application is now ready to receive the secrets!")
 
     # Generate evidence and RA-TLS certificate files
     container: Container = get_app_container(client, args.name)
 
-    collect_evidence_and_certificate(container, args.pccs, args.output)
+    collect_evidence_and_certificate(
+        container, args.pccs, args.output, CollateralCache()
+    )
 
 
 def run_docker_image(
@@ -4,6 +4,7 @@ from datetime import datetime
 
 import requests
 
+from mse_cli.core.bootstrap import close_session, get_session
 from mse_cli.core.sgx_docker import SgxDockerConfig
 from mse_cli.home.command.helpers import (
     get_app_container,
@@ -60,12 +61,13 @@ def run(args) -> None:
 
 def app_state(host: str, port: int, healthcheck_endpoint: str) -> str:
     """Determine the application state by querying it."""
+    # Note: the configuration server allows any path
+    # So: `healthcheck_endpoint`` does not exist but it's process as /
+    # We can there do one query for the application and the configuration server
+    url = f"https://{host}:{port}{healthcheck_endpoint}"
     try:
-        # Note: the configuration server allows any path
-        # So: `healthcheck_endpoint`` does not exist but it's process as /
-        # We can there do one query for the application and the configuration server
-        response = requests.get(
-            f"https://{host}:{port}{healthcheck_endpoint}",
+        response = get_session(url, verify=False).get(
+            url,
             verify=False,
             timeout=60,
         )
@@ -86,3 +88,6 @@ def app_state(host: str, port: int, healthcheck_endpoint: str) -> str:
 
     except requests.exceptions.SSLError:
         return "initializing"
+
+    finally:
+        close_session(url, False)
@@ -5,7 +5,7 @@ import subprocess
 import sys
 from pathlib import Path
 
-from mse_cli.core.bootstrap import is_waiting_for_secrets
+from mse_cli.core.bootstrap import close_session, is_waiting_for_secrets
 from mse_cli.core.conf import AppConf, AppConfParsingOption
 from mse_cli.core.sgx_docker import SgxDockerConfig
 from mse_cli.error import AppContainerBadState
@@ -47,7 +47,11 @@ def run(args) -> None:
 
     docker = SgxDockerConfig.load(container.attrs, container.labels)
 
-    if is_waiting_for_secrets(f"https://{docker.host}:{docker.port}"):
+    url = f"https://{docker.host}:{docker.port}"
+    waiting = is_waiting_for_secrets(url)
+    close_session(url)
+
+    if waiting:
         raise AppContainerBadState(
             "Your application is waiting for secrets and can't be tested right now."
         )
@@ -0,0 +1,128 @@
+"""mse_cli.home.command.sgx_operator.watch module."""
+
+from pathlib import Path
+from typing import Dict, Tuple
+
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    PublicFormat,
+    load_pem_private_key,
+)
+from intel_sgx_ra.signer import mr_signer_from_pk
+
+from mse_cli.core.enclave import verify_enclave
+from mse_cli.core.sgx_docker import SgxDockerConfig
+from mse_cli.core.watch import Watcher, event_emitter, fetch_certificate, watch_caches
+from mse_cli.home.command.helpers import get_client_docker, get_running_app_container
+from mse_cli.home.command.sgx_operator.evidence import guess_pccs_url
+from mse_cli.log import LOGGER as LOG
+
+
+def add_subparser(subparsers):
+    """Define the subcommand."""
+    parser = subparsers.add_parser(
+        "watch",
+        help="verify the trustworthiness of running MSE applications "
+        "again and again",
+    )
+
+    parser.add_argument(
+        "name",
+        type=str,
+        nargs="+",
+        help="the names of the applications",
+    )
+
+    pccs_url_default = guess_pccs_url() or "https://pccs.example.com"
+    parser.add_argument(
+        "--pccs",
+        type=str,
+        help=f"URL to the PCCS (default: {pccs_url_default})",
+        default=pccs_url_default,
+    )
+
+    parser.add_argument(
+        "--fingerprint",
+        type=str,
+        metavar="HEXDIGEST",
+        help="check the code fingerprint against specific SHA-256 hexdigest",
+    )
+
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60,
+        metavar="S",
+        help="delay between two verifications (Default: 60s)",
+    )
+
+    parser.add_argument(
+        "--events",
+        type=Path,
+        metavar="FILE",
+        help="append the events to a JSON lines file instead of printing them",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="retrieve the collaterals from the PCCS "
+        "instead of reading them from the cache",
+    )
+
+    parser.set_defaults(func=run)
+
+
+def run(args) -> None:
+    """Run the subcommand."""
+    if args.interval <= 0:
+        raise ValueError("The interval should be greater than 0")
+
+    client = get_client_docker()
+
+    # Address and signer key of each app
+    apps: Dict[str, Tuple[str, int, bytes, bytes]] = {}
+    for name in dict.fromkeys(args.name):
+        container = get_running_app_container(client, name)
+        docker = SgxDockerConfig.load(container.attrs, container.labels)
+        signer_pk = (
+            load_pem_private_key(docker.signer_key.read_bytes(), password=None)
+            .public_key()
+            .public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+        )
+        apps[name] = (docker.host, docker.port, signer_pk, mr_signer_from_pk(signer_pk))
+
+    def fetch(name: str) -> str:
+        """Get the RA-TLS certificate of an app."""
+        (host, port, _, _) = apps[name]
+        return fetch_certificate(host, port)
+
+    with watch_caches(args.no_cache) as (collateral_cache, result_cache):
+
+        def verify(name: str, ratls_cert: str):
+            """Verify the certificate of an app."""
+            (_, _, signer_pk, mr_signer) = apps[name]
+            verify_enclave(
+                signer_pk,
+                ratls_cert.encode("utf-8"),
+                args.fingerprint,
+                pccs_url=args.pccs,
+                collateral_cache=collateral_cache,
+                mr_signer=mr_signer,
+                result_cache=result_cache,
+            )
+
+        LOG.info(
+            "Watching %d applications every %ss (press Ctrl+C to stop)...",
+            len(apps),
+            args.interval,
+        )
+        if args.events:
+            LOG.info("The events are written to: %s", args.events)
+
+        try:
+            Watcher(fetch, verify, event_emitter(args.events)).run(
+                list(apps), args.interval, len(apps)
+            )
+        except KeyboardInterrupt:
+            LOG.info("Stopped watching")
@@ -1,10 +1,18 @@
 """mse_cli.home.model.package module."""
 
+import hashlib
+import io
+import json
+import shutil
 import tarfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
 
 from pydantic import BaseModel
 
+from mse_cli.core.compression import zstd_reader
 from mse_cli.error import PackageMalformed
 
 DEFAULT_CODE_DIR = "mse_src"
@@ -16,63 +24,373 @@ DEFAULT_SEAL_SECRETS_FILENAME = "secrets_to_seal.json"
 
 CODE_TAR_NAME = "app.tar"
 DOCKER_IMAGE_TAR_NAME = "image.tar"
+DOCKER_IMAGE_ZST_NAME = "image.tar.zst"
 MSE_CONFIG_NAME = "mse.toml"
 TEST_TAR_NAME = "tests.tar"
+MANIFEST_NAME = "manifest.json"
 
+# Space reserved for the manifest at the head of the package
+MANIFEST_SIZE = 4096
 
-class CodePackage(BaseModel):
-    """Definition of a code package."""
+# The docker image is either `DOCKER_IMAGE_TAR_NAME` or `DOCKER_IMAGE_ZST_NAME`
+PACKAGE_MEMBERS = [CODE_TAR_NAME, TEST_TAR_NAME, MSE_CONFIG_NAME]
 
-    code_tar: Path
-    image_tar: Path
-    test_tar: Path
-    config_path: Path
 
-    def create(
-        self,
-        output_tar: Path,
-    ):
-        """Create the package containing the code and Docker image tarballs."""
-        with tarfile.open(output_tar, "w:") as tar_file:
-            tar_file.add(self.code_tar, CODE_TAR_NAME)
-            tar_file.add(self.image_tar, DOCKER_IMAGE_TAR_NAME)
-            tar_file.add(self.test_tar, TEST_TAR_NAME)
-            tar_file.add(self.config_path, MSE_CONFIG_NAME)
+class PackageMember(BaseModel):
+    """Definition of a member of a package in its manifest."""
 
-    @staticmethod
-    def extract(workspace: Path, package: Path):
-        """Extract the code and image tarballs from the MSE package."""
-        with tarfile.open(package, "r") as f:
-            f.extractall(path=workspace)
+    # Offset of the content of the member in the package
+    offset: int
+    size: int
+    # None for the packages built without manifest
+    sha256: Optional[str]
 
-        code_tar_path = workspace / CODE_TAR_NAME
-        image_tar_path = workspace / DOCKER_IMAGE_TAR_NAME
-        code_config_path = workspace / MSE_CONFIG_NAME
-        test_tar_path = workspace / TEST_TAR_NAME
 
-        if not code_tar_path.exists():
-            raise PackageMalformed(
-                f"'{CODE_TAR_NAME}' was not found in the MSE package"
-            )
+class MemberStream(io.RawIOBase):
+    """Writable stream counting and hashing the bytes of a package member."""
 
-        if not image_tar_path.exists():
-            raise PackageMalformed(
-                f"'{DOCKER_IMAGE_TAR_NAME}' was not found in the MSE package"
-            )
+    def __init__(self, fileobj: BinaryIO):
+        """Write the member into `fileobj`."""
+        super().__init__()
+        self.fileobj = fileobj
+        self.size = 0
+        self.hash = hashlib.sha256()
 
-        if not test_tar_path.exists():
-            raise PackageMalformed(
-                f"'{TEST_TAR_NAME}' was not found in the mse package"
-            )
+    def writable(self) -> bool:
+        """Check whether the stream is writable."""
+        return True
+
+    def write(self, b) -> int:  # type: ignore
+        """Write the bytes `b` in the member."""
+        self.fileobj.write(b)
+        self.hash.update(b)
+        self.size += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        """Get the number of bytes written in the member."""
+        return self.size
+
+
+class MemberReader(io.RawIOBase):
+    """Readable stream of a package member checking its SHA-256 at the end."""
 
-        if not code_config_path.exists():
+    def __init__(self, package: Path, name: str, member: PackageMember):
+        """Read the member `name` described by `member` from `package`."""
+        super().__init__()
+        self.name = name
+        self.member = member
+        self.remaining = member.size
+        self.hash = hashlib.sha256()
+        # pylint: disable=consider-using-with
+        self.f = open(package, "rb")
+        self.f.seek(member.offset)
+
+    def readable(self) -> bool:
+        """Check whether the stream is readable."""
+        return True
+
+    def readinto(self, b) -> int:  # type: ignore
+        """Read the next bytes of the member into `b`."""
+        if self.remaining == 0:
+            self.check()
+            return 0
+
+        n = self.f.readinto(memoryview(b)[: min(len(b), self.remaining)])
+        if not n:
+            raise PackageMalformed(f"'{self.name}' is truncated in the MSE package")
+
+        self.hash.update(memoryview(b)[:n])
+        self.remaining -= n
+
+        return n
+
+    def check(self):
+        """Check the SHA-256 of the member once fully read."""
+        if self.member.sha256 and self.member.sha256 != self.hash.hexdigest():
             raise PackageMalformed(
-                f"'{MSE_CONFIG_NAME}' was not found in the mse package"
+                f"'{self.name}' does not match the manifest of the MSE package"
             )
 
-        return CodePackage(
-            code_tar=code_tar_path,
-            image_tar=image_tar_path,
-            test_tar=test_tar_path,
-            config_path=code_config_path,
+    def close(self):
+        """Close the stream."""
+        self.f.close()
+        super().close()
+
+
+class PackageWriter:
+    """Streaming writer of an MSE package.
+
+    Each member is written straight into the package while its producer
+    generates it: a placeholder header is written first and patched once the
+    size of the member is known. The GNU format keeps the header in one block
+    whatever the size of the member.
+
+    The package starts with a manifest listing the offset, the size and the
+    SHA-256 of each member. It is written when closing the package. If the
+    package is not completed, it is removed instead.
+
+    """
+
+    def __init__(self, output_tar: Path):
+        """Create the package `output_tar`."""
+        self.output_tar = output_tar
+        # pylint: disable=consider-using-with
+        self.tar_file = tarfile.open(output_tar, "w:", format=tarfile.GNU_FORMAT)
+        self.members: Dict[str, PackageMember] = {}
+
+        with self.open(MANIFEST_NAME) as f:
+            f.write(b" " * MANIFEST_SIZE)
+
+        self.manifest = self.members.pop(MANIFEST_NAME)
+
+    def __enter__(self) -> "PackageWriter":
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        """Close the package when exiting the runtime context.
+
+        The partial package is removed if an exception was raised.
+
+        """
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def abort(self):
+        """Remove the package without writing its manifest."""
+        # The manifest placeholder must not be mistaken for a valid package
+        self.tar_file.fileobj.close()  # type: ignore
+        self.tar_file.closed = True
+        self.output_tar.unlink(missing_ok=True)
+
+    def close(self):
+        """Write the manifest and close the package."""
+        manifest = json.dumps(
+            {name: member.dict() for (name, member) in self.members.items()},
+            indent=4,
+        ).encode("utf-8")
+
+        if len(manifest) > MANIFEST_SIZE:
+            raise ValueError("Too many members in the package")
+
+        fileobj: BinaryIO = self.tar_file.fileobj  # type: ignore
+        fileobj.seek(self.manifest.offset)
+        # JSON allows trailing whitespaces
+        fileobj.write(manifest.ljust(MANIFEST_SIZE))
+        fileobj.seek(self.tar_file.offset)
+
+        self.tar_file.close()
+
+    @contextmanager
+    def open(self, name: str) -> Iterator[BinaryIO]:
+        """Open the member `name` of the package as a writable stream.
+
+        Parameters
+        ----------
+        name : str
+            Name of the member in the package.
+
+        Yields
+        -------
+        BinaryIO
+            Stream to write the content of the member into.
+
+        """
+        fileobj: BinaryIO = self.tar_file.fileobj  # type: ignore
+        offset: int = self.tar_file.offset
+
+        info = tarfile.TarInfo(name)
+        info.mode = 0o644
+        info.mtime = int(time.time())
+
+        fileobj.write(self.header(info))
+
+        stream = MemberStream(fileobj)
+        yield stream  # type: ignore
+
+        info.size = stream.size
+        info.offset = offset
+        info.offset_data = offset + tarfile.BLOCKSIZE
+
+        blocks, remainder = divmod(info.size, tarfile.BLOCKSIZE)
+        if remainder > 0:
+            fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+            blocks += 1
+
+        self.tar_file.offset = info.offset_data + blocks * tarfile.BLOCKSIZE
+
+        # Patch the placeholder header with the size of the member
+        fileobj.seek(offset)
+        fileobj.write(self.header(info))
+        fileobj.seek(self.tar_file.offset)
+
+        self.tar_file.members.append(info)  # type: ignore
+        self.members[name] = PackageMember(
+            offset=info.offset_data, size=info.size, sha256=stream.hash.hexdigest()
+        )
+
+    def header(self, info: tarfile.TarInfo) -> bytes:
+        """Get the header block of the member `info`."""
+        buf = info.tobuf(
+            tarfile.GNU_FORMAT, self.tar_file.encoding, self.tar_file.errors
         )
+
+        if len(buf) != tarfile.BLOCKSIZE:
+            raise ValueError(f"Name of the member '{info.name}' is too long")
+
+        return buf
+
+    def add(self, path: Path, name: str):
+        """Add the file `path` to the package as `name`."""
+        with self.open(name) as f, open(path, "rb") as src:
+            shutil.copyfileobj(src, f)
+
+
+class PackageReader:
+    """Random-access reader of an MSE package.
+
+    Members are located from the manifest at the head of the package and read
+    lazily by offset: the package is never extracted as a whole.
+
+    """
+
+    def __init__(self, package: Path):
+        """Index the members of `package`."""
+        self.package = package
+        self.members: Dict[str, PackageMember] = PackageReader.index(package)
+
+    @staticmethod
+    def index(package: Path) -> Dict[str, PackageMember]:
+        """Get the members of `package` from its manifest."""
+        with open(package, "rb") as f:
+            try:
+                info = tarfile.TarInfo.frombuf(
+                    f.read(tarfile.BLOCKSIZE), tarfile.ENCODING, "surrogateescape"
+                )
+            except tarfile.TarError as exc:
+                raise PackageMalformed("The MSE package is not a tarball") from exc
+
+            if info.name == MANIFEST_NAME:
+                try:
+                    manifest = json.loads(f.read(info.size))
+                    return {
+                        name: PackageMember(**member)
+                        for (name, member) in manifest.items()
+                    }
+                except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                    raise PackageMalformed(
+                        f"'{MANIFEST_NAME}' of the MSE package is malformed"
+                    ) from exc
+
+        # Packages built without manifest are indexed from the tar headers
+        with tarfile.open(package, "r:") as tar_file:
+            return {
+                member.name: PackageMember(
+                    offset=member.offset_data, size=member.size, sha256=None
+                )
+                for member in tar_file.getmembers()
+                if member.isfile()
+            }
+
+    def validate(self, digests: bool = False):
+        """Check the package contains all the members.
+
+        Parameters
+        ----------
+        digests : bool
+            Whether to also read each member to check its SHA-256 against
+            the manifest (before handing it to the Docker daemon for instance).
+
+        """
+        package_size = self.package.stat().st_size
+
+        for name in PACKAGE_MEMBERS + [self.image_name()]:
+            if name not in self.members:
+                raise PackageMalformed(f"'{name}' was not found in the MSE package")
+
+            member = self.members[name]
+            if member.offset + member.size > package_size:
+                raise PackageMalformed(f"'{name}' is truncated in the MSE package")
+
+            if digests:
+                with self.open(name) as f:
+                    while f.read(io.DEFAULT_BUFFER_SIZE * 256):
+                        pass
+
+    def open(self, name: str) -> BinaryIO:
+        """Open the member `name` as a readable stream.
+
+        Parameters
+        ----------
+        name : str
+            Name of the member in the package.
+
+        Returns
+        -------
+        BinaryIO
+            Stream of the content of the member. Reading it to the end raises
+            `PackageMalformed` if its SHA-256 does not match the manifest.
+
+        """
+        if name not in self.members:
+            raise PackageMalformed(f"'{name}' was not found in the MSE package")
+
+        return io.BufferedReader(
+            MemberReader(self.package, name, self.members[name])
+        )  # type: ignore
+
+    def image_name(self) -> str:
+        """Get the name of the docker image member (compressed or not)."""
+        for name in (DOCKER_IMAGE_TAR_NAME, DOCKER_IMAGE_ZST_NAME):
+            if name in self.members:
+                return name
+
+        raise PackageMalformed(
+            f"'{DOCKER_IMAGE_TAR_NAME}' was not found in the MSE package"
+        )
+
+    @contextmanager
+    def open_image(self) -> Iterator[Tuple[BinaryIO, Optional[int]]]:
+        """Open the docker image tarball as a readable stream.
+
+        A compressed image is decompressed while being read.
+
+        Yields
+        -------
+        Tuple[BinaryIO, Optional[int]]
+            Stream of the image tarball and its size (None if compressed).
+
+        """
+        name = self.image_name()
+
+        with self.open(name) as f:
+            if name == DOCKER_IMAGE_TAR_NAME:
+                yield (f, self.members[name].size)
+                return
+
+            with zstd_reader(f) as image_tar:
+                yield (image_tar, None)
+
+            # Read up to the end of the member to check its SHA-256
+            f.read()
+
+    def extract(self, name: str, workspace: Path) -> Path:
+        """Extract the member `name` into the directory `workspace`."""
+        path = workspace / name
+
+        with self.open(name) as src, open(path, "wb") as f:
+            shutil.copyfileobj(src, f)
+
+        return path
+
+    def extract_image(self, workspace: Path) -> Path:
+        """Extract the docker image tarball (decompressed) into `workspace`."""
+        path = workspace / DOCKER_IMAGE_TAR_NAME
+
+        with self.open_image() as (src, _), open(path, "wb") as f:
+            shutil.copyfileobj(src, f)
+
+        return path
@@ -41,6 +41,7 @@ from mse_cli.home.command.sgx_operator import spawn as home_spawn
 from mse_cli.home.command.sgx_operator import status as home_status
 from mse_cli.home.command.sgx_operator import stop as home_stop
 from mse_cli.home.command.sgx_operator import test as home_test
+from mse_cli.home.command.sgx_operator import watch as home_watch
 from mse_cli.log import LOGGER as LOG
 from mse_cli.log import setup_logging
 
@@ -107,6 +108,7 @@ def main() -> int:
     home_test.add_subparser(subparsers_home)
     home_localtest.add_subparser(subparsers_home)
     home_verify.add_subparser(subparsers_home)
+    home_watch.add_subparser(subparsers_home)
 
     # We infer the targeted env if the user
     # doesn't specify it in the command
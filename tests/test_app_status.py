@@ -0,0 +1,190 @@
+"""Test the status changes of cloud apps."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+from urllib.parse import parse_qs, urlsplit
+from uuid import UUID
+
+import pytest
+import requests
+
+from mse_cli.cloud.api.types import AppStatus
+from mse_cli.cloud.command.helpers import watch_app_status
+from mse_cli.core.clock_tick import ClockTick
+from mse_cli.error import Timeout
+
+APP_ID = UUID("63322f85-1ff8-4483-91ae-f18d7398d157")
+
+
+class StandInBackend(ThreadingHTTPServer):
+    """Local stand-in of the backend serving the status of one app."""
+
+    def __init__(self, long_poll: bool):
+        """Serve the app on a free port (with long polling if `long_poll`)."""
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.long_poll = long_poll
+        self.status = AppStatus.Spawning
+        self.changed = threading.Condition()
+        # Query of each request received
+        self.requests: List[dict] = []
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the backend."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def set_status(self, status: AppStatus):
+        """Change the status of the app."""
+        with self.changed:
+            self.status = status
+            self.changed.notify_all()
+
+    def app(self) -> dict:
+        """Get the app as sent by the backend."""
+        return {
+            "id": str(APP_ID),
+            "name": "app",
+            "project_id": str(APP_ID),
+            "owner_id": "owner",
+            "domain_name": "app.cosmian.app",
+            "config_domain_name": "config.app.cosmian.app",
+            "docker": "mse-base:latest",
+            "created_at": "2023-06-20T00:00:00",
+            "ready_at": None,
+            "stopped_at": None,
+            "status": self.status.value,
+            "hardware_name": "4g-eu-001",
+            "ssl_certificate_origin": "self",
+            "expires_at": "2023-07-20T00:00:00",
+            "python_application": "app:app",
+            "healthcheck_endpoint": "/",
+        }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Handler of `GET /apps/{app_id}`."""
+
+    server: StandInBackend
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send the app, once its status has changed if asked."""
+        url = urlsplit(self.path)
+        query = {k: v[0] for (k, v) in parse_qs(url.query).items()}
+        self.server.requests.append(query)
+
+        if url.path != f"/apps/{APP_ID}":
+            self.send_error(404)
+            return
+
+        headers = {"Content-Type": "application/json"}
+        if self.server.long_poll and query.get("wait") == "status-change":
+            headers["Mse-Wait"] = "status-change"
+            with self.server.changed:
+                self.server.changed.wait_for(
+                    lambda: self.server.status.value != query.get("status"),
+                    timeout=float(query["timeout"]),
+                )
+
+        body = json.dumps(self.server.app()).encode("utf-8")
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Do not log the requests."""
+
+
+class StandInConnection(requests.Session):
+    """Unauthenticated connection to the stand-in backend."""
+
+    def __init__(self, base_url: str):
+        """Send the requests to `base_url`."""
+        super().__init__()
+        self.base_url = base_url
+
+    def get(self, url: str, **kwargs):  # pylint: disable=arguments-differ
+        """Get `url` relative to the base URL."""
+        return super().get(f"{self.base_url}{url}", **kwargs)
+
+
+def stand_in_backend(long_poll: bool) -> Iterator[StandInBackend]:
+    """Run the stand-in backend in a thread."""
+    backend = StandInBackend(long_poll)
+    thread = threading.Thread(target=backend.serve_forever, daemon=True)
+    thread.start()
+
+    yield backend
+
+    # Release the pending long-poll requests
+    backend.set_status(AppStatus.Stopped)
+    backend.shutdown()
+    backend.server_close()
+
+
+@pytest.fixture
+def streaming_backend() -> Iterator[StandInBackend]:
+    """Run a backend streaming the status changes."""
+    yield from stand_in_backend(long_poll=True)
+
+
+@pytest.fixture
+def polling_backend() -> Iterator[StandInBackend]:
+    """Run a backend only answering at once."""
+    yield from stand_in_backend(long_poll=False)
+
+
+def change_status_later(backend: StandInBackend, status: AppStatus, delay: float):
+    """Change the status of the app after `delay` seconds."""
+    timer = threading.Timer(delay, backend.set_status, (status,))
+    timer.daemon = True
+    timer.start()
+
+
+def wait_status(backend: StandInBackend, status: AppStatus, timeout: float) -> float:
+    """Wait for the app to be in `status` and return the waiting time."""
+    clock = ClockTick(period=3, timeout=timeout, message="Timeout")
+    conn = StandInConnection(backend.url)
+
+    start = time.monotonic()
+    for app in watch_app_status(conn, APP_ID, clock, long_poll=5):  # type: ignore
+        if app.status == status:
+            break
+
+    return time.monotonic() - start
+
+
+def test_long_poll(streaming_backend: StandInBackend):
+    """Test a status change is seen as soon as it happens."""
+    change_status_later(streaming_backend, AppStatus.Initializing, 0.3)
+
+    duration = wait_status(streaming_backend, AppStatus.Initializing, 10)
+
+    assert duration < 1.5
+    assert all(query["wait"] == "status-change" for query in streaming_backend.requests)
+    # The first request gets the app, the second one its next status
+    assert len(streaming_backend.requests) == 2
+    assert "status" not in streaming_backend.requests[0]
+    assert streaming_backend.requests[1]["status"] == AppStatus.Spawning.value
+
+
+def test_fallback_polling(polling_backend: StandInBackend):
+    """Test the app is polled when the backend doesn't stream its status."""
+    change_status_later(polling_backend, AppStatus.Initializing, 0.3)
+
+    wait_status(polling_backend, AppStatus.Initializing, 10)
+
+    assert polling_backend.requests[0]["wait"] == "status-change"
+    assert len(polling_backend.requests) >= 2
+    assert all(query == {} for query in polling_backend.requests[1:])
+
+
+def test_timeout(streaming_backend: StandInBackend):
+    """Test waiting for a status which never comes."""
+    with pytest.raises(Timeout):
+        wait_status(streaming_backend, AppStatus.Running, 2)
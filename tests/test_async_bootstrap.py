@@ -0,0 +1,135 @@
+"""Test core/async_bootstrap.py."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+import pytest
+
+from mse_cli.core import bootstrap as bootstrap_module
+from mse_cli.core.async_bootstrap import BootstrapTarget, bootstrap_all
+from mse_cli.error import AppContainerBadState, AppContainerNotRunning, Timeout
+
+
+class StandInEnclave(ThreadingHTTPServer):
+    """Local stand-in of the configuration server then the app of an enclave."""
+
+    def __init__(self, waiting: bool = True, start_delay: float = 0.5):
+        """Serve on a free port, starting the app `start_delay` after the secrets."""
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.waiting = waiting
+        self.start_delay = start_delay
+        self.configured_at = None
+        self.payloads: List[dict] = []
+
+    @property
+    def url(self) -> str:
+        """Get the URL of the enclave."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Handler of the configuration server and the app."""
+
+    server: StandInEnclave
+    protocol_version = "HTTP/1.1"
+
+    def reply(self, status: int, configuration_server: bool):
+        """Send an empty response."""
+        self.send_response(status)
+        if configuration_server:
+            self.send_header("Mse-Status", "Waiting for secrets")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer as the configuration server or the app."""
+        if self.server.waiting:
+            self.reply(200, configuration_server=True)
+        elif (
+            self.server.configured_at is None
+            or time.monotonic() < self.server.configured_at + self.server.start_delay
+        ):
+            self.reply(503, configuration_server=False)
+        else:
+            self.reply(200, configuration_server=False)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Receive the secrets."""
+        length = int(self.headers["Content-Length"])
+        self.server.payloads.append(json.loads(self.rfile.read(length)))
+        self.server.waiting = False
+        self.server.configured_at = time.monotonic()
+        self.reply(200, configuration_server=False)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Do not log the requests."""
+
+
+@pytest.fixture
+def enclaves() -> Iterator[List[StandInEnclave]]:
+    """Run stand-in enclaves in threads."""
+    servers: List[StandInEnclave] = []
+
+    yield servers
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def start(servers: List[StandInEnclave], server: StandInEnclave) -> BootstrapTarget:
+    """Start `server` and get its target."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    servers.append(server)
+
+    return BootstrapTarget(
+        name=f"app{len(servers)}",
+        url=server.url,
+        healthcheck_endpoint="/health",
+        payload={"uuid": str(len(servers))},
+    )
+
+
+def test_bootstrap_all(enclaves: List[StandInEnclave]):
+    """Test the enclaves are provisioned concurrently."""
+    targets = [start(enclaves, StandInEnclave(start_delay=1)) for _ in range(6)]
+
+    begin = time.monotonic()
+    errors = bootstrap_all(targets, jobs=6, timeout=30, period=0.2)
+
+    assert errors == [None] * 6
+    # Serially, the enclaves would take at least 6s to start
+    assert time.monotonic() - begin < 4
+    for i, enclave in enumerate(enclaves, 1):
+        assert enclave.payloads == [{"uuid": str(i)}]
+    # The connections are closed once each enclave is provisioned
+    assert not {(target.url, True) for target in targets} & set(
+        bootstrap_module._SESSIONS  # pylint: disable=protected-access
+    )
+
+
+def test_bootstrap_all_failures(enclaves: List[StandInEnclave]):
+    """Test a failed enclave does not prevent the others to be provisioned."""
+    ready = start(enclaves, StandInEnclave(start_delay=0))
+    configured = start(enclaves, StandInEnclave(waiting=False))
+    slow = start(enclaves, StandInEnclave(start_delay=60))
+    stopped = start(enclaves, StandInEnclave(start_delay=60))
+
+    def check():
+        """Raise as a stopped container."""
+        raise AppContainerNotRunning("app4 is not running")
+
+    stopped.check = check
+
+    errors = bootstrap_all(
+        [ready, configured, slow, stopped], jobs=2, timeout=2, period=0.2
+    )
+
+    assert errors[0] is None
+    assert isinstance(errors[1], AppContainerBadState)
+    assert isinstance(errors[2], Timeout)
+    assert isinstance(errors[3], AppContainerNotRunning)
+    assert not enclaves[1].payloads
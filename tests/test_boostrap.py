@@ -1,8 +1,15 @@
 """Test boostrap.py."""
 
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from uuid import UUID
 
-from mse_cli.core.bootstrap import ConfigurationPayload
+from mse_cli.core.bootstrap import (
+    ConfigurationPayload,
+    close_session,
+    get_session,
+    is_waiting_for_secrets,
+)
 
 
 def test_payload():
@@ -31,3 +38,64 @@ def test_payload():
         "app_sealed_secrets": "MTIzNDU2Nzg5",
         "code_secret_key": "61626364656667",
     }
+
+
+def test_get_session():
+    """Test the sessions are shared by target."""
+    session = get_session("https://localhost:7788/", False)
+    verified_session = get_session("https://localhost:7788", True)
+
+    assert session is get_session("https://LOCALHOST:7788/health", False)
+    assert session.verify is False
+    assert session is not verified_session
+    assert session is not get_session("https://localhost:7789", False)
+    assert session is not get_session("http://localhost:7788", False)
+
+    close_session("https://localhost:7788/health", False)
+
+    assert session is not get_session("https://localhost:7788", False)
+    assert verified_session is get_session("https://localhost:7788", True)
+
+    for url in (
+        "https://localhost:7788",
+        "https://localhost:7789",
+        "http://localhost:7788",
+    ):
+        close_session(url, False)
+    close_session("https://localhost:7788", True)
+
+
+def test_keep_alive():
+    """Test the probes reuse the same connection."""
+    connections = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        """Configuration server waiting for the secrets."""
+
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Answer the probe."""
+            connections.add(self.client_address)
+            self.send_response(200)
+            self.send_header("Mse-Status", "Waiting")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            """Do not log the requests."""
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        for _ in range(3):
+            assert is_waiting_for_secrets(url)
+    finally:
+        close_session(url)
+        server.shutdown()
+        server.server_close()
+
+    assert len(connections) == 1
@@ -46,10 +46,18 @@ def _test_verify(
             Namespace(
                 **{
                     "fingerprint": fingerprint,
+                    "from_file": None,
+                    "project": None,
+                    "report": Path("verify_report.json"),
+                    "watch": False,
+                    "interval": 60,
+                    "events": None,
                     "context": context,
                     "code": code,
                     "domain_name": domain_name,
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                 }
             )
         )
@@ -117,6 +125,8 @@ def _test_deploy(
                 "no_verify": False,
                 "untrusted_ssl": untrusted_ssl,
                 "workspace": tmp_path,
+                "jobs": 1,
+                "no_cache": False,
                 "timeout": 15,
             }
         )
@@ -287,10 +297,18 @@ def _test_mse_cli(
                 Namespace(
                     **{
                         "fingerprint": "00000000",
+                        "from_file": None,
+                        "project": None,
+                        "report": Path("verify_report.json"),
+                        "watch": False,
+                        "interval": 60,
+                        "events": None,
                         "context": None,
                         "code": None,
                         "domain_name": domain_name,
                         "workspace": tmp_path,
+                        "jobs": 1,
+                        "no_cache": False,
                     }
                 )
             )
@@ -302,10 +320,18 @@ def _test_mse_cli(
                 Namespace(
                     **{
                         "fingerprint": None,
+                        "from_file": None,
+                        "project": None,
+                        "report": Path("verify_report.json"),
+                        "watch": False,
+                        "interval": 60,
+                        "events": None,
                         "context": Context.get_context_filepath(app_id, False),
                         "code": Path("."),
                         "domain_name": domain_name,
                         "workspace": tmp_path,
+                        "jobs": 1,
+                        "no_cache": False,
                     }
                 )
             )
@@ -119,10 +119,18 @@ def test_verify_bad_domain(tmp_path):
             Namespace(
                 **{
                     "fingerprint": None,
+                    "from_file": None,
+                    "project": None,
+                    "report": Path("verify_report.json"),
+                    "watch": False,
+                    "interval": 60,
+                    "events": None,
                     "context": None,
                     "code": None,
                     "domain_name": f"notexist.{os.getenv('MSE_TEST_DOMAIN_NAME')}",
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                 }
             )
         )
@@ -134,10 +142,18 @@ def test_verify_bad_domain(tmp_path):
             Namespace(
                 **{
                     "fingerprint": None,
+                    "from_file": None,
+                    "project": None,
+                    "report": Path("verify_report.json"),
+                    "watch": False,
+                    "interval": 60,
+                    "events": None,
                     "context": None,
                     "code": None,
                     "domain_name": "notexist.app",
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                 }
             )
         )
@@ -157,6 +173,8 @@ def test_deploy_non_free(tmp_path):
                     "no_verify": False,
                     "untrusted_ssl": False,
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                     "timeout": 15,
                 }
             )
@@ -180,6 +198,8 @@ def test_deploy_bad_projet_name(tmp_path):
                     "no_verify": False,
                     "untrusted_ssl": False,
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                     "timeout": 15,
                 }
             )
@@ -202,6 +222,8 @@ def test_deploy_bad_app(tmp_path):
                     "no_verify": False,
                     "untrusted_ssl": False,
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                     "timeout": 15,
                 }
             )
@@ -222,6 +244,8 @@ def test_deploy_bad_docker(tmp_path):
                     "no_verify": False,
                     "untrusted_ssl": False,
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                     "timeout": 15,
                 }
             )
@@ -245,6 +269,8 @@ def test_deploy_latest_docker(tmp_path):
                     "no_verify": False,
                     "untrusted_ssl": False,
                     "workspace": tmp_path,
+                    "jobs": 1,
+                    "no_cache": False,
                     "timeout": 15,
                 }
             )
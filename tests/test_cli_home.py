@@ -122,6 +122,8 @@ def test_package(workspace: Path, cmd_log: io.StringIO):
                 "dockerfile": pytest.app_path / "Dockerfile",
                 "test": pytest.app_path / "tests",
                 "encrypt": True,
+                "jobs": 1,
+                "compress": False,
                 "output": workspace,
             }
         )
@@ -161,6 +163,8 @@ def test_package_project(workspace: Path, cmd_log: io.StringIO):
                 "dockerfile": None,
                 "test": None,
                 "encrypt": True,
+                "jobs": 1,
+                "compress": False,
                 "output": workspace,
             }
         )
@@ -282,6 +286,10 @@ def test_evidence(workspace: Path, cmd_log: io.StringIO, app_name: str, pccs_url
                 "name": app_name,
                 "pccs": pccs_url,
                 "output": workspace,
+                "no_cache": False,
+                "all": False,
+                "label": None,
+                "jobs": 8,
             }
         )
     )
@@ -308,7 +316,10 @@ def test_verify(workspace: Path, cmd_log: io.StringIO):
         Namespace(
             **{
                 "package": pytest.package_path,
-                "evidence": pytest.evidence_path,
+                "evidence": [pytest.evidence_path],
+                "no_cache": False,
+                "jobs": 1,
+                "worker": False,
                 "output": workspace,
             }
         )
@@ -413,6 +424,10 @@ def test_run(cmd_log: io.StringIO, app_name: str):
                 "timeout": 5,
                 "secrets": pytest.app_path / "secrets.json",
                 "sealed_secrets": pytest.sealed_secrets,
+                "all": False,
+                "names": None,
+                "sealed_dir": None,
+                "jobs": 8,
             }
         )
     )
@@ -693,6 +708,8 @@ def test_plaintext(
                 "dockerfile": pytest.app_path / "Dockerfile",
                 "test": pytest.app_path / "tests",
                 "encrypt": False,  # We do not encrypt here
+                "jobs": 1,
+                "compress": False,
                 "output": workspace,
             }
         )
@@ -803,6 +820,8 @@ def test_plaintext_project(
                 "dockerfile": None,
                 "test": None,
                 "encrypt": False,  # We do not encrypt here
+                "jobs": 1,
+                "compress": False,
                 "output": workspace,
             }
         )
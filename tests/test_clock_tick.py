@@ -0,0 +1,98 @@
+"""Test core/clock_tick.py."""
+
+import pytest
+
+from mse_cli.core import clock_tick as clock_tick_module
+from mse_cli.core.clock_tick import ClockTick
+from mse_cli.error import Timeout
+
+
+class FakeTime:
+    """Fake monotonic clock advanced by the sleeps and the probes."""
+
+    def __init__(self):
+        """Start the clock at 0."""
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        """Get the current time."""
+        return self.now
+
+    def sleep(self, delay: float):
+        """Sleep for `delay` seconds."""
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def fake_time(monkeypatch) -> FakeTime:
+    """Replace the clock of the module."""
+    fake = FakeTime()
+    monkeypatch.setattr(clock_tick_module, "time", fake)
+    return fake
+
+
+def test_check_first(fake_time: FakeTime):
+    """Test the first tick does not wait."""
+    clock = ClockTick(period=3, timeout=60, message="timeout")
+
+    assert clock.tick()
+    assert not fake_time.sleeps
+    assert clock.ticks == 1
+
+
+def test_backoff(fake_time: FakeTime):
+    """Test the delay grows up to the period."""
+    clock = ClockTick(period=3, timeout=60, message="timeout", jitter=0)
+
+    for _ in range(6):
+        clock.tick()
+
+    assert fake_time.sleeps == [0.5, 1.0, 2.0, 3, 3]
+
+
+def test_jitter(fake_time: FakeTime):
+    """Test the delay is randomized around the backoff."""
+    clock = ClockTick(period=4, timeout=600, message="timeout", initial_period=4)
+
+    for _ in range(20):
+        clock.tick()
+
+    assert all(3.6 <= delay <= 4.4 for delay in fake_time.sleeps)
+    assert len(set(fake_time.sleeps)) > 1
+
+
+def test_timeout(fake_time: FakeTime):
+    """Test the time spent in the probes counts towards the timeout."""
+    clock = ClockTick(period=3, timeout=10, message="timeout", jitter=0)
+
+    clock.tick()
+    # Slow probe
+    fake_time.now += 9
+    clock.tick()
+    # The last sleep does not exceed the timeout
+    assert fake_time.sleeps == [0.5]
+
+    fake_time.now += 0.25
+    clock.tick()
+    assert fake_time.sleeps == [0.5, 0.25]
+
+    with pytest.raises(Timeout, match="timeout"):
+        clock.tick()
+
+
+def test_summary(fake_time: FakeTime):
+    """Test the probes are reported."""
+    clock = ClockTick(period=3, timeout=60, message="timeout", jitter=0)
+
+    clock.tick()
+    fake_time.now += 1
+    clock.tick()
+    fake_time.now += 3
+    clock.tick()
+
+    assert clock.probes == [1, 3]
+    assert clock.summary() == (
+        "3 probe(s) in 5.50s (probe duration: mean 2.00s, max 3.00s)"
+    )
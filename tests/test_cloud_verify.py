@@ -0,0 +1,140 @@
+"""Test cloud/command/verify.py."""
+
+import io
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives.serialization import Encoding
+from intel_sgx_ra import attest as attest_module
+from intel_sgx_ra.ratls import ratls_verify
+from test_collaterals import make_collaterals
+
+from conftest import capture_logs
+
+from mse_cli.cloud.command import helpers as helpers_module
+from mse_cli.cloud.command import verify as verify_module
+from mse_cli.cloud.command.verify import read_domain_names, verify_all
+from mse_cli.core import collaterals as collaterals_module
+from mse_cli.error import RatlsVerificationFailure, WrongMREnclave
+from mse_cli.home.model.evidence import ApplicationEvidence
+
+
+class FakeSignerKeyCache:
+    """Fake signer key cache counting the downloads."""
+
+    downloads = 0
+
+    def __init__(self, max_age):
+        """Ignore the max age."""
+
+    def get(self, _url):
+        """Get the signer key."""
+        FakeSignerKeyCache.downloads += 1
+        return b"public key", b"mr signer"
+
+
+def test_read_domain_names(tmp_path: Path):
+    """Test reading the domain names of a file."""
+    path = tmp_path / "domains.txt"
+    path.write_text("# apps\napp1.example.com\n\n  app2.example.com  # staging\n")
+
+    assert read_domain_names(path) == ["app1.example.com", "app2.example.com"]
+
+
+def test_verify_all(tmp_path: Path, cmd_log: io.StringIO, monkeypatch):
+    """Test verifying many apps shares the signer key and the collaterals."""
+    FakeSignerKeyCache.downloads = 0
+    monkeypatch.setattr(verify_module, "SignerKeyCache", FakeSignerKeyCache)
+
+    caches = set()
+    threads = set()
+
+    def verify_ratls(domain_name, mrenclave, signer_key, collateral_cache, _):
+        caches.add(id(collateral_cache))
+        threads.add(threading.get_ident())
+        assert signer_key == (b"public key", b"mr signer")
+        if domain_name.startswith("bad"):
+            raise WrongMREnclave(f"Code fingerprint of {mrenclave} is wrong")
+        return "certificate"
+
+    monkeypatch.setattr(verify_module, "verify_ratls", verify_ratls)
+
+    report_path = tmp_path / "report.json"
+    domain_names = ["app1.example.com", "bad.example.com", "app2.example.com"]
+
+    with pytest.raises(RatlsVerificationFailure):
+        verify_all(domain_names + ["app1.example.com"], "00", 2, True, report_path)
+
+    report = json.loads(report_path.read_text())
+
+    assert report["fingerprint"] == "00"
+    assert report["passed"] == 2
+    assert report["failed"] == 1
+    assert [result["domain_name"] for result in report["results"]] == domain_names
+    assert [result["success"] for result in report["results"]] == [True, False, True]
+    assert report["results"][1]["error"] == "Code fingerprint of 00 is wrong"
+    assert all(result["duration"] >= 0 for result in report["results"])
+
+    assert FakeSignerKeyCache.downloads == 1
+    assert len(caches) == 1
+    assert len(threads) <= 2
+
+    output = capture_logs(cmd_log)
+    assert "Verification successful: app2.example.com" in output
+    assert "Verification failed: bad.example.com" in output
+
+    # All the apps are trustworthy
+    verify_all(["app1.example.com"], None, 1, True, report_path)
+    assert json.loads(report_path.read_text())["failed"] == 0
+    assert "Verification success" in capture_logs(cmd_log)
+
+
+def test_verify_all_shared_collaterals(tmp_path: Path, monkeypatch):
+    """Test the apps of the same platform request the PCCS once in all."""
+    evidence = ApplicationEvidence.load(
+        Path(__file__).parent / "data" / "evidence.json"
+    )
+    quote = ratls_verify(evidence.ratls_certificate)
+    now = datetime.now(timezone.utc)
+    collaterals = make_collaterals(now - timedelta(days=1), now + timedelta(days=30))
+
+    lock = threading.Lock()
+    requests = []
+
+    def retrieve_collaterals(quote, pccs_url):
+        with lock:
+            requests.append(pccs_url)
+        return collaterals
+
+    for module in (collaterals_module, attest_module):
+        monkeypatch.setattr(module, "retrieve_collaterals", retrieve_collaterals)
+    monkeypatch.setattr(
+        verify_module,
+        "SignerKeyCache",
+        lambda max_age: SimpleNamespace(
+            get=lambda _url: (b"public key", bytes(quote.report_body.mr_signer))
+        ),
+    )
+    monkeypatch.setattr(
+        helpers_module,
+        "get_ratls_certificate",
+        lambda _domain_name: evidence.ratls_certificate.public_bytes(
+            Encoding.PEM
+        ).decode("utf-8"),
+    )
+
+    report_path = tmp_path / "report.json"
+    domain_names = [f"app{i}.example.com" for i in range(8)]
+
+    # The collaterals are signed by a fake CA: all the quotes are rejected
+    with pytest.raises(RatlsVerificationFailure):
+        verify_all(domain_names, None, 4, True, report_path)
+
+    results = json.loads(report_path.read_text())["results"]
+    assert len(results) == 8
+    assert all("Root CA CRL" in result["error"] for result in results)
+    assert len(requests) == 1
@@ -0,0 +1,233 @@
+"""Test core/collaterals.py."""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from intel_sgx_ra import attest as attest_module
+from intel_sgx_ra.error import CertificateError
+from intel_sgx_ra.ratls import ratls_verify
+
+from mse_cli.core import collaterals as collaterals_module
+from mse_cli.core.collaterals import CollateralCache, validity
+from mse_cli.core.enclave import verify_enclave
+from mse_cli.home.model.evidence import ApplicationEvidence
+
+NOW = datetime(2023, 6, 20, tzinfo=timezone.utc)
+
+
+def make_collaterals(issued: datetime, next_update: datetime):
+    """Build collaterals valid from `issued` to `next_update`."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, "Test CA")])
+
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(issued)
+        .not_valid_after(issued + timedelta(days=365))
+        .sign(key, hashes.SHA256())
+    )
+
+    def crl(days: int) -> x509.CertificateRevocationList:
+        return (
+            x509.CertificateRevocationListBuilder()
+            .issuer_name(name)
+            .last_update(issued)
+            .next_update(next_update + timedelta(days=days))
+            .sign(key, hashes.SHA256())
+        )
+
+    def dates(days: int):
+        return {
+            "issueDate": issued.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "nextUpdate": (next_update + timedelta(days=days)).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            ),
+        }
+
+    return (
+        json.dumps({"tcbInfo": dates(1)}).encode("utf-8"),
+        json.dumps({"enclaveIdentity": dates(0)}).encode("utf-8"),
+        cert,
+        crl(2),
+        crl(3),
+    )
+
+
+def test_validity():
+    """Test the validity period is the intersection of the collaterals ones."""
+    collaterals = make_collaterals(NOW, NOW + timedelta(days=30))
+
+    assert validity(collaterals) == (NOW, NOW + timedelta(days=30))
+
+
+def test_get_put(tmp_path: Path):
+    """Test an entry is read until the earliest next update."""
+    cache = CollateralCache(tmp_path)
+    collaterals = make_collaterals(NOW, NOW + timedelta(days=30))
+
+    assert cache.get("key", NOW) is None
+
+    cache.put("key", collaterals, NOW)
+    (tcb_info, qe_identity, tcb_cert, root_ca_crl, pck_ca_crl) = cache.get(
+        "key", NOW + timedelta(days=1)
+    )
+
+    assert tcb_info == collaterals[0]
+    assert qe_identity == collaterals[1]
+    assert tcb_cert == collaterals[2]
+    assert root_ca_crl == collaterals[3]
+    assert pck_ca_crl == collaterals[4]
+
+    # Before the issue date and after the next update
+    assert cache.get("key", NOW - timedelta(days=1)) is None
+    assert cache.get("key", NOW + timedelta(days=30)) is None
+
+
+def test_put_evict_outdated(tmp_path: Path):
+    """Test putting an entry removes the outdated ones."""
+    cache = CollateralCache(tmp_path)
+
+    cache.put("old", make_collaterals(NOW, NOW + timedelta(days=1)), NOW)
+    cache.put("new", make_collaterals(NOW, NOW + timedelta(days=30)), NOW)
+    assert (tmp_path / "old").exists()
+
+    cache.put("other", make_collaterals(NOW, NOW + timedelta(days=30)), NOW)
+    cache.put("new", make_collaterals(NOW, NOW + timedelta(days=30)), NOW)
+    assert (tmp_path / "old").exists()
+
+    cache.put(
+        "new", make_collaterals(NOW, NOW + timedelta(days=30)), NOW + timedelta(2)
+    )
+    assert not (tmp_path / "old").exists()
+    assert (tmp_path / "other").exists()
+
+
+def test_malformed_entry(tmp_path: Path):
+    """Test a malformed entry is a miss."""
+    cache = CollateralCache(tmp_path)
+
+    (tmp_path / "key").write_text("{}")
+    assert cache.get("key", NOW) is None
+
+    (tmp_path / "key").write_text("not json")
+    assert cache.get("key", NOW) is None
+
+
+def test_retrieve(tmp_path: Path, monkeypatch):
+    """Test the PCCS is only requested on a cache miss."""
+    quote = ratls_verify(
+        ApplicationEvidence.load(
+            Path(__file__).parent / "data" / "evidence.json"
+        ).ratls_certificate
+    )
+    now = datetime.now(timezone.utc)
+    collaterals = make_collaterals(now - timedelta(days=1), now + timedelta(days=30))
+
+    requests = []
+
+    def retrieve_collaterals(quote, pccs_url):
+        requests.append(pccs_url)
+        return collaterals
+
+    monkeypatch.setattr(
+        collaterals_module, "retrieve_collaterals", retrieve_collaterals
+    )
+
+    cache = CollateralCache(tmp_path)
+    key = CollateralCache.key(quote, "https://pccs.example.com")
+
+    assert key == CollateralCache.key(quote, "https://pccs.example.com/")
+    assert key != CollateralCache.key(quote, "https://other.example.com")
+
+    assert cache.retrieve(quote, "https://pccs.example.com")[0] == collaterals[0]
+    assert cache.retrieve(quote, "https://pccs.example.com")[0] == collaterals[0]
+    assert requests == ["https://pccs.example.com"]
+
+    cache.retrieve(quote, "https://other.example.com")
+    assert requests == ["https://pccs.example.com", "https://other.example.com"]
+
+
+def test_retrieve_concurrent(tmp_path: Path, monkeypatch):
+    """Test threads only wait for the retrieval of the same collaterals."""
+    quote = ratls_verify(
+        ApplicationEvidence.load(
+            Path(__file__).parent / "data" / "evidence.json"
+        ).ratls_certificate
+    )
+    now = datetime.now(timezone.utc)
+    collaterals = make_collaterals(now - timedelta(days=1), now + timedelta(days=30))
+
+    requests = []
+    # Only passed if both PCCS are requested at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def retrieve_collaterals(quote, pccs_url):
+        requests.append(pccs_url)
+        barrier.wait()
+        time.sleep(0.1)
+        return collaterals
+
+    monkeypatch.setattr(
+        collaterals_module, "retrieve_collaterals", retrieve_collaterals
+    )
+
+    cache = CollateralCache(tmp_path)
+    urls = ["https://pccs.example.com", "https://other.example.com"] * 3
+    results = [None] * len(urls)
+
+    def retrieve(i: int):
+        results[i] = cache.retrieve(quote, urls[i])[0]
+
+    threads = [threading.Thread(target=retrieve, args=(i,)) for i in range(len(urls))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [collaterals[0]] * len(urls)
+    assert sorted(requests) == sorted(set(urls))
+
+
+def test_verify_enclave_cache_hit(tmp_path: Path, monkeypatch):
+    """Test the PCCS is not requested when the collaterals are cached."""
+    evidence = ApplicationEvidence.load(
+        Path(__file__).parent / "data" / "evidence.json"
+    )
+    quote = ratls_verify(evidence.ratls_certificate)
+    now = datetime.now(timezone.utc)
+    collaterals = make_collaterals(now - timedelta(days=1), now + timedelta(days=30))
+
+    requests = []
+
+    def retrieve_collaterals(quote, pccs_url):
+        requests.append(pccs_url)
+        return collaterals
+
+    for module in (collaterals_module, attest_module):
+        monkeypatch.setattr(module, "retrieve_collaterals", retrieve_collaterals)
+
+    cache = CollateralCache(tmp_path)
+    cache.put(CollateralCache.key(quote, "https://pccs.example.com"), collaterals)
+
+    # The quote is checked against the cached collaterals, signed by a fake CA
+    with pytest.raises(CertificateError, match="Root CA CRL"):
+        verify_enclave(
+            evidence.signer_pk,
+            evidence.ratls_certificate,
+            None,
+            pccs_url="https://pccs.example.com",
+            collateral_cache=cache,
+        )
+
+    assert not requests
@@ -0,0 +1,29 @@
+"""Test core/compression.py."""
+
+import io
+import os
+
+import pytest
+
+from mse_cli.core.compression import zstd_reader, zstd_writer
+
+pytest.importorskip("zstandard")
+
+
+def test_zstd():
+    """Test `zstd_writer` and `zstd_reader` functions."""
+    data = os.urandom(1024) * 1024
+    f = io.BytesIO()
+
+    with zstd_writer(f) as writer:
+        for i in range(0, len(data), 4096):
+            writer.write(data[i : i + 4096])
+
+    assert not f.closed
+    assert len(f.getvalue()) < len(data)
+
+    f.seek(0)
+    with zstd_reader(f) as reader:
+        assert reader.read() == data
+
+    assert not f.closed
@@ -0,0 +1,128 @@
+"""Test core/container_watcher.py."""
+
+import queue
+import threading
+import time
+from typing import Iterator, Optional
+
+import pytest
+from docker.errors import NotFound
+
+from mse_cli.core.clock_tick import ClockTick
+from mse_cli.core.container_watcher import ContainerWatcher
+from mse_cli.error import AppContainerNotRunning
+
+
+class FakeEvents:
+    """Stream of Docker events fed by the test."""
+
+    def __init__(self):
+        """Create an empty stream."""
+        self.queue: queue.Queue = queue.Queue()
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield the events until the stream is closed."""
+        while (event := self.queue.get()) is not None:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def close(self):
+        """Close the stream."""
+        self.queue.put(None)
+
+
+class FakeContainer:
+    """Container as inspected."""
+
+    def __init__(self, status: str, health: Optional[str] = None):
+        """Create a container in `status`."""
+        self.status = status
+        self.attrs = {"State": {"Health": {"Status": health}} if health else {}}
+
+
+class FakeClient:
+    """Docker client of a single container."""
+
+    def __init__(self, container: Optional[FakeContainer]):
+        """Create a client knowing `container`."""
+        self.container = container
+        self.stream = FakeEvents()
+        self.inspections = 0
+
+    def events(self, **_kwargs) -> FakeEvents:
+        """Subscribe to the events."""
+        return self.stream
+
+    @property
+    def containers(self):
+        """Get the container collection."""
+        return self
+
+    def get(self, _name: str) -> FakeContainer:
+        """Inspect the container."""
+        self.inspections += 1
+        if self.container is None:
+            raise NotFound("No such container")
+        return self.container
+
+
+def test_events():
+    """Test the status is updated from the events without inspection."""
+    client = FakeClient(FakeContainer("created"))
+
+    with ContainerWatcher(client, "app") as watcher:  # type: ignore
+        assert watcher.status == "created"
+
+        client.stream.queue.put({"Action": "start"})
+        client.stream.queue.put({"Action": "health_status: healthy"})
+        watcher.sleep(5)
+        while watcher.health is None:
+            watcher.sleep(5)
+
+        assert watcher.is_running()
+        assert watcher.health == "healthy"
+        watcher.check()
+
+        client.stream.queue.put(
+            {"Action": "die", "Actor": {"Attributes": {"exitCode": "1"}}}
+        )
+        while watcher.is_running():
+            watcher.sleep(5)
+
+        assert watcher.status == "exited"
+        assert watcher.exit_code == 1
+        with pytest.raises(AppContainerNotRunning):
+            watcher.check()
+
+    assert client.inspections == 1
+
+
+def test_sleep_wakes_up():
+    """Test a sleeping waiter is woken up by an event."""
+    client = FakeClient(FakeContainer("running"))
+
+    with ContainerWatcher(client, "app") as watcher:  # type: ignore
+        timer = threading.Timer(0.2, client.stream.queue.put, ({"Action": "die"},))
+        timer.start()
+
+        clock = ClockTick(period=30, timeout=60, message="", sleep=watcher.sleep)
+        start = time.monotonic()
+        with pytest.raises(AppContainerNotRunning):
+            while clock.tick():
+                watcher.check()
+
+        assert time.monotonic() - start < 5
+
+
+def test_fallback_inspection():
+    """Test the container is inspected once the events are not listened."""
+    client = FakeClient(FakeContainer("running"))
+
+    with ContainerWatcher(client, "app") as watcher:  # type: ignore
+        client.stream.queue.put(ConnectionError("Docker daemon restarted"))
+        watcher.thread.join(timeout=5)
+
+        client.container = None
+        assert watcher.status == "removed"
+        assert client.inspections == 2
@@ -166,9 +166,14 @@ def test_path():
     assert conf.app_cert_path == workspace / "fullchain.pem"
     assert conf.decrypted_code_path == workspace / "decrypted_code"
     assert conf.decrypted_code_path.exists()
-    assert conf.encrypted_code_path == workspace / "encrypted_code"
-    assert conf.encrypted_code_path.exists()
     assert conf.tar_code_path == workspace / "app.tar"
+    assert (
+        conf.code_cache_path
+        == Path(
+            "~/.config/mse/context/d17a9cbd-e2ff-4f77-ba03-e9d8ea58ca2e/code_cache"
+        ).expanduser()
+    )
+    assert conf.code_cache_path.exists()
     assert (
         conf.path
         == Path(
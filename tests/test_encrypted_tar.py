@@ -0,0 +1,247 @@
+"""Test core/encrypted_tar.py."""
+
+import tarfile
+from pathlib import Path
+
+import pytest
+from mse_lib_crypto.error import NonceNotFound
+from mse_lib_crypto.xsalsa20_poly1305 import (
+    decrypt,
+    encrypt,
+    encrypt_directory,
+    random_key,
+)
+
+import mse_cli.core.encrypted_tar
+from mse_cli.core.encrypted_tar import encrypt_tar
+from mse_cli.core.ignore_file import IgnoreMatcher
+
+
+@pytest.fixture
+def code_path(tmp_path: Path) -> Path:
+    """Create a code directory to encrypt."""
+    path = tmp_path / "code"
+    (path / "module" / "__pycache__").mkdir(parents=True)
+    (path / ".git").mkdir()
+
+    (path / "app.py").write_text("print('app')")
+    (path / "requirements.txt").write_text("flask")
+    (path / "secrets.json").write_text("{}")
+    (path / ".env").write_text("KEY=VALUE")
+    (path / ".git" / "HEAD").write_text("ref: refs/heads/main")
+    (path / "module" / "helper.py").write_text("print('helper')")
+    (path / "module" / "__pycache__" / "helper.pyc").write_bytes(b"\x00")
+
+    return path
+
+
+def test_encrypt_tar(code_path: Path, tmp_path: Path):
+    """Test `encrypt_tar` function."""
+    key = random_key()
+    tar_path = tmp_path / "app.tar"
+
+    nonces = encrypt_tar(
+        dir_path=code_path,
+        tar_path=tar_path,
+        key=key,
+        nonces=None,
+        exceptions=["requirements.txt"],
+        ignore=IgnoreMatcher(["secrets.json", "__pycache__/"]),
+    )
+
+    assert set(nonces) == {"app.py", "module/helper.py"}
+
+    with tarfile.open(tar_path, "r:") as tar_file:
+        assert sorted(tar_file.getnames()) == [
+            "app.py.enc",
+            "module/helper.py.enc",
+            "requirements.txt",
+        ]
+
+        for name, content in (
+            ("app.py", b"print('app')"),
+            ("module/helper.py", b"print('helper')"),
+        ):
+            member = tar_file.extractfile(f"{name}.enc")
+            assert member
+            assert decrypt(member.read(), key) == content
+
+        member = tar_file.extractfile("requirements.txt")
+        assert member
+        assert member.read() == b"flask"
+
+
+def test_encrypt_tar_same_as_encrypt_directory(code_path: Path, tmp_path: Path):
+    """Test `encrypt_tar` produces the same ciphertexts as `encrypt_directory`."""
+    key = random_key()
+    nonces = encrypt_tar(
+        dir_path=code_path,
+        tar_path=tmp_path / "app.tar",
+        key=key,
+        nonces=None,
+        exceptions=["requirements.txt"],
+        ignore=IgnoreMatcher(["__pycache__/"]),
+    )
+
+    out_dir_path = tmp_path / "encrypted_code"
+    encrypt_directory(
+        dir_path=code_path,
+        pattern="*",
+        key=key,
+        nonces={**nonces, ".env": b"\x00" * 24, ".git/HEAD": b"\x00" * 24},
+        exceptions=["requirements.txt"],
+        ignore_patterns=["__pycache__"],
+        out_dir_path=out_dir_path,
+    )
+
+    with tarfile.open(tmp_path / "app.tar", "r:") as tar_file:
+        for member in tar_file.getmembers():
+            f = tar_file.extractfile(member)
+            assert f
+            assert f.read() == (out_dir_path / member.name).read_bytes()
+
+
+def test_encrypt_tar_nonce_not_found(code_path: Path, tmp_path: Path):
+    """Test `encrypt_tar` function with missing nonces."""
+    with pytest.raises(NonceNotFound):
+        encrypt_tar(
+            dir_path=code_path,
+            tar_path=tmp_path / "app.tar",
+            key=random_key(),
+            nonces={"app.py": b"\x00" * 24},
+            exceptions=["requirements.txt"],
+            ignore=IgnoreMatcher(["__pycache__/"]),
+        )
+
+
+def test_encrypt_tar_jobs(code_path: Path, tmp_path: Path):
+    """Test `encrypt_tar` produces the same tarball with several processes."""
+    key = random_key()
+    nonces = encrypt_tar(
+        dir_path=code_path,
+        tar_path=tmp_path / "app.tar",
+        key=key,
+        nonces=None,
+        exceptions=["requirements.txt"],
+        ignore=IgnoreMatcher(["__pycache__/"]),
+    )
+
+    assert (
+        encrypt_tar(
+            dir_path=code_path,
+            tar_path=tmp_path / "app_jobs.tar",
+            key=key,
+            nonces=nonces,
+            exceptions=["requirements.txt"],
+            ignore=IgnoreMatcher(["__pycache__/"]),
+            jobs=4,
+        )
+        == nonces
+    )
+
+    assert (tmp_path / "app.tar").read_bytes() == (
+        tmp_path / "app_jobs.tar"
+    ).read_bytes()
+
+
+def test_encrypt_tar_cache(code_path: Path, tmp_path: Path, monkeypatch):
+    """Test `encrypt_tar` only encrypts the modified files with a cache."""
+    key = random_key()
+    cache_path = tmp_path / "cache"
+    cache_path.mkdir()
+
+    nonces = encrypt_tar(
+        dir_path=code_path,
+        tar_path=tmp_path / "app.tar",
+        key=key,
+        nonces=None,
+        exceptions=["requirements.txt"],
+        ignore=IgnoreMatcher(["__pycache__/"]),
+        cache_path=cache_path,
+    )
+
+    assert len(list(cache_path.iterdir())) == len(nonces)
+
+    encrypted = []
+
+    def encrypt_spy(data: bytes, key: bytes, nonce: bytes) -> bytes:
+        encrypted.append(data)
+        return encrypt(data, key, nonce)
+
+    monkeypatch.setattr(mse_cli.core.encrypted_tar, "encrypt", encrypt_spy)
+
+    read = []
+    read_bytes = Path.read_bytes
+
+    def read_bytes_spy(path: Path) -> bytes:
+        read.append(path.name)
+        return read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", read_bytes_spy)
+
+    (code_path / "app.py").write_text("print('new app')")
+    (code_path / "secrets.json").unlink()
+    del nonces["secrets.json"]
+
+    encrypt_tar(
+        dir_path=code_path,
+        tar_path=tmp_path / "app_cache.tar",
+        key=key,
+        nonces=nonces,
+        exceptions=["requirements.txt"],
+        ignore=IgnoreMatcher(["__pycache__/"]),
+        cache_path=cache_path,
+    )
+
+    # Only the modified file has been read and encrypted again
+    assert encrypted == [b"print('new app')"]
+    assert read == ["app.py"]
+    # The entry of the removed file has been pruned
+    assert len(list(cache_path.iterdir())) == len(nonces)
+
+    encrypt_tar(
+        dir_path=code_path,
+        tar_path=tmp_path / "app_no_cache.tar",
+        key=key,
+        nonces=nonces,
+        exceptions=["requirements.txt"],
+        ignore=IgnoreMatcher(["__pycache__/"]),
+    )
+
+    assert (tmp_path / "app_cache.tar").read_bytes() == (
+        tmp_path / "app_no_cache.tar"
+    ).read_bytes()
+
+
+def test_encrypt_tar_cache_key(code_path: Path, tmp_path: Path):
+    """Test the cache never returns a ciphertext made with another key."""
+    cache_path = tmp_path / "cache"
+    cache_path.mkdir()
+
+    nonces = encrypt_tar(
+        dir_path=code_path,
+        tar_path=tmp_path / "app.tar",
+        key=random_key(),
+        nonces=None,
+        exceptions=["requirements.txt"],
+        ignore=IgnoreMatcher(["__pycache__/"]),
+        cache_path=cache_path,
+    )
+
+    key = random_key()
+    for name, cache in (("app_cache.tar", cache_path), ("app_no_cache.tar", None)):
+        encrypt_tar(
+            dir_path=code_path,
+            tar_path=tmp_path / name,
+            key=key,
+            nonces=nonces,
+            exceptions=["requirements.txt"],
+            ignore=IgnoreMatcher(["__pycache__/"]),
+            cache_path=cache,
+        )
+
+    assert (tmp_path / "app_cache.tar").read_bytes() == (
+        tmp_path / "app_no_cache.tar"
+    ).read_bytes()
+    # The entries of the previous key have been pruned
+    assert len(list(cache_path.iterdir())) == len(nonces)
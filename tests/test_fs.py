@@ -0,0 +1,111 @@
+"""Test core/fs.py."""
+
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from mse_cli.core.fs import is_hidden, ls, tar
+from mse_cli.core.ignore_file import IgnoreMatcher
+
+
+@pytest.fixture
+def tree_path(tmp_path: Path) -> Path:
+    """Create a directory tree to list."""
+    path = tmp_path / "tree"
+
+    for file in (
+        "a.txt",
+        "a/b.txt",
+        "a/c/d.txt",
+        "a.b/e.txt",
+        "B.txt",
+        ".env",
+        ".venv/lib/site.py",
+        "a/.hidden/f.txt",
+        "a/__pycache__/g.pyc",
+    ):
+        (path / file).parent.mkdir(parents=True, exist_ok=True)
+        (path / file).write_text(file)
+
+    return path
+
+
+def test_ls(tree_path: Path):
+    """Test `ls` function."""
+    expected = [
+        path
+        for path in sorted(tree_path.rglob("*"))
+        if path.is_file() and not is_hidden(path.relative_to(tree_path))
+    ]
+
+    assert list(ls(tree_path)) == expected
+
+
+def test_ls_dot_files(tree_path: Path):
+    """Test `ls` function with dot files."""
+    expected = [path for path in sorted(tree_path.rglob("*")) if path.is_file()]
+
+    assert list(ls(tree_path, dot_files=True)) == expected
+
+
+def test_ls_ignore(tree_path: Path):
+    """Test `ls` function with ignore rules."""
+    assert [
+        path.relative_to(tree_path)
+        for path in ls(tree_path, ignore=IgnoreMatcher(["__pycache__/", "c", "*.b"]))
+    ] == [Path("B.txt"), Path("a/b.txt"), Path("a.txt")]
+
+
+def test_ls_ignore_negation(tree_path: Path):
+    """Test `ls` function with negated and anchored ignore rules."""
+    assert [
+        path.relative_to(tree_path)
+        for path in ls(
+            tree_path, ignore=IgnoreMatcher(["*.txt", "!/a/**/d.txt", "/a/__pycache__"])
+        )
+    ] == [Path("a/c/d.txt")]
+
+
+def test_tar(tree_path: Path, tmp_path: Path):
+    """Test `tar` function."""
+    tar_path = tar(
+        tree_path, tmp_path / "tree.tar", ignore=IgnoreMatcher(["__pycache__/"])
+    )
+
+    with tarfile.open(tar_path, "r:") as tar_file:
+        assert tar_file.getnames() == [
+            "B.txt",
+            "a/b.txt",
+            "a/c/d.txt",
+            "a.b/e.txt",
+            "a.txt",
+        ]
+
+
+def test_tar_symlink(tree_path: Path, tmp_path: Path):
+    """Test `tar` function stores the content of symlinked files."""
+    (tree_path / "link.txt").symlink_to(tree_path / "a.txt")
+
+    tar_path = tar(tree_path, tmp_path / "tree.tar", ignore=IgnoreMatcher(["a*"]))
+
+    with tarfile.open(tar_path, "r:") as tar_file:
+        assert tar_file.getnames() == ["B.txt", "link.txt"]
+
+        member = tar_file.getmember("link.txt")
+        assert member.isfile()
+
+        f = tar_file.extractfile(member)
+        assert f
+        assert f.read() == b"a.txt"
+
+
+def test_tar_stream(tree_path: Path, tmp_path: Path):
+    """Test `tar` function into a stream."""
+    stream = io.BytesIO()
+    tar(tree_path, stream)
+
+    tar_path = tar(tree_path, tmp_path / "tree.tar")
+
+    assert stream.getvalue() == tar_path.read_bytes()
@@ -1,7 +1,21 @@
 """Test helpers functions."""
 
+import io
+import os
+import threading
 from pathlib import Path
+from types import SimpleNamespace
+from uuid import UUID
 
+import docker
+import pytest
+
+from mse_cli.cloud.command import helpers as cloud_helpers
+from mse_cli.cloud.model.context import Context
+from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
+from mse_cli.error import AppContainerError
+from mse_cli.home.command.code_provider import verify
+from mse_cli.home.command.helpers import IMAGE_CHUNK_SIZE, load_docker_image
 from mse_cli.home.command.sgx_operator.evidence import guess_pccs_url
 
 
@@ -10,3 +24,196 @@ def test_guess_pccs_url():
     conf = Path(__file__).parent / "data/sgx_default_qcnl.conf"
 
     assert guess_pccs_url(aemsd_conf_file=conf) == "https://example.cosmian.com"
+
+
+def test_load_docker_image():
+    """Test load_docker_image sends the image by chunks."""
+    data = os.urandom(3 * IMAGE_CHUNK_SIZE + 1)
+    chunks = []
+
+    def load(stream):
+        for chunk in stream:
+            chunks.append(chunk)
+        return [SimpleNamespace(tags=["app:latest"])]
+
+    client = SimpleNamespace(images=SimpleNamespace(load=load))
+
+    assert load_docker_image(client, io.BytesIO(data), len(data)) == "app:latest"
+    assert b"".join(chunks) == data
+    assert max(len(chunk) for chunk in chunks) == IMAGE_CHUNK_SIZE
+
+
+def test_compute_mr_enclaves(tmp_path: Path, monkeypatch):
+    """Test compute_mr_enclaves computes each distinct input once."""
+    (tmp_path / "app.tar").write_bytes(b"code")
+    computed = []
+
+    def compute_mr_enclave(_client, _image, app_args, app_path, _log, _cache, _worker):
+        assert (app_path / "app.tar").read_bytes() == b"code"
+        computed.append(app_args.size)
+        return f"mrenclave_{app_args.size}"
+
+    monkeypatch.setattr(verify, "compute_mr_enclave", compute_mr_enclave)
+    monkeypatch.setattr(verify, "get_client_docker", lambda: None)
+
+    inputs = [
+        NoSgxDockerConfig(
+            subject="CN=localhost",
+            subject_alternative_name="localhost",
+            expiration_date=None,
+            size=size,
+            app_id=UUID("00000000-0000-0000-0000-000000000000"),
+            application="app:app",
+        )
+        for size in (4096, 8192, 4096, 4096)
+    ]
+
+    mrenclaves = verify.compute_mr_enclaves("image", inputs, tmp_path, 2, None)
+
+    assert sorted(computed) == [4096, 8192]
+    assert [mrenclaves[verify.fingerprint_key(app_args)] for app_args in inputs] == [
+        "mrenclave_4096",
+        "mrenclave_8192",
+        "mrenclave_4096",
+        "mrenclave_4096",
+    ]
+
+
+def test_evidence_paths(tmp_path: Path):
+    """Test evidence_paths expands the directories."""
+    for name in ("b.json", "a.json", "c.txt"):
+        (tmp_path / name).write_text("{}")
+
+    assert verify.evidence_paths([tmp_path, Path("d.json")]) == [
+        tmp_path / "a.json",
+        tmp_path / "b.json",
+        Path("d.json"),
+    ]
+
+
+def test_certificate_names():
+    """Test the evidences with the same filename get distinct certificates."""
+    paths = [
+        Path("a/app.evidence.json"),
+        Path("b/app.evidence.json"),
+        Path("b/other.evidence.json"),
+        Path("c/b/app.evidence.json"),
+    ]
+
+    assert verify.certificate_names(paths) == {
+        paths[0]: "app.evidence.ratls.pem",
+        paths[1]: "b_app.evidence.ratls.pem",
+        paths[2]: "other.evidence.ratls.pem",
+        paths[3]: "3_app.evidence.ratls.pem",
+    }
+
+
+def test_background_fingerprint_cancel(monkeypatch):
+    """Test cancelling the background fingerprint removes its container."""
+    context = Context.load(path=Path(__file__).parent / "data/context.toml")
+    removed = threading.Event()
+    calls = []
+
+    class FakeContainer:
+        """Container of the fingerprint."""
+
+        def remove(self, force: bool):
+            """Kill the container."""
+            assert force
+            removed.set()
+
+    def get(name: str):
+        """Get the container of the fingerprint."""
+        assert name == background.container_name
+        return FakeContainer()
+
+    def compute_mr_enclave(_client, image, app_args, _path, log_path, _cache, **kw):
+        """Run the container until removed."""
+        calls.append((image, app_args, log_path, kw["container_name"]))
+        removed.wait(10)
+        raise AppContainerError("Killed")
+
+    monkeypatch.setattr(
+        cloud_helpers,
+        "get_client_docker",
+        lambda: SimpleNamespace(containers=SimpleNamespace(get=get)),
+    )
+    monkeypatch.setattr(cloud_helpers, "compute_mr_enclave", compute_mr_enclave)
+
+    background = cloud_helpers.BackgroundFingerprint(context, no_cache=True)
+    # The inputs are copied: updating the context does not change them
+    app_args = cloud_helpers.fingerprint_args(context)
+    assert context.instance
+    context.instance.enclave_size *= 2
+
+    while not calls:
+        threading.Event().wait(0.01)
+    background.cancel()
+
+    background.thread.join(timeout=5)
+    assert not background.thread.is_alive()
+    assert background.thread.daemon
+    assert calls == [
+        (
+            context.config.docker,
+            app_args,
+            context.workspace / "docker.fingerprint.log",
+            background.container_name,
+        )
+    ]
+    assert background.log_path != context.docker_log_path
+    with pytest.raises(AppContainerError):
+        background.result()
+
+
+def test_background_fingerprint_cancel_before_start(monkeypatch):
+    """Test a container created after the cancellation is removed anyway."""
+    context = Context.load(path=Path(__file__).parent / "data/context.toml")
+    cancelled = threading.Event()
+    containers = set()
+    at_exit = []
+
+    class FakeContainer:
+        """Container of the fingerprint."""
+
+        def __init__(self, name: str):
+            """Get the container `name`."""
+            self.name = name
+
+        def remove(self, force: bool):
+            """Kill the container."""
+            assert force
+            containers.remove(self.name)
+
+    def get(name: str):
+        """Get the container of the fingerprint."""
+        if name not in containers:
+            raise docker.errors.NotFound(name)
+        return FakeContainer(name)
+
+    def compute_mr_enclave(_client, _image, _args, _path, _log, _cache, **kw):
+        """Create the container once the computation is cancelled."""
+        cancelled.wait(10)
+        containers.add(kw["container_name"])
+        return "00" * 32
+
+    monkeypatch.setattr(
+        cloud_helpers,
+        "get_client_docker",
+        lambda: SimpleNamespace(containers=SimpleNamespace(get=get)),
+    )
+    monkeypatch.setattr(cloud_helpers, "compute_mr_enclave", compute_mr_enclave)
+    monkeypatch.setattr(cloud_helpers.atexit, "register", at_exit.append)
+
+    background = cloud_helpers.BackgroundFingerprint(context, no_cache=True)
+    while not background.future.running():
+        threading.Event().wait(0.01)
+
+    background.cancel()
+    # Removed on exit if the thread is still running by then
+    assert at_exit == [background.remove_container]
+    cancelled.set()
+
+    background.thread.join(timeout=5)
+    assert not background.thread.is_alive()
+    assert not containers
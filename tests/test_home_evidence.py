@@ -0,0 +1,47 @@
+"""Test home/command/sgx_operator/evidence.py."""
+
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from mse_cli.error import AppContainerError
+from mse_cli.home.command.sgx_operator import evidence as evidence_module
+from mse_cli.home.command.sgx_operator.evidence import collect_all_evidences
+
+
+def test_collect_all_evidences(tmp_path: Path, monkeypatch):
+    """Test the evidences are collected with a shared collateral cache."""
+    lock = threading.Lock()
+    calls = []
+
+    def collect_evidence_and_certificate(
+        container, pccs_url, output, collateral_cache, basename
+    ):
+        with lock:
+            calls.append((container.name, pccs_url, output, collateral_cache, basename))
+        if container.name == "bad":
+            raise ConnectionError("Can't reach the app")
+
+    monkeypatch.setattr(
+        evidence_module,
+        "collect_evidence_and_certificate",
+        collect_evidence_and_certificate,
+    )
+
+    containers = [SimpleNamespace(name=name) for name in ("app1", "app2", "app3")]
+    collect_all_evidences(containers, "https://pccs", tmp_path, 2, True)
+
+    assert sorted(call[0] for call in calls) == ["app1", "app2", "app3"]
+    assert all(call[0] == call[4] for call in calls)
+    assert all(call[1:3] == ("https://pccs", tmp_path) for call in calls)
+    assert len({id(call[3]) for call in calls}) == 1
+
+    # The other evidences are collected whatever the failure
+    calls.clear()
+    containers.append(SimpleNamespace(name="bad"))
+    with pytest.raises(AppContainerError, match="1 out of 4"):
+        collect_all_evidences(containers, "https://pccs", tmp_path, 4, True)
+
+    assert len(calls) == 4
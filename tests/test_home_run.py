@@ -0,0 +1,149 @@
+"""Test home/command/sgx_operator/run.py."""
+
+import argparse
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+
+from mse_cli.core.sgx_docker import SgxDockerConfig
+from mse_cli.home.command.sgx_operator import run as run_module
+from mse_cli.home.command.sgx_operator.run import run, run_all
+
+
+def docker_config(port: int) -> SgxDockerConfig:
+    """Get the configuration of the app listening on `port`."""
+    return SgxDockerConfig(
+        size=4096,
+        host="127.0.0.1",
+        port=port,
+        subject="CN=myapp.fr,O=MyApp Company,C=FR,L=Paris,ST=Ile-de-France",
+        subject_alternative_name="myapp.fr",
+        app_id=UUID(int=port),
+        expiration_date=1714639412,
+        app_dir="/home/cosmian/workspace/sgx_operator/",
+        application="app:app",
+        healthcheck="/health",
+        signer_key="/opt/cosmian-internal/cosmian-signer-key.pem",
+    )
+
+
+def run_args(**kwargs) -> argparse.Namespace:
+    """Get the arguments of the `run` subcommand."""
+    args = {
+        "name": None,
+        "all": False,
+        "names": None,
+        "jobs": 8,
+        "secrets": None,
+        "sealed_secrets": None,
+        "key": None,
+        "sealed_dir": None,
+        "timeout": 1,
+    }
+    args.update(kwargs)
+
+    return argparse.Namespace(**args)
+
+
+def test_run_all_sealed_dir(tmp_path: Path, monkeypatch):
+    """Test each app receives the files sealed for its own enclave."""
+    containers = [
+        SimpleNamespace(name="app1", attrs=7788, labels={}),
+        SimpleNamespace(name="app2", attrs=7789, labels={}),
+    ]
+    client = SimpleNamespace(
+        containers=SimpleNamespace(list=lambda filters: containers)
+    )
+    targets = []
+
+    def bootstrap_all(all_targets, jobs, timeout):
+        targets.extend(all_targets)
+        return [None] * len(all_targets)
+
+    monkeypatch.setattr(
+        run_module.SgxDockerConfig,
+        "load",
+        lambda attrs, labels: docker_config(attrs),
+    )
+    monkeypatch.setattr(
+        run_module,
+        "ContainerWatcher",
+        lambda client, name: SimpleNamespace(check=None, close=lambda: None),
+    )
+    monkeypatch.setattr(run_module, "bootstrap_all", bootstrap_all)
+
+    (tmp_path / "secrets.json").write_text(json.dumps({"shared": True}))
+    (tmp_path / "app1.sealed_secrets.json").write_bytes(b"sealed for app1")
+    (tmp_path / "app1.key.sealed").write_bytes(b"key1")
+    (tmp_path / "app2.sealed_secrets.json").write_bytes(b"sealed for app2")
+    (tmp_path / "app2.key.sealed").write_bytes(b"key2")
+
+    run_all(
+        client,
+        run_args(all=True, secrets=tmp_path / "secrets.json", sealed_dir=tmp_path),
+    )
+
+    (app1, app2) = targets
+    assert (app1.name, app1.url) == ("app1", "https://127.0.0.1:7788")
+    assert (app2.name, app2.url) == ("app2", "https://127.0.0.1:7789")
+    assert app1.payload != app2.payload
+    assert app1.payload["uuid"] == str(UUID(int=7788))
+    assert app2.payload["uuid"] == str(UUID(int=7789))
+    assert app1.payload["app_secrets"] == app2.payload["app_secrets"]
+    assert app1.payload["app_sealed_secrets"] != app2.payload["app_sealed_secrets"]
+    assert app1.payload["code_secret_key"] == b"key1".hex()
+    assert app2.payload["code_secret_key"] == b"key2".hex()
+
+
+def test_run_sealed_args(tmp_path: Path):
+    """Test a file sealed for one enclave is never sent to several apps."""
+    with pytest.raises(argparse.ArgumentTypeError):
+        run(run_args(all=True, key=tmp_path / "key.sealed"))
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        run(run_args(names=["app1", "app2"], sealed_secrets=tmp_path / "sealed"))
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        run(run_args(name="app1", sealed_dir=tmp_path))
+
+
+def test_run_all_sealed_dir_missing(tmp_path: Path, monkeypatch):
+    """Test an app without its sealed files fails before anything is sent."""
+    containers = [
+        SimpleNamespace(name="app1", attrs=7788, labels={}),
+        SimpleNamespace(name="app2", attrs=7789, labels={}),
+    ]
+    client = SimpleNamespace(
+        containers=SimpleNamespace(list=lambda filters: containers)
+    )
+    closed = []
+
+    def bootstrap_all(_all_targets, _jobs, _timeout):
+        raise AssertionError("No secret should be sent")
+
+    monkeypatch.setattr(
+        run_module.SgxDockerConfig,
+        "load",
+        lambda attrs, labels: docker_config(attrs),
+    )
+    monkeypatch.setattr(
+        run_module,
+        "ContainerWatcher",
+        lambda client, name: SimpleNamespace(
+            check=None, close=lambda: closed.append(name)
+        ),
+    )
+    monkeypatch.setattr(run_module, "bootstrap_all", bootstrap_all)
+
+    (tmp_path / "app1.sealed_secrets.json").write_bytes(b"sealed for app1")
+    (tmp_path / "app1.key.sealed").write_bytes(b"key1")
+    (tmp_path / "app2.sealed_secrets.json").write_bytes(b"sealed for app2")
+
+    with pytest.raises(FileNotFoundError, match="'app2'") as error:
+        run_all(client, run_args(all=True, sealed_dir=tmp_path))
+
+    assert str(tmp_path / "app2.key.sealed") in str(error.value)
+    assert closed == ["app1", "app2"]
@@ -1,26 +1,122 @@
 """Test ignore_file.py."""
 
 from pathlib import Path
+from typing import List
 
-from mse_cli.core.ignore_file import IgnoreFile
+from mse_cli.core.fs import ls
+from mse_cli.core.ignore_file import IgnoreFile, IgnoreMatcher
+
+
+def listed(tmp_path: Path, ignore: IgnoreMatcher, paths: List[str]) -> List[str]:
+    """Create the files `paths` in `tmp_path` and list the ones not ignored."""
+    for path in paths:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+
+    return [
+        path.relative_to(tmp_path).as_posix()
+        for path in ls(tmp_path, dot_files=True, ignore=ignore)
+    ]
 
 
 def test_ignore_file():
-    """Test `IgnoreFile`."""
-    ignored_files = IgnoreFile.parse(Path(__file__).parent / "data")
-
-    expected_patterns = {
-        "mse.toml",
-        "secrets.json",
-        ".mseignore",
-        "__pycache__/",
-        ".git*",
-        ".vscode/",
-        ".idea/",
-        "*.egg-info/",
-        "*.egg",
-        ".venv",
-        ".env",
-    }
-
-    assert ignored_files == expected_patterns
+    """Test `IgnoreFile` skips the comments and the empty lines."""
+    ignore = IgnoreFile.load(Path(__file__).parent / "data")
+
+    # One rule by pattern of the file
+    assert len(ignore.negated) == 11
+
+    for path in ("secrets.json", ".mseignore", "app.egg", ".venv", ".env"):
+        assert ignore.is_ignored(path)
+    for path in (".vscode", ".idea"):
+        assert ignore.is_ignored(path, is_dir=True)
+        assert not ignore.is_ignored(path)
+    assert not ignore.is_ignored("# Ignore MSE CLI files/directories")
+
+
+def test_ignore_file_load(tmp_path: Path):
+    """Test `IgnoreFile.load`."""
+    ignore = IgnoreFile.load(Path(__file__).parent / "data")
+
+    assert ignore.is_ignored("mse.toml")
+    assert ignore.is_ignored("src/secrets.json")
+    assert ignore.is_ignored(".gitignore")
+    assert ignore.is_ignored("module/__pycache__", is_dir=True)
+    assert not ignore.is_ignored("__pycache__")
+    assert not ignore.is_ignored("app.py")
+    assert not ignore.is_ignored("app.egg-info")
+
+    # The subtree of an ignored directory is pruned
+    assert listed(
+        tmp_path,
+        ignore,
+        [
+            "app.py",
+            "module/__pycache__/app.pyc",
+            "app.egg-info/PKG-INFO",
+            "src/secrets.json",
+        ],
+    ) == ["app.py"]
+
+
+def test_ignore_matcher(tmp_path: Path):
+    """Test `IgnoreMatcher` gitignore semantics."""
+    ignore = IgnoreMatcher(
+        [
+            "# comment",
+            "*.log",
+            "!keep.log",
+            "/build/",
+            "doc/*.md",
+            "**/cache",
+            "data/**",
+            "a/**/b",
+            "\\!important",
+            "[!x]y.txt",
+        ]
+    )
+
+    # Negation: the last matching rule wins
+    assert ignore.is_ignored("app.log")
+    assert ignore.is_ignored("logs/debug.log")
+    assert not ignore.is_ignored("keep.log")
+    assert not ignore.is_ignored("logs/keep.log")
+
+    # Anchored and directory-only rules
+    assert ignore.is_ignored("build", is_dir=True)
+    assert not ignore.is_ignored("build")
+    assert not ignore.is_ignored("src/build", is_dir=True)
+    assert ignore.is_ignored("doc/index.md")
+    assert not ignore.is_ignored("doc/api/index.md")
+    assert not ignore.is_ignored("src/doc/index.md")
+
+    # `**` patterns
+    assert ignore.is_ignored("cache")
+    assert ignore.is_ignored("src/deep/cache", is_dir=True)
+    assert ignore.is_ignored("data/x/y.csv")
+    assert not ignore.is_ignored("data", is_dir=True)
+    assert ignore.is_ignored("a/b")
+    assert ignore.is_ignored("a/x/y/b")
+    assert not ignore.is_ignored("ab")
+
+    # Escapes and character classes
+    assert ignore.is_ignored("!important")
+    assert ignore.is_ignored("ay.txt")
+    assert not ignore.is_ignored("xy.txt")
+    assert not ignore.is_ignored("a/y.txt")
+
+    # The subtrees of the ignored directories are pruned
+    assert listed(
+        tmp_path / "tree",
+        ignore,
+        ["build/lib/app.py", "src/build/app.py", "src/deep/cache/x", "keep.log"],
+    ) == ["keep.log", "src/build/app.py"]
+
+    # A file cannot be re-included if its parent directory is ignored
+    assert not IgnoreMatcher(["dir/", "!dir/file"]).is_ignored("dir/file")
+    assert (
+        listed(
+            tmp_path / "reinclude", IgnoreMatcher(["dir/", "!dir/file"]), ["dir/file"]
+        )
+        == []
+    )
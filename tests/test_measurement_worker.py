@@ -0,0 +1,165 @@
+"""Test core/measurement_worker.py."""
+
+import tarfile
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import UUID
+
+import docker
+import pytest
+
+from mse_cli.core.enclave import run_mr_enclave
+from mse_cli.core.measurement_worker import MeasurementWorker
+from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
+from mse_cli.error import AppContainerError, RatlsVerificationFailure
+
+MRENCLAVE = "a" * 64
+BASE_IMAGE = "ghcr.io/cosmian/mse-base:20230720095554"
+
+
+def app_config() -> NoSgxDockerConfig:
+    """Get the arguments of the measured enclave."""
+    return NoSgxDockerConfig(
+        subject="CN=localhost",
+        subject_alternative_name="localhost",
+        expiration_date=None,
+        size=4096,
+        app_id=UUID("00000000-0000-0000-0000-000000000000"),
+        application="app:app",
+    )
+
+
+class FakeContainer:
+    """Fake docker container recording the executed commands."""
+
+    def __init__(self, app_path: Path):
+        """Mount `app_path`."""
+        self.app_path = app_path
+        self.commands = []
+        self.stopped = False
+        # Files written outside of the app directory
+        self.changes = [{"Path": "/opt/input", "Kind": 1}]
+
+    def exec_run(self, cmd, stdout, stderr):
+        """Execute `cmd` in the container."""
+        assert stdout and stderr
+        self.commands.append(cmd)
+        # Any file other than the code would change the measurement
+        if [path.name for path in self.app_path.iterdir()] != ["app.tar"]:
+            return (0, b"Measurement:\n    not a measurement\n")
+
+        code = (self.app_path / "app.tar").read_bytes()
+        if code == b"leaky code":
+            self.changes.append({"Path": "/root/.cache", "Kind": 1})
+        if code == b"failing code":
+            # The entrypoint may print a measurement before failing
+            return (1, f"Measurement:\n    {MRENCLAVE}\nError: boom\n".encode("utf-8"))
+
+        measurement = MRENCLAVE if code in (b"code", b"leaky code") else "bad"
+        (self.app_path / "app.manifest").write_text(measurement)
+        return (0, f"Measurement:\n    {measurement}\n".encode("utf-8"))
+
+    def diff(self):
+        """Inspect the changes of the filesystem of the container."""
+        return self.changes
+
+    def stop(self, timeout):
+        """Stop the container."""
+        assert timeout
+        self.stopped = True
+
+
+def test_measure(tmp_path: Path):
+    """Test `MeasurementWorker` runs every measurement in the same container."""
+    containers = []
+
+    def run(image, entrypoint, volumes, **_kwargs):
+        assert image == "image"
+        assert entrypoint == MeasurementWorker.idle_entrypoint
+        assert volumes == NoSgxDockerConfig.volumes(tmp_path / "worker")
+        (path,) = volumes
+        containers.append(FakeContainer(Path(path)))
+        return containers[-1]
+
+    client = SimpleNamespace(containers=SimpleNamespace(run=run))
+    app_args = app_config()
+
+    (tmp_path / "code").mkdir()
+    (tmp_path / "code" / "app.tar").write_bytes(b"code")
+    (tmp_path / "bad_code").mkdir()
+    (tmp_path / "bad_code" / "app.tar").write_bytes(b"bad code")
+    (tmp_path / "failing_code").mkdir()
+    (tmp_path / "failing_code" / "app.tar").write_bytes(b"failing code")
+
+    worker = MeasurementWorker(client, "image", tmp_path / "worker")
+    with pytest.raises(AppContainerError):
+        worker.measure(app_args, tmp_path / "code", tmp_path / "docker.log")
+
+    with worker:
+        for _ in range(2):
+            assert (
+                worker.measure(app_args, tmp_path / "code", tmp_path / "docker.log")
+                == MRENCLAVE
+            )
+
+        with pytest.raises(RatlsVerificationFailure):
+            worker.measure(app_args, tmp_path / "bad_code", tmp_path / "docker.log")
+
+        with pytest.raises(AppContainerError, match="exit code 1"):
+            worker.measure(app_args, tmp_path / "failing_code", tmp_path / "docker.log")
+
+    (container,) = containers
+    assert container.stopped
+    assert container.commands == [["mse-run", *app_args.cmd()]] * 4
+
+
+def test_measure_restart(tmp_path: Path):
+    """Test `MeasurementWorker` replaces a container altered by a measurement."""
+    containers = []
+
+    def run(_image, volumes, **_kwargs):
+        (path,) = volumes
+        containers.append(FakeContainer(Path(path)))
+        return containers[-1]
+
+    client = SimpleNamespace(containers=SimpleNamespace(run=run))
+    app_args = app_config()
+
+    (tmp_path / "code").mkdir()
+    (tmp_path / "code" / "app.tar").write_bytes(b"leaky code")
+
+    with MeasurementWorker(client, "image", tmp_path / "worker") as worker:
+        for _ in range(2):
+            assert (
+                worker.measure(app_args, tmp_path / "code", tmp_path / "docker.log")
+                == MRENCLAVE
+            )
+
+    assert len(containers) == 3
+    assert all(container.stopped for container in containers)
+    assert [len(container.commands) for container in containers] == [1, 1, 0]
+
+
+@pytest.mark.home
+def test_measure_fresh_container(tmp_path: Path):
+    """Test the MR enclave of the worker is the one of a fresh container."""
+    client = docker.from_env()
+    app_args = app_config()
+
+    (tmp_path / "code").mkdir()
+    (tmp_path / "app.py").write_text(
+        "from flask import Flask\n\napp = Flask(__name__)\n"
+    )
+    with tarfile.open(tmp_path / "code" / "app.tar", "w") as tar:
+        tar.add(tmp_path / "app.py", arcname="app.py")
+
+    expected = run_mr_enclave(
+        client, BASE_IMAGE, app_args, tmp_path / "code", tmp_path / "docker.log"
+    )
+
+    with MeasurementWorker(client, BASE_IMAGE, tmp_path / "worker") as worker:
+        for _ in range(2):
+            assert (
+                worker.measure(app_args, tmp_path / "code", tmp_path / "worker.log")
+                == expected
+            )
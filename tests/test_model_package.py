@@ -6,57 +6,210 @@ from tarfile import TarFile
 
 import pytest
 
-from mse_cli.home.model.package import CodePackage
+from mse_cli.core.compression import zstd_writer
+from mse_cli.error import PackageMalformed
+from mse_cli.home.model.package import (
+    MANIFEST_NAME,
+    MANIFEST_SIZE,
+    PackageReader,
+    PackageWriter,
+)
+
+
+def create_package(package_tar: Path):
+    """Create a package of the test code and docker image tarballs."""
+    data_path = Path(__file__).parent / "data" / "package"
+
+    with PackageWriter(package_tar) as package:
+        package.add(data_path / "app.tar", "app.tar")
+        package.add(data_path / "image.tar", "image.tar")
+        package.add(data_path / "tests.tar", "tests.tar")
+        package.add(Path(__file__).parent / "data" / "mse.toml", "mse.toml")
 
 
 def test_create(workspace: Path):
-    """Test `create` method."""
-    package = CodePackage(
-        code_tar=Path(__file__).parent / "data" / "package" / "app.tar",
-        image_tar=Path(__file__).parent / "data" / "package" / "image.tar",
-        test_tar=Path(__file__).parent / "data" / "package" / "tests.tar",
-        config_path=Path(__file__).parent / "data" / "mse.toml",
+    """Test `PackageWriter.add` lays out the members like the reference package."""
+    package_tar_ref = Path(__file__).parent / "data" / "package" / "package.tar"
+    package_tar = workspace / "package.tar"
+    create_package(package_tar)
+
+    assert (
+        TarFile(package_tar).getnames()
+        == [MANIFEST_NAME] + TarFile(package_tar_ref).getnames()
     )
 
-    package_tar_ref = Path(__file__).parent / "data" / "package" / "package.tar"
+
+def test_package_writer(workspace: Path):
+    """Test `PackageWriter` streams members into the package."""
+    data_path = Path(__file__).parent / "data" / "package"
     package_tar = workspace / "package.tar"
-    package.create(package_tar)
 
-    assert TarFile(package_tar).getnames() == TarFile(package_tar_ref).getnames()
+    with PackageWriter(package_tar) as package:
+        for name in ("app.tar", "image.tar", "tests.tar"):
+            with package.open(name) as f:
+                with open(data_path / name, "rb") as src:
+                    # Write small chunks like a producer would do
+                    while chunk := src.read(1000):
+                        f.write(chunk)
 
+        with package.open("empty") as f:
+            pass
 
-def test_extract(workspace: Path):
-    """Test the `extract` method."""
-    package_tar = Path(__file__).parent / "data" / "package" / "package.tar"
-    package = CodePackage.extract(workspace, package_tar)
+        package.add(Path(__file__).parent / "data" / "mse.toml", "mse.toml")
 
-    assert package.code_tar == workspace / "app.tar"
-    assert package.image_tar == workspace / "image.tar"
-    assert package.test_tar == workspace / "tests.tar"
-    assert package.config_path == workspace / "mse.toml"
+    package_tar_ref = data_path / "package.tar"
+    with TarFile(package_tar) as tar_file:
+        assert tar_file.getnames() == [
+            MANIFEST_NAME,
+            *TarFile(package_tar_ref).getnames()[:3],
+            "empty",
+            "mse.toml",
+        ]
 
+        for name in ("app.tar", "image.tar", "tests.tar"):
+            member = tar_file.extractfile(name)
+            assert member
+            assert member.read() == (data_path / name).read_bytes()
+
+        assert tar_file.getmember("empty").size == 0
+
+
+def test_package_writer_error(workspace: Path):
+    """Test `PackageWriter` removes the package if it is not completed."""
+    data_path = Path(__file__).parent / "data" / "package"
+    package_tar = workspace / "partial_package.tar"
+
+    with pytest.raises(RuntimeError):
+        with PackageWriter(package_tar) as package:
+            package.add(data_path / "app.tar", "app.tar")
+            with package.open("image.tar") as f:
+                f.write(b"partial image")
+                raise RuntimeError("The docker image can't be saved")
+
+    assert not package_tar.exists()
+
+
+def test_extract(workspace: Path):
+    """Test the `extract` method."""
+    data_path = Path(__file__).parent / "data" / "package"
+    # Package built without manifest
+    package = PackageReader(data_path / "package.tar")
+    package.validate()
+
+    assert package.extract("app.tar", workspace) == workspace / "app.tar"
+    assert package.extract_image(workspace) == workspace / "image.tar"
+    assert package.extract("tests.tar", workspace) == workspace / "tests.tar"
+    assert package.extract("mse.toml", workspace) == workspace / "mse.toml"
+
+    for name in ("app.tar", "image.tar", "tests.tar"):
+        assert filecmp.cmp(data_path / name, workspace / name)
     assert filecmp.cmp(
-        Path(__file__).parent / "data" / "package" / "app.tar", package.code_tar
-    )
-    assert filecmp.cmp(
-        Path(__file__).parent / "data" / "package" / "image.tar", package.image_tar
-    )
-    assert filecmp.cmp(
-        Path(__file__).parent / "data" / "package" / "tests.tar", package.test_tar
+        Path(__file__).parent / "data" / "mse.toml", workspace / "mse.toml"
     )
-    assert filecmp.cmp(Path(__file__).parent / "data" / "mse.toml", package.config_path)
 
 
-def test_extract_bad_tar(workspace: Path):
-    """Test the `extract` method with errors."""
+def test_extract_bad_tar():
+    """Test the `validate` method with errors."""
     # Not a tar
     package_tar = Path(__file__).parent / "data" / "evidence.json"
 
-    with pytest.raises(Exception):
-        CodePackage.extract(workspace, package_tar)
+    with pytest.raises(PackageMalformed):
+        PackageReader(package_tar).validate()
 
     # Tar but without the expecting content
     package_tar = Path(__file__).parent / "data" / "package" / "app.tar"
 
-    with pytest.raises(Exception):
-        CodePackage.extract(workspace, package_tar)
+    with pytest.raises(PackageMalformed):
+        PackageReader(package_tar).validate()
+
+
+def test_package_reader(workspace: Path):
+    """Test `PackageReader` reads the members from the manifest."""
+    data_path = Path(__file__).parent / "data" / "package"
+    package_tar = workspace / "package.tar"
+
+    create_package(package_tar)
+
+    package = PackageReader(package_tar)
+    package.validate()
+
+    assert list(package.members) == ["app.tar", "image.tar", "tests.tar", "mse.toml"]
+
+    with TarFile(package_tar) as tar_file:
+        for name, member in package.members.items():
+            assert member.offset == tar_file.getmember(name).offset_data
+            assert member.size == tar_file.getmember(name).size
+
+    with package.open("image.tar") as f:
+        assert f.read() == (data_path / "image.tar").read_bytes()
+
+    with pytest.raises(PackageMalformed):
+        package.open("unknown.tar")
+
+    # Tamper the content of a member
+    member = package.members["app.tar"]
+    with open(package_tar, "r+b") as f:
+        f.seek(member.offset)
+        f.write(b"\xff")
+
+    with pytest.raises(PackageMalformed):
+        package.extract("app.tar", workspace)
+
+    # The tampering is only found by reading the member
+    package.validate()
+    with pytest.raises(PackageMalformed):
+        package.validate(digests=True)
+
+    # Truncate the package
+    with open(package_tar, "r+b") as f:
+        f.truncate(member.offset + member.size)
+
+    with pytest.raises(PackageMalformed):
+        PackageReader(package_tar).validate()
+
+
+def test_package_reader_bad_manifest(workspace: Path):
+    """Test a garbled manifest is reported as a malformed package."""
+    package_tar = workspace / "package.tar"
+
+    for manifest in (
+        b'{"app.tar": {"offset": 1',
+        b"\xff\xfe",
+        b"[]",
+        b'{"app.tar": 1}',
+        b'{"app.tar": {"size": 1}}',
+        b'{"app.tar": {"offset": "a", "size": 1}}',
+    ):
+        create_package(package_tar)
+        with open(package_tar, "r+b") as f:
+            f.seek(512)
+            f.write(manifest.ljust(MANIFEST_SIZE))
+
+        with pytest.raises(PackageMalformed, match="manifest"):
+            PackageReader(package_tar)
+
+
+def test_package_reader_compressed_image(workspace: Path):
+    """Test `PackageReader` decompresses the docker image while reading it."""
+    pytest.importorskip("zstandard")
+
+    data_path = Path(__file__).parent / "data" / "package"
+    package_tar = workspace / "package.tar"
+
+    with PackageWriter(package_tar) as package:
+        package.add(data_path / "app.tar", "app.tar")
+
+        with package.open("image.tar.zst") as f, zstd_writer(f) as zf:
+            zf.write((data_path / "image.tar").read_bytes())
+
+        package.add(data_path / "tests.tar", "tests.tar")
+        package.add(Path(__file__).parent / "data" / "mse.toml", "mse.toml")
+
+    reader = PackageReader(package_tar)
+    reader.validate()
+
+    with reader.open_image() as (f, size):
+        assert size is None
+        assert f.read() == (data_path / "image.tar").read_bytes()
+
+    assert filecmp.cmp(data_path / "image.tar", reader.extract_image(workspace))
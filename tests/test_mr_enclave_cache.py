@@ -0,0 +1,78 @@
+"""Test core/mr_enclave_cache.py."""
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import UUID
+
+from docker.errors import ImageNotFound
+
+from mse_cli.core.mr_enclave_cache import MREnclaveCache
+from mse_cli.core.no_sgx_docker import NoSgxDockerConfig
+
+
+class FakeImages:
+    """Fake docker image collection."""
+
+    def __init__(self, image_id):
+        """Return `image_id` for any image (not found if None)."""
+        self.image_id = image_id
+
+    def get(self, _name):
+        """Get the image."""
+        if self.image_id is None:
+            raise ImageNotFound("not found")
+        return SimpleNamespace(id=self.image_id)
+
+
+def app_args(size: int = 4096) -> NoSgxDockerConfig:
+    """Build the arguments of an enclave."""
+    return NoSgxDockerConfig(
+        subject="CN=localhost",
+        subject_alternative_name="localhost",
+        expiration_date=None,
+        size=size,
+        app_id=UUID("00000000-0000-0000-0000-000000000000"),
+        application="app:app",
+    )
+
+
+def test_key(tmp_path: Path):
+    """Test `key` depends on the image, the arguments and the code."""
+    (tmp_path / "app.tar").write_bytes(b"code")
+    client = SimpleNamespace(images=FakeImages("sha256:1"))
+
+    key = MREnclaveCache.key(client, "image", app_args(), tmp_path)
+    assert key
+    assert key == MREnclaveCache.key(client, "image", app_args(), tmp_path)
+    assert key != MREnclaveCache.key(client, "image", app_args(8192), tmp_path)
+
+    client.images = FakeImages("sha256:2")
+    assert key != MREnclaveCache.key(client, "image", app_args(), tmp_path)
+
+    client.images = FakeImages("sha256:1")
+    (tmp_path / "app.tar").write_bytes(b"new code")
+    assert key != MREnclaveCache.key(client, "image", app_args(), tmp_path)
+
+    client.images = FakeImages(None)
+    assert MREnclaveCache.key(client, "image", app_args(), tmp_path) is None
+
+
+def test_lru(tmp_path: Path):
+    """Test the least recently used entries are evicted."""
+    cache = MREnclaveCache(tmp_path / "cache", max_entries=2)
+
+    assert cache.get("a") is None
+
+    cache.put("a", "mrenclave_a")
+    cache.put("b", "mrenclave_b")
+    # Make `a` older than `b` then use it
+    os.utime(tmp_path / "cache" / "a", (0, 0))
+    os.utime(tmp_path / "cache" / "b", (1, 1))
+    assert cache.get("a") == "mrenclave_a"
+
+    cache.put("c", "mrenclave_c")
+
+    assert cache.get("a") == "mrenclave_a"
+    assert cache.get("b") is None
+    assert cache.get("c") == "mrenclave_c"
@@ -0,0 +1,123 @@
+"""Test core/signer_key.py."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    PublicFormat,
+    load_pem_public_key,
+)
+from intel_sgx_ra.signer import mr_signer_from_pk
+
+from mse_cli.core import signer_key as signer_key_module
+from mse_cli.core.signer_key import SignerKeyCache
+from mse_cli.error import UnexpectedResponse
+
+URL = "https://certificates.example.com/"
+
+
+@pytest.fixture
+def public_key() -> bytes:
+    """Get a PEM-encoded signer public key."""
+    evidence = json.loads(
+        (Path(__file__).parent / "data" / "evidence.json").read_text()
+    )
+    return load_pem_public_key(evidence["signer_pk"].encode("utf-8")).public_bytes(
+        Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+class FakeServer:
+    """Fake server publishing the signer public key."""
+
+    def __init__(self, public_key: bytes):
+        """Publish `public_key` with an ETag."""
+        self.public_key = public_key
+        self.etag = '"v1"'
+        self.status_code = 200
+        self.requests = []
+
+    def get(self, url, headers, timeout):
+        """Answer a GET request."""
+        self.requests.append(headers)
+
+        if self.status_code != 200:
+            return SimpleNamespace(
+                ok=False, status_code=self.status_code, text="error", headers={}
+            )
+
+        if headers.get("If-None-Match") == self.etag:
+            return SimpleNamespace(ok=False, status_code=304, headers={})
+
+        return SimpleNamespace(
+            ok=True,
+            status_code=200,
+            content=self.public_key,
+            headers={"ETag": self.etag, "Last-Modified": "Tue, 20 Jun 2023"},
+        )
+
+
+def test_get(tmp_path: Path, public_key: bytes, monkeypatch):
+    """Test the key is only downloaded once while fresh."""
+    server = FakeServer(public_key)
+    monkeypatch.setattr(signer_key_module.requests, "get", server.get)
+
+    cache = SignerKeyCache(tmp_path, max_age=3600)
+
+    assert cache.get(URL) == (public_key, mr_signer_from_pk(public_key))
+    assert cache.get(URL) == (public_key, mr_signer_from_pk(public_key))
+    assert server.requests == [{}]
+
+    # Another process reads the same entry
+    assert SignerKeyCache(tmp_path).get(URL)[1] == mr_signer_from_pk(public_key)
+    assert len(server.requests) == 1
+
+
+def test_revalidate(tmp_path: Path, public_key: bytes, monkeypatch):
+    """Test an outdated key is revalidated with a conditional request."""
+    server = FakeServer(public_key)
+    monkeypatch.setattr(signer_key_module.requests, "get", server.get)
+
+    cache = SignerKeyCache(tmp_path, max_age=0)
+
+    cache.get(URL)
+    assert cache.get(URL) == (public_key, mr_signer_from_pk(public_key))
+    assert server.requests[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Tue, 20 Jun 2023",
+    }
+
+    # The key has changed
+    server.public_key = b"new key"
+    server.etag = '"v2"'
+    monkeypatch.setattr(signer_key_module, "mr_signer_from_pk", lambda _: b"\x01")
+    assert cache.get(URL) == (b"new key", b"\x01")
+
+
+def test_error(tmp_path: Path, public_key: bytes, monkeypatch):
+    """Test an error response is raised."""
+    server = FakeServer(public_key)
+    server.status_code = 500
+    monkeypatch.setattr(signer_key_module.requests, "get", server.get)
+
+    with pytest.raises(UnexpectedResponse):
+        SignerKeyCache(tmp_path).get(URL)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_max_age(tmp_path: Path, monkeypatch):
+    """Test the max age is read from the env var, malformed or not."""
+    monkeypatch.delenv("MSE_SIGNER_KEY_MAX_AGE", raising=False)
+    assert SignerKeyCache(tmp_path).max_age == 3600
+
+    monkeypatch.setenv("MSE_SIGNER_KEY_MAX_AGE", "60")
+    assert SignerKeyCache(tmp_path).max_age == 60
+    assert SignerKeyCache(tmp_path, max_age=0).max_age == 0
+
+    for value in ("1h", "-1", ""):
+        monkeypatch.setenv("MSE_SIGNER_KEY_MAX_AGE", value)
+        assert SignerKeyCache(tmp_path).max_age == 3600
@@ -0,0 +1,165 @@
+"""Test core/verification_cache.py."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives.serialization import Encoding
+from intel_sgx_ra import attest as attest_module
+from intel_sgx_ra.error import CertificateError
+from test_collaterals import make_collaterals
+
+from mse_cli.core import enclave as enclave_module
+from mse_cli.core.enclave import verify_enclave
+from mse_cli.core.verification_cache import VerificationCache, certificate_der
+from mse_cli.error import WrongMRSigner
+from mse_cli.home.model.evidence import ApplicationEvidence
+
+NOW = datetime(2023, 6, 20, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def evidence() -> ApplicationEvidence:
+    """Load the evidence of an enclave."""
+    return ApplicationEvidence.load(Path(__file__).parent / "data" / "evidence.json")
+
+
+def test_certificate_der(evidence: ApplicationEvidence):
+    """Test the certificate is encoded the same whatever its type."""
+    der = evidence.ratls_certificate.public_bytes(Encoding.DER)
+    pem = evidence.ratls_certificate.public_bytes(Encoding.PEM)
+
+    assert certificate_der(evidence.ratls_certificate) == der
+    assert certificate_der(pem) == der
+    assert certificate_der(pem.decode("utf-8")) == der
+    assert certificate_der(der) == der
+
+
+def test_key(evidence: ApplicationEvidence):
+    """Test the key depends on the expected values and the collaterals."""
+    collaterals = make_collaterals(NOW, NOW + timedelta(days=30))
+    key = VerificationCache.key(evidence.ratls_certificate, b"\x01", "AB", collaterals)
+
+    assert key == VerificationCache.key(
+        evidence.ratls_certificate.public_bytes(Encoding.PEM),
+        b"\x01",
+        "ab",
+        collaterals,
+    )
+    assert key != VerificationCache.key(
+        evidence.ratls_certificate, b"\x02", "ab", collaterals
+    )
+    assert key != VerificationCache.key(
+        evidence.ratls_certificate, b"\x01", None, collaterals
+    )
+    assert key != VerificationCache.key(
+        evidence.ratls_certificate,
+        b"\x01",
+        "ab",
+        make_collaterals(NOW, NOW + timedelta(days=30)),
+    )
+
+
+def test_get_put(tmp_path: Path, evidence: ApplicationEvidence):
+    """Test an entry expires with the collaterals or the certificate."""
+    cache = VerificationCache(tmp_path)
+    not_after = evidence.ratls_certificate.not_valid_after_utc
+
+    assert not cache.get("key")
+
+    # The collaterals expire first
+    cache.put(
+        "key",
+        evidence.ratls_certificate,
+        make_collaterals(NOW, NOW + timedelta(days=30)),
+    )
+    assert cache.get("key", NOW)
+    assert not cache.get("key", NOW + timedelta(days=30))
+
+    # The certificate expires first
+    cache.put(
+        "key",
+        evidence.ratls_certificate,
+        make_collaterals(NOW, not_after + timedelta(days=30)),
+    )
+    assert cache.get("key", not_after - timedelta(seconds=1))
+    assert not cache.get("key", not_after)
+
+
+def test_put_evict_expired(tmp_path: Path, evidence: ApplicationEvidence):
+    """Test putting an entry removes the expired ones."""
+    cache = VerificationCache(tmp_path)
+
+    cache.put(
+        "old", evidence.ratls_certificate, make_collaterals(NOW, NOW + timedelta(1))
+    )
+    cache.put(
+        "new",
+        evidence.ratls_certificate,
+        make_collaterals(NOW, NOW + timedelta(30)),
+        NOW + timedelta(2),
+    )
+
+    assert not (tmp_path / "old").exists()
+    assert (tmp_path / "new").exists()
+
+
+def test_verify_enclave(tmp_path: Path, evidence: ApplicationEvidence):
+    """Test a certificate already verified is not verified again."""
+    cache = VerificationCache(tmp_path)
+    collaterals = make_collaterals(NOW, NOW + timedelta(days=30))
+    fingerprint = "00" * 32
+    mr_signer = b"\x01" * 32
+
+    key = VerificationCache.key(
+        evidence.ratls_certificate, mr_signer, fingerprint, collaterals
+    )
+    (tmp_path / key).write_text(datetime.max.replace(tzinfo=timezone.utc).isoformat())
+
+    verify_enclave(
+        evidence.signer_pk,
+        evidence.ratls_certificate,
+        fingerprint,
+        collaterals=collaterals,
+        mr_signer=mr_signer,
+        result_cache=cache,
+    )
+
+    # Another expected fingerprint is verified
+    with pytest.raises(WrongMRSigner):
+        verify_enclave(
+            evidence.signer_pk,
+            evidence.ratls_certificate,
+            "11" * 32,
+            collaterals=collaterals,
+            mr_signer=mr_signer,
+            result_cache=cache,
+        )
+
+
+def test_verify_enclave_collaterals(
+    tmp_path: Path, evidence: ApplicationEvidence, monkeypatch
+):
+    """Test the collaterals of the key are the ones the quote is verified with."""
+    now = datetime.now(timezone.utc)
+    requests = []
+
+    def retrieve_collaterals(quote, pccs_url):
+        requests.append(pccs_url)
+        return make_collaterals(now - timedelta(days=1), now + timedelta(days=30))
+
+    for module in (enclave_module, attest_module):
+        monkeypatch.setattr(module, "retrieve_collaterals", retrieve_collaterals)
+
+    # The collaterals are signed by a fake CA
+    with pytest.raises(CertificateError):
+        verify_enclave(
+            evidence.signer_pk,
+            evidence.ratls_certificate,
+            None,
+            pccs_url="https://pccs.example.com",
+            result_cache=VerificationCache(tmp_path),
+        )
+
+    assert requests == ["https://pccs.example.com"]
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,111 @@
+"""Test core/watch.py."""
+
+import json
+import socket
+from pathlib import Path
+
+import pytest
+
+from mse_cli.core import watch as watch_module
+from mse_cli.core.watch import (
+    Watcher,
+    event_emitter,
+    fetch_certificate,
+    watch_caches,
+)
+
+
+class FakeApp:
+    """Fake app serving a certificate which can change or be unreachable."""
+
+    def __init__(self):
+        """Serve a valid certificate."""
+        self.certificate = "cert-1"
+        self.reachable = True
+        self.valid = True
+        self.verified = []
+
+    def fetch(self, _target: str) -> str:
+        """Get the certificate."""
+        if not self.reachable:
+            raise ConnectionError("Can't reach the app")
+        return self.certificate
+
+    def verify(self, _target: str, certificate: str):
+        """Verify the certificate."""
+        self.verified.append(certificate)
+        if not self.valid:
+            raise ValueError("Code fingerprint is wrong")
+
+
+def test_check():
+    """Test the events follow the state of the app."""
+    app = FakeApp()
+    events = []
+    watcher = Watcher(app.fetch, app.verify, events.append)
+
+    assert watcher.check("app")["event"] == "verified"
+    assert watcher.check("app")["event"] == "unchanged"
+
+    app.certificate = "cert-2"
+    assert watcher.check("app")["event"] == "certificate_changed"
+
+    app.reachable = False
+    event = watcher.check("app")
+    assert event["event"] == "failed"
+    assert event["error"] == "Can't reach the app"
+    assert event["certificate"] is None
+
+    app.reachable = True
+    assert watcher.check("app")["event"] == "recovered"
+
+    app.valid = False
+    event = watcher.check("app")
+    assert event["event"] == "failed"
+    assert event["error"] == "Code fingerprint is wrong"
+    assert event["verification_latency"] is None
+
+    assert len(events) == 6
+    assert all(event["target"] == "app" for event in events)
+    assert events[0]["handshake_latency"] >= 0
+    assert events[0]["verification_latency"] >= 0
+    assert app.verified == ["cert-1", "cert-1", "cert-2", "cert-2", "cert-2"]
+
+
+def test_run(tmp_path: Path):
+    """Test several apps are checked at each round."""
+    app = FakeApp()
+    events_path = tmp_path / "events.jsonl"
+
+    Watcher(app.fetch, app.verify, event_emitter(events_path)).run(
+        ["app1", "app2"], 0.01, jobs=2, rounds=3
+    )
+
+    events = [json.loads(line) for line in events_path.read_text().splitlines()]
+
+    assert len(events) == 6
+    assert sorted(event["target"] for event in events[:2]) == ["app1", "app2"]
+    assert [event["event"] for event in events[:2]] == ["verified", "verified"]
+    assert all(event["event"] == "unchanged" for event in events[2:])
+
+
+def test_fetch_certificate(monkeypatch):
+    """Test an unreachable app raises a `ConnectionError`."""
+
+    def get_server_certificate(_addr):
+        raise socket.gaierror("Name or service not known")
+
+    monkeypatch.setattr(watch_module, "get_server_certificate", get_server_certificate)
+
+    with pytest.raises(ConnectionError, match="Can't reach app.example.com:443"):
+        fetch_certificate("app.example.com", 443)
+
+
+def test_watch_caches():
+    """Test the caches are removed after a watch without cache."""
+    with watch_caches(no_cache=True) as (collateral_cache, result_cache):
+        tmp_dir = collateral_cache.path.parent
+        assert result_cache.path.parent == tmp_dir
+        assert tmp_dir.exists()
+
+    assert not tmp_dir.exists()